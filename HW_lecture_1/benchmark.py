@@ -0,0 +1,69 @@
+import argparse
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from coordinates_converter import (
+    BATCH_CONVERSIONS, CONVERSION_DIMENSIONS, FLOAT_PRECISION_DIGITS, convert_point, required_digits,
+)
+
+
+# Случайные тестовые точки: радиусы положительные, углы в градусах в допустимых диапазонах
+def make_points(conversion_type, n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    dims = CONVERSION_DIMENSIONS[conversion_type]
+    points = rng.uniform(-100.0, 100.0, size=(n_points, dims))
+    if not conversion_type.startswith("cartesian"):
+        points[:, 0] = np.abs(points[:, 0])
+        points[:, 1] *= 1.8
+    if conversion_type == "spherical_to_cartesian":
+        points[:, 2] = np.abs(points[:, 2]) * 1.8
+    return points
+
+
+# Пропускная способность (точек в секунду) поточечного преобразования с заданной точностью
+# и название уровня, выбранного для самой требовательной точки
+def measure_point_tier(conversion_type, points, precision):
+    coords = [tuple(Decimal(repr(v)) for v in p) for p in points.tolist()]
+    digits = max(required_digits(c, precision, conversion_type) for c in coords)
+    tier = "float" if digits <= FLOAT_PRECISION_DIGITS else f"Decimal, {digits} цифр"
+    start = time.perf_counter()
+    for c in coords:
+        convert_point(conversion_type, c, precision)
+    return len(coords) / (time.perf_counter() - start), tier
+
+
+# Пропускная способность векторизованного пакетного преобразования
+def measure_batch_tier(conversion_type, points, dtype):
+    columns = [np.ascontiguousarray(col, dtype=dtype) for col in points.T]
+    out = tuple(np.empty(len(points), dtype=dtype) for _ in columns)
+    convert = BATCH_CONVERSIONS[conversion_type]
+    start = time.perf_counter()
+    convert(*columns, out=out, dtype=dtype)
+    return len(points) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение скорости уровней точности преобразования координат.")
+    parser.add_argument("--conversion", choices=BATCH_CONVERSIONS, default="cartesian_to_spherical")
+    parser.add_argument("--points", type=int, default=2000, help="Число точек для поточечных уровней.")
+    parser.add_argument("--batch-points", type=int, default=1_000_000, help="Число точек для пакетного уровня.")
+    parser.add_argument("--precisions", type=int, nargs="+", default=[6, 20, 50],
+                        help="Точности (знаков после запятой) для поточечных уровней.")
+    args = parser.parse_args()
+
+    print(f"Преобразование: {args.conversion}")
+    batch_points = make_points(args.conversion, args.batch_points)
+    for dtype in (np.float32, np.float64):
+        rate = measure_batch_tier(args.conversion, batch_points, dtype)
+        print(f"  NumPy ({np.dtype(dtype).name}): {rate:>14,.0f} точек/с")
+
+    points = make_points(args.conversion, args.points)
+    for precision in args.precisions:
+        rate, tier = measure_point_tier(args.conversion, points, precision)
+        print(f"  {precision} знаков ({tier}): {rate:>14,.0f} точек/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,822 @@
+import argparse
 import math
-from decimal import Decimal, getcontext
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, getcontext, localcontext
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Максимальное число значащих цифр, которое надёжно обеспечивает float (double)
+FLOAT_PRECISION_DIGITS = 15
+# Запасные цифры для промежуточных вычислений в Decimal
+GUARD_DIGITS = 5
+
+
+# Число π с заданным числом значащих цифр (ряд из документации модуля decimal).
+# Результат кэшируется для каждой точности.
+@lru_cache(maxsize=None)
+def decimal_pi(prec):
+    with localcontext() as ctx:
+        ctx.prec = prec + 2
+        three = Decimal(3)
+        lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+        ctx.prec = prec
+        return +s
+
+
+# Коэффициенты перевода градусов в радианы и обратно для заданной точности (кэшируются)
+@lru_cache(maxsize=None)
+def _degree_factors(prec):
+    pi = decimal_pi(prec + 2)
+    with localcontext() as ctx:
+        ctx.prec = prec
+        return +(pi / 180), +(180 / pi)
+
+
+def decimal_radians(deg):
+    return Decimal(deg) * _degree_factors(getcontext().prec)[0]
+
+
+def decimal_degrees(rad):
+    return Decimal(rad) * _degree_factors(getcontext().prec)[1]
+
+
+# Синус и косинус в Decimal: приведение аргумента к [-π, π] и ряд Тейлора
+def _decimal_sin_cos(x, want_sin):
+    prec = getcontext().prec
+    with localcontext() as ctx:
+        ctx.prec = prec + 2
+        x = Decimal(x).remainder_near(2 * decimal_pi(ctx.prec))
+        x2 = x * x
+        if want_sin:
+            term, total, i = x, x, 1
+        else:
+            term, total, i = Decimal(1), Decimal(1), 0
+        last = None
+        while total != last:
+            last = total
+            term = -term * x2 / ((i + 1) * (i + 2))
+            total += term
+            i += 2
+    return +total
+
+
+def decimal_sin(x):
+    return _decimal_sin_cos(x, True)
+
+
+def decimal_cos(x):
+    return _decimal_sin_cos(x, False)
+
+
+# Арктангенс в Decimal: для |x| > 1 используется atan(x) = ±π/2 - atan(1/x),
+# затем аргумент дважды уменьшается по формуле половинного угла и суммируется ряд Тейлора
+def decimal_atan(x):
+    prec = getcontext().prec
+    with localcontext() as ctx:
+        ctx.prec = prec + 2
+        x = Decimal(x)
+        if x.is_zero():
+            return Decimal(0)
+        if abs(x) > 1:
+            half_pi = decimal_pi(ctx.prec) / 2
+            result = (half_pi if x > 0 else -half_pi) - decimal_atan(1 / x)
+            ctx.prec = prec
+            return +result
+        for _ in range(2):
+            x = x / (1 + (1 + x * x).sqrt())
+        x2 = x * x
+        term, total, n = x, x, 1
+        last = None
+        while total != last:
+            last = total
+            term = -term * x2
+            n += 2
+            total += term / n
+        result = 4 * total
+    return +result
+
+
+def decimal_atan2(y, x):
+    y, x = Decimal(y), Decimal(x)
+    if x > 0:
+        return decimal_atan(y / x)
+    prec = getcontext().prec
+    with localcontext() as ctx:
+        ctx.prec = prec + 2
+        pi = decimal_pi(ctx.prec)
+        if x < 0:
+            result = decimal_atan(y / x) + (pi if y >= 0 else -pi)
+        elif y > 0:
+            result = pi / 2
+        elif y < 0:
+            result = -pi / 2
+        else:
+            result = Decimal(0)
+    return +result
 
 
 # Преобразование из декартовых координат в полярные (2D)
 def cartesian_to_polar(x, y):
-    r = Decimal(x).sqrt() ** 2 + Decimal(y) ** 2
-    theta = Decimal(math.atan2(y, x))
-    return r.sqrt(), Decimal(math.degrees(theta))
+    x, y = Decimal(x), Decimal(y)
+    r = (x ** 2 + y ** 2).sqrt()
+    theta = decimal_atan2(y, x)
+    return r, decimal_degrees(theta)
 
 
 # Преобразование из полярных координат в декартовые (2D)
 def polar_to_cartesian(r, theta_deg):
-    theta_rad = Decimal(math.radians(theta_deg))
-    x = Decimal(r) * Decimal(math.cos(theta_rad))
-    y = Decimal(r) * Decimal(math.sin(theta_rad))
+    theta_rad = decimal_radians(theta_deg)
+    x = Decimal(r) * decimal_cos(theta_rad)
+    y = Decimal(r) * decimal_sin(theta_rad)
     return x, y
 
 
 # Преобразование из декартовых координат в цилиндрические (3D)
 def cartesian_to_cylindrical(x, y, z):
     r, theta = cartesian_to_polar(x, y)
-    return r, theta, Decimal(z)
+    return r, theta, +Decimal(z)
 
 
 # Преобразование из цилиндрических координат в декартовые (3D)
 def cylindrical_to_cartesian(r, theta_deg, z):
-    x, y = polar_to_cartesian(Decimal(r), Decimal(theta_deg))
-    return x, y, Decimal(z)
+    x, y = polar_to_cartesian(r, theta_deg)
+    return x, y, +Decimal(z)
 
 
-# Преобразование из декартовых координат в сферические (3D)
+# Преобразование из декартовых координат в сферические (3D).
+# φ = atan2(√(x² + y²), z) совпадает с acos(z / ρ), но точнее у полюсов и определён при ρ = 0.
 def cartesian_to_spherical(x, y, z):
-    rho = (Decimal(x) ** 2 + Decimal(y) ** 2 + Decimal(z) ** 2).sqrt()
-    theta = Decimal(math.atan2(y, x))
-    phi = Decimal(math.acos(Decimal(z) / rho))
-    return rho, Decimal(math.degrees(theta)), Decimal(math.degrees(phi))
+    x, y, z = Decimal(x), Decimal(y), Decimal(z)
+    r_xy = (x ** 2 + y ** 2).sqrt()
+    rho = (x ** 2 + y ** 2 + z ** 2).sqrt()
+    theta = decimal_atan2(y, x)
+    phi = decimal_atan2(r_xy, z)
+    return rho, decimal_degrees(theta), decimal_degrees(phi)
 
 
 # Преобразование из сферических координат в декартовые (3D)
 def spherical_to_cartesian(rho, theta_deg, phi_deg):
-    theta_rad = Decimal(math.radians(theta_deg))
-    phi_rad = Decimal(math.radians(phi_deg))
-    x = Decimal(rho) * Decimal(math.sin(phi_rad)) * Decimal(math.cos(theta_rad))
-    y = Decimal(rho) * Decimal(math.sin(phi_rad)) * Decimal(math.sin(theta_rad))
-    z = Decimal(rho) * Decimal(math.cos(phi_rad))
+    theta_rad = decimal_radians(theta_deg)
+    phi_rad = decimal_radians(phi_deg)
+    rho_sin_phi = Decimal(rho) * decimal_sin(phi_rad)
+    x = rho_sin_phi * decimal_cos(theta_rad)
+    y = rho_sin_phi * decimal_sin(theta_rad)
+    z = Decimal(rho) * decimal_cos(phi_rad)
     return x, y, z
 
 
+# Быстрые версии преобразований в float для точности до FLOAT_PRECISION_DIGITS цифр
+def cartesian_to_polar_float(x, y):
+    return math.hypot(x, y), math.degrees(math.atan2(y, x))
+
+
+def polar_to_cartesian_float(r, theta_deg):
+    theta_rad = math.radians(theta_deg)
+    return r * math.cos(theta_rad), r * math.sin(theta_rad)
+
+
+def cartesian_to_cylindrical_float(x, y, z):
+    return (*cartesian_to_polar_float(x, y), z)
+
+
+def cylindrical_to_cartesian_float(r, theta_deg, z):
+    return (*polar_to_cartesian_float(r, theta_deg), z)
+
+
+def cartesian_to_spherical_float(x, y, z):
+    r_xy = math.hypot(x, y)
+    return math.hypot(r_xy, z), math.degrees(math.atan2(y, x)), math.degrees(math.atan2(r_xy, z))
+
+
+def spherical_to_cartesian_float(rho, theta_deg, phi_deg):
+    theta_rad, phi_rad = math.radians(theta_deg), math.radians(phi_deg)
+    rho_sin_phi = rho * math.sin(phi_rad)
+    return rho_sin_phi * math.cos(theta_rad), rho_sin_phi * math.sin(theta_rad), rho * math.cos(phi_rad)
+
+
+# Таблицы поточечных преобразований: точный путь (Decimal) и быстрый путь (float)
+DECIMAL_CONVERSIONS = {
+    "cartesian_to_polar": cartesian_to_polar,
+    "polar_to_cartesian": polar_to_cartesian,
+    "cartesian_to_cylindrical": cartesian_to_cylindrical,
+    "cylindrical_to_cartesian": cylindrical_to_cartesian,
+    "cartesian_to_spherical": cartesian_to_spherical,
+    "spherical_to_cartesian": spherical_to_cartesian,
+}
+
+FLOAT_CONVERSIONS = {
+    "cartesian_to_polar": cartesian_to_polar_float,
+    "polar_to_cartesian": polar_to_cartesian_float,
+    "cartesian_to_cylindrical": cartesian_to_cylindrical_float,
+    "cylindrical_to_cartesian": cylindrical_to_cartesian_float,
+    "cartesian_to_spherical": cartesian_to_spherical_float,
+    "spherical_to_cartesian": spherical_to_cartesian_float,
+}
+
+
+# Преобразования, у которых среди результатов есть угол в градусах (до трёх цифр в целой части)
+ANGLE_OUTPUT_CONVERSIONS = frozenset({"cartesian_to_polar", "cartesian_to_cylindrical", "cartesian_to_spherical"})
+
+
+# Число значащих цифр, нужное для вывода precision знаков после запятой при данных координатах.
+# Учитывается целая часть результатов, а не только входов: радиус может быть больше наибольшей
+# координаты (до √3 раз, то есть на одну цифру), угол в градусах имеет до трёх цифр.
+# Ещё одна запасная цифра покрывает ошибку округления последнего знака.
+def required_digits(coords, precision, conversion_type=None):
+    magnitude = max((Decimal(c).adjusted() + 1 for c in coords if Decimal(c) != 0), default=1)
+    integer_digits = max(magnitude, 0) + 1
+    if conversion_type in ANGLE_OUTPUT_CONVERSIONS:
+        integer_digits = max(integer_digits, 3)
+    return integer_digits + precision + 1
+
+
+# Преобразование одной точки с выбором уровня точности: если хватает float, используется
+# быстрый путь, иначе вычисления ведутся в Decimal с нужным числом значащих цифр.
+# Глобальный контекст decimal при этом не изменяется.
+def convert_point(conversion_type, coords, precision):
+    digits = required_digits(coords, precision, conversion_type)
+    if digits <= FLOAT_PRECISION_DIGITS:
+        return FLOAT_CONVERSIONS[conversion_type](*(float(c) for c in coords))
+    with localcontext() as ctx:
+        ctx.prec = digits + GUARD_DIGITS
+        return DECIMAL_CONVERSIONS[conversion_type](*coords)
+
+
+# Допустимые типы данных для пакетных (векторизованных) преобразований
+BATCH_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+
+# Приведение входных массивов к выбранному типу и подготовка выходных массивов.
+# Если out передан, результаты записываются в него без дополнительных выделений памяти
+# (кроме копий входов, которые делят память с выходами: так работает out=(x, y) на месте).
+def _prepare_batch(arrays, out, n_out, dtype):
+    dtype = np.dtype(dtype)
+    if dtype not in BATCH_DTYPES:
+        raise ValueError(f"Неподдерживаемый тип данных: {dtype}. Допустимы float32 и float64.")
+    arrays = [np.asarray(a, dtype=dtype) for a in arrays]
+    shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    if out is None:
+        out = tuple(np.empty(shape, dtype=dtype) for _ in range(n_out))
+    else:
+        if len(out) != n_out:
+            raise ValueError(f"Ожидалось {n_out} выходных массива, получено {len(out)}.")
+        for o in out:
+            if not isinstance(o, np.ndarray) or o.shape != shape or o.dtype != dtype:
+                raise ValueError(f"Выходные массивы должны иметь форму {shape} и тип {dtype}.")
+        out = tuple(out)
+        # Выход, совпадающий с входом (или перекрывающий его), затёр бы исходные данные
+        # до того, как по ним посчитаны остальные результаты: такие входы копируются
+        arrays = [a.copy() if any(np.shares_memory(o, a) for o in out) else a for a in arrays]
+    return arrays, out
+
+
+# Пакетное преобразование из декартовых координат в полярные (2D)
+def cartesian_to_polar_batch(x, y, out=None, dtype=np.float64):
+    (x, y), (r, theta) = _prepare_batch((x, y), out, 2, dtype)
+    np.hypot(x, y, out=r)
+    np.arctan2(y, x, out=theta)
+    np.degrees(theta, out=theta)
+    return r, theta
+
+
+# Пакетное преобразование из полярных координат в декартовые (2D)
+def polar_to_cartesian_batch(r, theta_deg, out=None, dtype=np.float64):
+    (r, theta_deg), (x, y) = _prepare_batch((r, theta_deg), out, 2, dtype)
+    theta_rad = np.radians(theta_deg)
+    np.cos(theta_rad, out=x)
+    x *= r
+    np.sin(theta_rad, out=y)
+    y *= r
+    return x, y
+
+
+# Пакетное преобразование из декартовых координат в цилиндрические (3D)
+def cartesian_to_cylindrical_batch(x, y, z, out=None, dtype=np.float64):
+    (x, y, z), (r, theta, z_new) = _prepare_batch((x, y, z), out, 3, dtype)
+    cartesian_to_polar_batch(x, y, out=(r, theta), dtype=dtype)
+    np.copyto(z_new, z)
+    return r, theta, z_new
+
+
+# Пакетное преобразование из цилиндрических координат в декартовые (3D)
+def cylindrical_to_cartesian_batch(r, theta_deg, z, out=None, dtype=np.float64):
+    (r, theta_deg, z), (x, y, z_new) = _prepare_batch((r, theta_deg, z), out, 3, dtype)
+    polar_to_cartesian_batch(r, theta_deg, out=(x, y), dtype=dtype)
+    np.copyto(z_new, z)
+    return x, y, z_new
+
+
+# Пакетное преобразование из декартовых координат в сферические (3D).
+# Угол φ считается через arctan2(√(x² + y²), z): это то же самое, что acos(z / ρ),
+# но без деления на ноль в начале координат и без потери точности у полюсов.
+def cartesian_to_spherical_batch(x, y, z, out=None, dtype=np.float64):
+    (x, y, z), (rho, theta, phi) = _prepare_batch((x, y, z), out, 3, dtype)
+    np.hypot(x, y, out=phi)
+    np.hypot(phi, z, out=rho)
+    np.arctan2(phi, z, out=phi)
+    np.degrees(phi, out=phi)
+    np.arctan2(y, x, out=theta)
+    np.degrees(theta, out=theta)
+    return rho, theta, phi
+
+
+# Пакетное преобразование из сферических координат в декартовые (3D)
+def spherical_to_cartesian_batch(rho, theta_deg, phi_deg, out=None, dtype=np.float64):
+    (rho, theta_deg, phi_deg), (x, y, z) = _prepare_batch((rho, theta_deg, phi_deg), out, 3, dtype)
+    theta_rad = np.radians(theta_deg)
+    phi_rad = np.radians(phi_deg)
+    rho_sin_phi = np.sin(phi_rad)
+    rho_sin_phi *= rho
+    np.cos(theta_rad, out=x)
+    x *= rho_sin_phi
+    np.sin(theta_rad, out=y)
+    y *= rho_sin_phi
+    np.cos(phi_rad, out=z)
+    z *= rho
+    return x, y, z
+
+
+# Размер блока (в точках) для поблочных вычислений в цепочках преобразований
+DEFAULT_BLOCK_SIZE = 16384
+
+
+# Таблица пакетных преобразований: имя -> функция
+BATCH_CONVERSIONS = {
+    "cartesian_to_polar": cartesian_to_polar_batch,
+    "polar_to_cartesian": polar_to_cartesian_batch,
+    "cartesian_to_cylindrical": cartesian_to_cylindrical_batch,
+    "cylindrical_to_cartesian": cylindrical_to_cartesian_batch,
+    "cartesian_to_spherical": cartesian_to_spherical_batch,
+    "spherical_to_cartesian": spherical_to_cartesian_batch,
+}
+
+# Количество координат на точку для каждого преобразования (на входе и на выходе)
+CONVERSION_DIMENSIONS = {
+    "cartesian_to_polar": 2,
+    "polar_to_cartesian": 2,
+    "cartesian_to_cylindrical": 3,
+    "cylindrical_to_cartesian": 3,
+    "cartesian_to_spherical": 3,
+    "spherical_to_cartesian": 3,
+}
+
+# Системы координат на входе и выходе каждого преобразования
+CONVERSION_SYSTEMS = {
+    "cartesian_to_polar": ("cartesian2", "polar"),
+    "polar_to_cartesian": ("polar", "cartesian2"),
+    "cartesian_to_cylindrical": ("cartesian3", "cylindrical"),
+    "cylindrical_to_cartesian": ("cylindrical", "cartesian3"),
+    "cartesian_to_spherical": ("cartesian3", "spherical"),
+    "spherical_to_cartesian": ("spherical", "cartesian3"),
+}
+
+SYSTEM_DIMENSIONS = {"cartesian2": 2, "polar": 2, "cartesian3": 3, "cylindrical": 3, "spherical": 3}
+
+
+# Прямой переход между сферическими и цилиндрическими координатами (без промежуточных декартовых)
+def _spherical_to_cylindrical_batch(rho, theta_deg, phi_deg, out=None, dtype=np.float64):
+    (rho, theta_deg, phi_deg), (r, theta, z) = _prepare_batch((rho, theta_deg, phi_deg), out, 3, dtype)
+    phi_rad = np.radians(phi_deg)
+    np.sin(phi_rad, out=r)
+    r *= rho
+    np.copyto(theta, theta_deg)
+    np.cos(phi_rad, out=z)
+    z *= rho
+    return r, theta, z
+
+
+def _cylindrical_to_spherical_batch(r, theta_deg, z, out=None, dtype=np.float64):
+    (r, theta_deg, z), (rho, theta, phi) = _prepare_batch((r, theta_deg, z), out, 3, dtype)
+    np.hypot(r, z, out=rho)
+    np.copyto(theta, theta_deg)
+    np.arctan2(r, z, out=phi)
+    np.degrees(phi, out=phi)
+    return rho, theta, phi
+
+
+# Пары преобразований, которые можно заменить одним прямым переходом
+_FUSED_CONVERSIONS = {
+    ("spherical_to_cartesian", "cartesian_to_cylindrical"): "spherical_to_cylindrical",
+    ("cylindrical_to_cartesian", "cartesian_to_spherical"): "cylindrical_to_spherical",
+}
+
+_CHAIN_KERNELS = dict(BATCH_CONVERSIONS, spherical_to_cylindrical=_spherical_to_cylindrical_batch,
+                      cylindrical_to_spherical=_cylindrical_to_spherical_batch)
+
+_CHAIN_SYSTEMS = dict(CONVERSION_SYSTEMS, spherical_to_cylindrical=("spherical", "cylindrical"),
+                      cylindrical_to_spherical=("cylindrical", "spherical"))
+
+
+# Матрица поворота на угол в градусах: на плоскости (axis=None) или вокруг оси 'x', 'y' или 'z'
+def rotation_matrix(angle_deg, axis=None):
+    c, s = math.cos(math.radians(angle_deg)), math.sin(math.radians(angle_deg))
+    if axis is None:
+        return np.array([[c, -s], [s, c]])
+    i, j = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}[axis]
+    matrix = np.eye(3)
+    matrix[i, i], matrix[i, j], matrix[j, i], matrix[j, j] = c, -s, s, c
+    return matrix
+
+
+# Цепочка преобразований координат. Шаги — любые из шести преобразований, а также повороты
+# и переносы в декартовых координатах. Перед вычислением цепочка упрощается: взаимно обратные
+# соседние преобразования выбрасываются (углы при этом не приводятся к стандартному диапазону),
+# подряд идущие повороты и переносы сливаются в одно аффинное преобразование, а переходы
+# сферические -> декартовы -> цилиндрические (и обратно) заменяются прямыми формулами.
+# Вычисление идёт блоками по block_size точек через два переиспользуемых буфера,
+# поэтому промежуточные массивы размером со всё облако точек не создаются.
+class TransformChain:
+    def __init__(self, steps=(), input_system=None):
+        self.steps = tuple(steps)
+        self.input_system = input_system
+        self._plan = None
+
+    # Система координат после всех шагов цепочки
+    @property
+    def output_system(self):
+        system = self.input_system
+        for kind, value in self.steps:
+            if kind == "convert":
+                system = CONVERSION_SYSTEMS[value][1]
+        return system
+
+    def _append(self, step, system):
+        current = self.output_system
+        if current is not None and current != system:
+            raise ValueError(f"Шаг ожидает систему {system}, а цепочка выдаёт {current}.")
+        return TransformChain(self.steps + (step,), self.input_system or system)
+
+    def then(self, conversion_type):
+        if conversion_type not in CONVERSION_SYSTEMS:
+            raise ValueError(f"Неизвестное преобразование: {conversion_type}")
+        return self._append(("convert", conversion_type), CONVERSION_SYSTEMS[conversion_type][0])
+
+    def rotate(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        dims = matrix.shape[0]
+        if matrix.shape not in ((2, 2), (3, 3)):
+            raise ValueError("Матрица поворота должна иметь размер 2x2 или 3x3.")
+        return self._append(("affine", (matrix, np.zeros(dims))), f"cartesian{dims}")
+
+    def translate(self, offset):
+        offset = np.asarray(offset, dtype=np.float64)
+        dims = offset.shape[0]
+        if offset.shape not in ((2,), (3,)):
+            raise ValueError("Вектор переноса должен содержать 2 или 3 компоненты.")
+        return self._append(("affine", (np.eye(dims), offset)), f"cartesian{dims}")
+
+    # Упрощённый список шагов, который реально вычисляется
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._simplify(list(self.steps))
+        return self._plan
+
+    # Сначала до конца сокращаются взаимно обратные шаги и объединяются аффинные, и только потом
+    # соседние преобразования сливаются в одно: иначе слияние может скрыть пару обратных шагов
+    # дальше по цепочке (лишний круг преобразований с его ошибкой округления остался бы в плане)
+    @staticmethod
+    def _simplify(steps):
+        steps = TransformChain._cancel(steps)
+        while True:
+            for i in range(len(steps) - 1):
+                (kind, value), (next_kind, next_value) = steps[i], steps[i + 1]
+                if kind == next_kind == "convert" and (value, next_value) in _FUSED_CONVERSIONS:
+                    steps[i:i + 2] = [("convert", _FUSED_CONVERSIONS[value, next_value])]
+                    steps = TransformChain._cancel(steps)
+                    break
+            else:
+                return tuple(steps)
+
+    # Удаление тождественных и взаимно обратных шагов и объединение аффинных, пока что-то меняется
+    @staticmethod
+    def _cancel(steps):
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(steps)):
+                kind, value = steps[i]
+                if kind == "affine" and np.array_equal(value[0], np.eye(len(value[1]))) and not value[1].any():
+                    del steps[i]
+                    changed = True
+                    break
+                if i + 1 == len(steps):
+                    break
+                next_kind, next_value = steps[i + 1]
+                if kind == next_kind == "affine":
+                    (m1, t1), (m2, t2) = value, next_value
+                    steps[i:i + 2] = [("affine", (m2 @ m1, m2 @ t1 + t2))]
+                    changed = True
+                    break
+                if kind == next_kind == "convert":
+                    src, dst = _CHAIN_SYSTEMS[value]
+                    next_src, next_dst = _CHAIN_SYSTEMS[next_value]
+                    if src == next_dst and dst == next_src:
+                        del steps[i:i + 2]
+                        changed = True
+                        break
+        return steps
+
+    def __call__(self, *coords, out=None, dtype=np.float64, block_size=DEFAULT_BLOCK_SIZE):
+        if self.input_system is None:
+            raise ValueError("Цепочка преобразований пуста.")
+        n_in = SYSTEM_DIMENSIONS[self.input_system]
+        n_out = SYSTEM_DIMENSIONS[self.output_system]
+        if len(coords) != n_in:
+            raise ValueError(f"Ожидалось {n_in} массива координат, получено {len(coords)}.")
+        coords, out = _prepare_batch(coords, out, n_out, dtype)
+        shape = out[0].shape
+        flat_in = [_flat_blocks(c, shape) for c in coords]
+        flat_out = [_flat_view(o) for o in out]
+        size = flat_out[0].size if flat_out else 0
+
+        plan = self.plan
+        buffers = np.empty((2, 3, min(block_size, max(size, 1))), dtype=out[0].dtype)
+        for start in range(0, size, block_size):
+            stop = min(start + block_size, size)
+            n = stop - start
+            current, spare = buffers[0, :, :n], buffers[1, :, :n]
+            for i, c in enumerate(flat_in):
+                np.copyto(current[i], c[start:stop])
+            dims = n_in
+            for kind, value in plan:
+                if kind == "affine":
+                    matrix, offset = value
+                    np.matmul(matrix.astype(current.dtype), current[:dims], out=spare[:dims])
+                    spare[:dims] += offset.astype(current.dtype)[:, None]
+                else:
+                    src, dst = _CHAIN_SYSTEMS[value]
+                    dims_out = SYSTEM_DIMENSIONS[dst]
+                    _CHAIN_KERNELS[value](*current[:dims], out=tuple(spare[:dims_out]), dtype=current.dtype)
+                    dims = dims_out
+                current, spare = spare, current
+            for i, o in enumerate(flat_out):
+                o[start:stop] = current[i]
+        return out
+
+
+# Плоский доступ к входному массиву, транслированному до формы shape: срез [start:stop] дает
+# блок значений. reshape(-1) у транслированного массива скопировал бы его целиком, поэтому
+# для него используется итератор .flat, который копирует только запрошенный блок.
+def _flat_blocks(array, shape):
+    view = np.broadcast_to(array, shape)
+    return view.reshape(-1) if view.flags.c_contiguous else view.flat
+
+
+# Плоское (одномерное) представление массива без копирования
+def _flat_view(array):
+    if array.ndim == 1:
+        return array
+    flat = array.reshape(-1)
+    if not np.shares_memory(flat, array):
+        raise ValueError("Многомерные выходные массивы должны быть непрерывными в памяти.")
+    return flat
+
+
+# Размер блока (в точках) для потокового преобразования файлов
+DEFAULT_CHUNK_SIZE = 65536
+
+
+# Чтение CSV блоками фиксированного размера: в памяти одновременно находится не больше chunk_size строк
+def iter_csv_chunks(stream, n_cols, chunk_size, dtype, delimiter=","):
+    lines = []
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        lines.append(line)
+        if len(lines) == chunk_size:
+            yield np.loadtxt(lines, delimiter=delimiter, dtype=dtype, ndmin=2, usecols=range(n_cols))
+            lines.clear()
+    if lines:
+        yield np.loadtxt(lines, delimiter=delimiter, dtype=dtype, ndmin=2, usecols=range(n_cols))
+
+
+# Чтение бинарного файла (подряд идущие значения dtype, n_cols на точку) через отображение в память
+def iter_binary_chunks(path, n_cols, chunk_size, dtype):
+    data = np.memmap(path, dtype=dtype, mode="r")
+    if data.size % n_cols != 0:
+        raise ValueError(f"Размер файла {path} не кратен {n_cols} значениям {np.dtype(dtype)} на точку.")
+    points = data.reshape(-1, n_cols)
+    for start in range(0, len(points), chunk_size):
+        yield points[start:start + chunk_size]
+
+
+# Потоковое преобразование файла координат. Выходной буфер выделяется один раз,
+# поэтому расход памяти не зависит от размера файла. Возвращает число обработанных точек.
+def convert_stream(conversion_type, source, sink, input_format="csv", output_format="csv",
+                   chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64, precision=6, delimiter=","):
+    convert = BATCH_CONVERSIONS[conversion_type]
+    n_cols = CONVERSION_DIMENSIONS[conversion_type]
+    dtype = np.dtype(dtype)
+
+    if input_format == "bin":
+        chunks = iter_binary_chunks(source, n_cols, chunk_size, dtype)
+    else:
+        chunks = iter_csv_chunks(source, n_cols, chunk_size, dtype, delimiter)
+
+    buffer = np.empty((chunk_size, n_cols), dtype=dtype)
+    total = 0
+    for chunk in chunks:
+        n = len(chunk)
+        result = buffer[:n]
+        convert(*chunk.T, out=tuple(result.T), dtype=dtype)
+        if output_format == "bin":
+            sink.write(result.tobytes())
+        else:
+            np.savetxt(sink, result, fmt=f"%.{precision}f", delimiter=delimiter)
+        total += n
+    return total
+
+
+# Функция преобразования и число координат на входе и выходе: по имени преобразования или для цепочки
+def _resolve_transform(transform):
+    if isinstance(transform, TransformChain):
+        return transform, SYSTEM_DIMENSIONS[transform.input_system], SYSTEM_DIMENSIONS[transform.output_system]
+    return BATCH_CONVERSIONS[transform], CONVERSION_DIMENSIONS[transform], CONVERSION_DIMENSIONS[transform]
+
+
+# Границы частей для параллельной обработки: по несколько частей на процесс для равномерной загрузки
+def _shard_bounds(size, workers, chunk_size):
+    shard = max(min(chunk_size, -(-size // (workers * 4))), 1)
+    return [(start, min(start + shard, size)) for start in range(0, size, shard)]
+
+
+# Обработка одной части в процессе-исполнителе. Данные не передаются через pickle:
+# исполнитель подключается к разделяемой памяти по имени и пишет результат прямо в неё.
+def _convert_shared_shard(transform, in_name, out_name, shape_in, shape_out, dtype, start, stop):
+    convert = _resolve_transform(transform)[0]
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        src = np.ndarray(shape_in, dtype=dtype, buffer=in_shm.buf)
+        dst = np.ndarray(shape_out, dtype=dtype, buffer=out_shm.buf)
+        convert(*src[:, start:stop], out=tuple(dst[:, start:stop]), dtype=dtype)
+        del src, dst
+    finally:
+        in_shm.close()
+        out_shm.close()
+    return stop - start
+
+
+# То же для бинарных файлов: файлы отображаются в память в каждом исполнителе
+def _convert_file_shard(transform, input_path, output_path, n_points, dtype, start, stop):
+    convert, n_in, n_out = _resolve_transform(transform)
+    src = np.memmap(input_path, dtype=dtype, mode="r", shape=(n_points, n_in))
+    dst = np.memmap(output_path, dtype=dtype, mode="r+", shape=(n_points, n_out))
+    convert(*src[start:stop].T, out=tuple(dst[start:stop].T), dtype=dtype)
+    dst.flush()
+    del src, dst
+    return stop - start
+
+
+# Параллельное преобразование массивов координат на нескольких ядрах.
+# transform — имя преобразования или TransformChain. Входные данные один раз копируются
+# в разделяемую память, исполнители обрабатывают свои части и пишут в общий выходной буфер.
+# Возвращает кортеж выходных массивов и скорость в точках в секунду.
+def convert_parallel(transform, *coords, out=None, dtype=np.float64, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    _, n_in, n_out = _resolve_transform(transform)
+    if len(coords) != n_in:
+        raise ValueError(f"Ожидалось {n_in} массива координат, получено {len(coords)}.")
+    workers = workers or os.cpu_count()
+    coords, out = _prepare_batch(coords, out, n_out, dtype)
+    dtype = out[0].dtype
+    shape = out[0].shape
+    size = int(np.prod(shape))
+
+    start_time = time.perf_counter()
+    in_shm = shared_memory.SharedMemory(create=True, size=max(n_in * size * dtype.itemsize, 1))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(n_out * size * dtype.itemsize, 1))
+    try:
+        src = np.ndarray((n_in, size), dtype=dtype, buffer=in_shm.buf)
+        dst = np.ndarray((n_out, size), dtype=dtype, buffer=out_shm.buf)
+        for i, c in enumerate(coords):
+            np.copyto(src[i].reshape(shape), c)  # Трансляция сразу в разделяемую память, без копии
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_convert_shared_shard, transform, in_shm.name, out_shm.name,
+                                   src.shape, dst.shape, dtype, start, stop)
+                       for start, stop in _shard_bounds(size, workers, chunk_size)]
+            for future in futures:
+                future.result()
+        for i, o in enumerate(out):
+            o[...] = dst[i].reshape(shape)
+        del src, dst
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+    elapsed = time.perf_counter() - start_time
+    return out, size / elapsed if elapsed > 0 else float("inf")
+
+
+# Параллельное преобразование бинарного файла в бинарный файл. Выходной файл создаётся
+# заранее нужного размера, каждый исполнитель пишет в свой диапазон точек.
+# Возвращает число точек и скорость в точках в секунду.
+def convert_file_parallel(transform, input_path, output_path, dtype=np.float64, workers=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+    _, n_in, n_out = _resolve_transform(transform)
+    workers = workers or os.cpu_count()
+    dtype = np.dtype(dtype)
+    file_size = os.path.getsize(input_path)
+    if file_size % (n_in * dtype.itemsize) != 0:
+        raise ValueError(f"Размер файла {input_path} не кратен {n_in} значениям {dtype} на точку.")
+    n_points = file_size // (n_in * dtype.itemsize)
+
+    start_time = time.perf_counter()
+    with open(output_path, "wb") as f:
+        f.truncate(n_points * n_out * dtype.itemsize)
+    if n_points:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_convert_file_shard, transform, input_path, output_path, n_points, dtype,
+                                   start, stop)
+                       for start, stop in _shard_bounds(n_points, workers, chunk_size)]
+            for future in futures:
+                future.result()
+    elapsed = time.perf_counter() - start_time
+    return n_points, n_points / elapsed if elapsed > 0 else float("inf")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Потоковое преобразование файла координат. Без аргументов запускается интерактивный режим."
+    )
+    parser.add_argument("conversion_type", choices=BATCH_CONVERSIONS, help="Тип преобразования.")
+    parser.add_argument("input", help="Входной файл (CSV или бинарный). '-' — стандартный ввод (только CSV).")
+    parser.add_argument("-o", "--output", default="-", help="Выходной файл, по умолчанию стандартный вывод.")
+    parser.add_argument("--input-format", choices=("csv", "bin"), default="csv", help="Формат входного файла.")
+    parser.add_argument("--output-format", choices=("csv", "bin"), default=None,
+                        help="Формат выходного файла, по умолчанию совпадает с входным.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Размер блока в точках.")
+    parser.add_argument("--dtype", choices=("float32", "float64"), default="float64",
+                        help="Тип чисел для вычислений и бинарных файлов.")
+    parser.add_argument("--precision", type=int, default=6, help="Количество знаков после запятой в CSV.")
+    parser.add_argument("--delimiter", default=",", help="Разделитель столбцов в CSV.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Число процессов. Больше 1 — только для бинарного входа и выходного файла.")
+    args = parser.parse_args(argv)
+    if args.output_format is None:
+        args.output_format = args.input_format
+    if args.chunk_size <= 0:
+        parser.error("размер блока должен быть положительным")
+    if args.input_format == "bin" and args.input == "-":
+        parser.error("бинарный ввод поддерживается только из файла")
+    if args.workers <= 0:
+        parser.error("число процессов должно быть положительным")
+    if args.workers > 1 and (args.input_format != "bin" or args.output_format != "bin" or args.output == "-"):
+        parser.error("параллельный режим требует бинарного входного и выходного файлов")
+    return args
+
+
+def run_batch(args):
+    if args.workers > 1:
+        total, rate = convert_file_parallel(args.conversion_type, args.input, args.output, args.dtype,
+                                            args.workers, args.chunk_size)
+        print(f"Преобразовано точек: {total} ({rate:,.0f} точек/с, процессов: {args.workers})", file=sys.stderr)
+        return
+
+    start_time = time.perf_counter()
+    owned = []  # Файлы, открытые здесь и подлежащие закрытию
+    if args.input_format == "bin":
+        source = args.input
+    elif args.input == "-":
+        source = sys.stdin
+    else:
+        source = open(args.input, "r", encoding="utf-8")
+        owned.append(source)
+
+    if args.output == "-":
+        sink = sys.stdout.buffer if args.output_format == "bin" else sys.stdout
+    elif args.output_format == "bin":
+        sink = open(args.output, "wb")
+        owned.append(sink)
+    else:
+        sink = open(args.output, "w", encoding="utf-8")
+        owned.append(sink)
+
+    try:
+        total = convert_stream(args.conversion_type, source, sink, args.input_format, args.output_format,
+                               args.chunk_size, args.dtype, args.precision, args.delimiter)
+    finally:
+        for f in owned:
+            f.close()
+    elapsed = time.perf_counter() - start_time
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Преобразовано точек: {total} ({rate:,.0f} точек/с)", file=sys.stderr)
+
+
 # Функция для вывода справочной информации
 def print_help():
     print("""
@@ -75,10 +845,14 @@ def print_help():
 
 Чтобы завершить программу, введите 'exit'.
 Чтобы вывести эту справочную информацию, введите 'help'.
+
+Пакетный режим (для больших файлов):
+  coordinates_converter <тип преобразования> <входной файл> [-o выходной файл]
+  Подробнее: coordinates_converter --help
     """)
 
 
-def main():
+def run_interactive():
     while True:
         # Запрашиваем тип преобразования
         conversion_type = input("Введите тип преобразования (или 'help' для справки, 'exit' для выхода): ").strip()
@@ -92,26 +866,25 @@ def main():
 
         # Запрашиваем точность вычислений
         precision = int(input("Введите точность (количество знаков после запятой): ").strip())
-        getcontext().prec = precision + 2  # Set precision a little higher for internal calculations
 
         # Запрашиваем необходимые координаты в зависимости от типа преобразования
         if conversion_type == "cartesian_to_polar":
             x = Decimal(input("Введите координату X: ").strip())
             y = Decimal(input("Введите координату Y: ").strip())
-            r, theta = cartesian_to_polar(x, y)
+            r, theta = convert_point("cartesian_to_polar", (x, y), precision)
             print(f"Полярные координаты: r = {r:.{precision}f}, θ = {theta:.{precision}f} градусов")
 
         elif conversion_type == "polar_to_cartesian":
             r = Decimal(input("Введите радиус r: ").strip())
             theta = Decimal(input("Введите угол θ (в градусах): ").strip())
-            x, y = polar_to_cartesian(r, theta)
+            x, y = convert_point("polar_to_cartesian", (r, theta), precision)
             print(f"Декартовы координаты: x = {x:.{precision}f}, y = {y:.{precision}f}")
 
         elif conversion_type == "cartesian_to_cylindrical":
             x = Decimal(input("Введите координату X: ").strip())
             y = Decimal(input("Введите координату Y: ").strip())
             z = Decimal(input("Введите координату Z: ").strip())
-            r, theta, z_new = cartesian_to_cylindrical(x, y, z)
+            r, theta, z_new = convert_point("cartesian_to_cylindrical", (x, y, z), precision)
             print(
                 f"Цилиндрические координаты: r = {r:.{precision}f}, θ = {theta:.{precision}f} градусов, z = {z_new:.{precision}f}")
 
@@ -119,14 +892,14 @@ def main():
             r = Decimal(input("Введите радиус r: ").strip())
             theta = Decimal(input("Введите угол θ (в градусах): ").strip())
             z = Decimal(input("Введите координату Z: ").strip())
-            x, y, z_new = cylindrical_to_cartesian(r, theta, z)
+            x, y, z_new = convert_point("cylindrical_to_cartesian", (r, theta, z), precision)
             print(f"Декартовы координаты: x = {x:.{precision}f}, y = {y:.{precision}f}, z = {z_new:.{precision}f}")
 
         elif conversion_type == "cartesian_to_spherical":
             x = Decimal(input("Введите координату X: ").strip())
             y = Decimal(input("Введите координату Y: ").strip())
             z = Decimal(input("Введите координату Z: ").strip())
-            rho, theta, phi = cartesian_to_spherical(x, y, z)
+            rho, theta, phi = convert_point("cartesian_to_spherical", (x, y, z), precision)
             print(
                 f"Сферические координаты: ρ = {rho:.{precision}f}, θ = {theta:.{precision}f} градусов, φ = {phi:.{precision}f} градусов")
 
@@ -134,12 +907,22 @@ def main():
             rho = Decimal(input("Введите радиус ρ: ").strip())
             theta = Decimal(input("Введите угол θ (в градусах): ").strip())
             phi = Decimal(input("Введите угол φ (в градусах): ").strip())
-            x, y, z = spherical_to_cartesian(rho, theta, phi)
+            x, y, z = convert_point("spherical_to_cartesian", (rho, theta, phi), precision)
             print(f"Декартовы координаты: x = {x:.{precision}f}, y = {y:.{precision}f}, z = {z:.{precision}f}")
 
         else:
             print("Неверный тип преобразования. Попробуйте снова или введите 'help' для справки.")
 
 
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv:
+        run_batch(parse_args(argv))
+    else:
+        run_interactive()
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Нужно для исполняемого файла, собранного PyInstaller
     main()
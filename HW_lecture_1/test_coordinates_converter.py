@@ -0,0 +1,100 @@
+import tracemalloc
+from decimal import Decimal, localcontext
+
+import numpy as np
+import pytest
+
+from coordinates_converter import (
+    BATCH_CONVERSIONS, CONVERSION_DIMENSIONS, DECIMAL_CONVERSIONS, TransformChain, cartesian_to_polar_batch,
+    convert_point,
+)
+
+
+# Эталон: то же преобразование в Decimal с большим запасом значащих цифр
+def reference(conversion_type, coords, precision):
+    with localcontext() as ctx:
+        ctx.prec = 60
+        return [f"{v:.{precision}f}" for v in DECIMAL_CONVERSIONS[conversion_type](*coords)]
+
+
+# Случайные точки с координатами порядка единицы (углы — в градусах)
+def random_points(conversion_type, n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-1.5, 1.5, size=(n_points, CONVERSION_DIMENSIONS[conversion_type]))
+    if not conversion_type.startswith("cartesian"):
+        points[:, 0] = np.abs(points[:, 0])
+        points[:, 1:] *= 120
+    return [tuple(Decimal(f"{v:.6f}") for v in p) for p in points]
+
+
+def test_angle_near_one_uses_enough_digits():
+    coords = (Decimal("-0.706309"), Decimal("0.769002"), Decimal("-0.084884"))
+    rho, theta, phi = convert_point("cartesian_to_spherical", coords, 14)
+    assert f"{theta:.14f}" == "132.56669307892974"
+
+
+@pytest.mark.parametrize("conversion_type", sorted(DECIMAL_CONVERSIONS))
+@pytest.mark.parametrize("precision", [6, 10, 11, 12, 13, 14])
+def test_last_digit_matches_decimal_reference(conversion_type, precision):
+    for coords in random_points(conversion_type, 200, seed=precision):
+        result = [f"{v:.{precision}f}" for v in convert_point(conversion_type, coords, precision)]
+        assert result == reference(conversion_type, coords, precision), coords
+
+
+@pytest.mark.parametrize("conversion_type", sorted(BATCH_CONVERSIONS))
+def test_batch_in_place(conversion_type):
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0.5, 100.0, size=(CONVERSION_DIMENSIONS[conversion_type], 1000))
+    expected = BATCH_CONVERSIONS[conversion_type](*points)
+
+    # Выходы — те же массивы, что и входы, в том числе в обратном порядке
+    for reverse in (False, True):
+        coords = [c.copy() for c in points]
+        out = tuple(reversed(coords)) if reverse else tuple(coords)
+        result = BATCH_CONVERSIONS[conversion_type](*coords, out=out)
+        assert all(r is o for r, o in zip(result, out))
+        for r, e in zip(result, expected):
+            np.testing.assert_allclose(r, e, rtol=1e-12)
+
+
+def test_polar_in_place_example():
+    x, y = np.array([3.0]), np.array([4.0])
+    r, theta = cartesian_to_polar_batch(x, y, out=(x, y))
+    np.testing.assert_allclose([r[0], theta[0]], [5.0, 53.13010235415598])
+
+
+def test_chain_cancels_round_trip_before_fusing():
+    chain = (TransformChain().then("cylindrical_to_cartesian").then("cartesian_to_spherical")
+             .then("spherical_to_cartesian"))
+    assert chain.plan == (("convert", "cylindrical_to_cartesian"),)
+    rho, phi, z = np.array([1.0, 2.5]), np.array([30.0, -120.0]), np.array([0.5, -4.0])
+    result = chain(rho, phi, z)
+    expected = BATCH_CONVERSIONS["cylindrical_to_cartesian"](rho, phi, z)
+    for r, e in zip(result, expected):
+        np.testing.assert_array_equal(r, e)
+
+
+def test_chain_still_fuses_after_cancelling():
+    chain = (TransformChain().then("cylindrical_to_cartesian").then("cartesian_to_spherical")
+             .then("spherical_to_cartesian").translate([0, 0, 0]).then("cartesian_to_spherical"))
+    assert chain.plan == (("convert", "cylindrical_to_spherical"),)
+
+
+def test_chain_broadcast_inputs_are_not_copied_whole():
+    # Сетка 1000 x 1000 из строки и столбца: полная копия любого входа заняла бы 8 МБ
+    x = np.linspace(-5.0, 5.0, 1000)
+    y, z = x[:, None], x[None, ::-1] / 2
+    shape = (len(x), len(x))
+    out = tuple(np.empty(shape) for _ in range(3))
+    chain = TransformChain().then("cartesian_to_spherical")
+    expected = BATCH_CONVERSIONS["cartesian_to_spherical"](*np.broadcast_arrays(x, y, z))
+
+    tracemalloc.start()
+    try:
+        chain(x, y, z, out=out, block_size=4096)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < x.itemsize * x.size ** 2 / 4
+    for r, e in zip(out, expected):
+        np.testing.assert_allclose(r, e, rtol=1e-15)
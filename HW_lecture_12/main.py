@@ -2,10 +2,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Circle
 
+from render_scheduler import RenderScheduler, draw_geometry, trace_field
+
 # Константы
 k = 8.9875e9  # Константа Кулона (Н·м²/Кл²)
 charges = []  # Список зарядов
 selected_charge = None  # Заряд, который двигаем
+scheduler = None  # Планировщик перерисовки (создается в main)
 
 # Сетка координат
 x = np.linspace(-2, 2, 200)
@@ -32,22 +35,82 @@ def calculate_field(charges, X, Y):
         Ey += k * q * (Y - y0) / R2**1.5
     return Ex, Ey
 
-# Функция для обновления графики
+# Вклад одного заряда в потенциал и поле (те же формулы, что в calculate_potential и calculate_field)
+def charge_contribution(charge, X, Y):
+    q = charge["q"]
+    x0, y0 = charge["pos"]
+    dx, dy = X - x0, Y - y0
+    R2 = dx**2 + dy**2 + 1e-10
+    V = k * q / np.sqrt(R2)
+    scale = V / R2  # k * q / R2**1.5
+    return V, scale * dx, scale * dy
+
+
+# Суммарные V, Ex, Ey с запомненным вкладом каждого заряда. При перемещении, добавлении
+# или изменении величины заряда пересчитывается только его вклад: старый вычитается, новый
+# прибавляется, поэтому обновление стоит как расчет одного заряда, а не всех.
+class FieldCache:
+    def __init__(self, X, Y):
+        self.X, self.Y = X, Y
+        self.contributions = {}  # id(заряд) -> (V, Ex, Ey)
+        self.V, self.Ex, self.Ey = np.zeros_like(X), np.zeros_like(X), np.zeros_like(X)
+
+    def add(self, charge):
+        contribution = charge_contribution(charge, self.X, self.Y)
+        self.contributions[id(charge)] = contribution
+        for total, part in zip((self.V, self.Ex, self.Ey), contribution):
+            total += part
+
+    def remove(self, charge):
+        for total, part in zip((self.V, self.Ex, self.Ey), self.contributions.pop(id(charge))):
+            total -= part
+
+    # Заряд изменился (позиция или величина)
+    def update(self, charge):
+        self.remove(charge)
+        self.add(charge)
+
+    # Пересборка сумм из запомненных вкладов: убирает ошибки округления, накопленные
+    # при многократном вычитании и прибавлении (без пересчета самих вкладов)
+    def resync(self):
+        for i, total in enumerate((self.V, self.Ex, self.Ey)):
+            total.fill(0.0)
+            for contribution in self.contributions.values():
+                total += contribution[i]
+
+
+field_cache = FieldCache(X, Y)
+
+
+# Функция для обновления графики: в планировщик передается снимок зарядов и сумм поля,
+# линии считаются в рабочем потоке, а этот вызов сразу возвращает управление
 def update_plot():
-    plt.clf()
-    V = calculate_potential(charges, X, Y)
-    Ex, Ey = calculate_field(charges, X, Y)
+    snapshot = [dict(charge) for charge in charges]
+    scheduler.request((snapshot, field_cache.V.copy(), field_cache.Ex.copy(), field_cache.Ey.copy()))
 
-    plt.streamplot(X, Y, Ex, Ey, color='green', density=1.5, linewidth=0.8)
-    contours = plt.contour(X, Y, V, levels=20, colors='red', linewidths=0.8)
 
-    for charge in charges:
+# Расчет кадра в рабочем потоке
+def compute_frame(state):
+    snapshot, V, Ex, Ey = state
+    return snapshot, trace_field(X, Y, V, Ex, Ey, density=1.5, levels=20)
+
+
+# Показ кадра в потоке интерфейса
+def draw_frame(frame):
+    snapshot, geometry = frame
+    ax = plt.gca()
+    ax.clear()
+    draw_geometry(ax, geometry)
+
+    for charge in snapshot:
         color = 'red' if charge["q"] > 0 else 'blue'
-        plt.gca().add_patch(Circle(charge["pos"], 0.05, color=color))
+        ax.add_patch(Circle(charge["pos"], 0.05, color=color))
+
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(y[0], y[-1])
+    ax.axis('equal')
+    ax.grid(True)
 
-    plt.axis('equal')
-    plt.grid(True)
-    plt.draw()
 
 # Обработчики событий
 def on_click(event):
@@ -68,17 +131,23 @@ def on_click(event):
     # Правая кнопка мыши: добавить отрицательный заряд
     elif event.button == 3:
         charges.append({"q": -1e-9, "pos": (event.xdata, event.ydata)})
+    else:
+        return
+    field_cache.add(charges[-1])
     update_plot()
 
 
 def on_release(event):
     global selected_charge
+    if selected_charge is not None:
+        field_cache.resync()
     selected_charge = None
 
 
 def on_motion(event):
     if selected_charge is not None and event.inaxes:
         selected_charge["pos"] = (event.xdata, event.ydata)
+        field_cache.update(selected_charge)
         update_plot()
 
 
@@ -89,12 +158,21 @@ def on_scroll(event):
         x0, y0 = charge["pos"]
         if np.hypot(event.xdata - x0, event.ydata - y0) < 0.1:
             charge["q"] += 1e-10 * event.step  # Изменение силы заряда
+            field_cache.update(charge)
             update_plot()
             break
 
+# Закрытие окна: остановка рабочего потока и статистика кадров
+def on_close(event):
+    scheduler.stop()
+    print(scheduler.stats.report())
+
 # Главная функция
 def main():
+    global scheduler
     fig, ax = plt.subplots(figsize=(10, 8))
+    scheduler = RenderScheduler(fig.canvas, compute_frame, draw_frame).start()
+    fig.canvas.mpl_connect('close_event', on_close)
     fig.canvas.mpl_connect('button_press_event', on_click)
     fig.canvas.mpl_connect('button_release_event', on_release)
     fig.canvas.mpl_connect('motion_notify_event', on_motion)
@@ -0,0 +1,199 @@
+# Копия этого файла лежит в HW_lecture_13/render_scheduler.py: каждое приложение собирается
+# PyInstaller отдельно из своей папки. Исправления нужно вносить в оба файла, и файлы должны
+# оставаться одинаковыми, кроме этого комментария.
+import inspect
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import FancyArrowPatch
+from matplotlib.streamplot import streamplot
+
+# Стрелки на линиях тока ставятся здесь же, поэтому в streamplot они не нужны
+# (параметр num_arrows есть в Matplotlib начиная с 3.10)
+_NO_ARROWS = {"num_arrows": 0} if "num_arrows" in inspect.signature(streamplot).parameters else {}
+
+
+# Статистика кадров: сколько запросов пришло, сколько кадров посчитано, показано и отброшено,
+# и сколько времени заняли расчет, отрисовка и путь от события до показа
+class FrameStats:
+    def __init__(self, history=1000):
+        self.requested = 0  # Запросы на перерисовку
+        self.coalesced = 0  # Запросы, замененные более новыми до начала расчета
+        self.computed = 0   # Посчитанные кадры
+        self.dropped = 0    # Посчитанные, но устаревшие к моменту показа кадры
+        self.drawn = 0      # Показанные кадры
+        self.compute_times = deque(maxlen=history)
+        self.draw_times = deque(maxlen=history)
+        self.latencies = deque(maxlen=history)
+        self.started = time.perf_counter()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        result = {"requested": self.requested, "coalesced": self.coalesced, "computed": self.computed,
+                  "dropped": self.dropped, "drawn": self.drawn, "fps": self.drawn / elapsed if elapsed else 0.0}
+        for name, times in (("compute", self.compute_times), ("draw", self.draw_times),
+                            ("latency", self.latencies)):
+            values = np.array(times) * 1e3 if times else np.zeros(1)
+            result[name + "_ms"] = {"mean": values.mean(), "p95": np.percentile(values, 95), "max": values.max()}
+        return result
+
+    def report(self):
+        s = self.summary()
+        lines = [f"Запросов: {s['requested']} (объединено {s['coalesced']}), кадров: посчитано {s['computed']}, "
+                 f"показано {s['drawn']}, отброшено устаревших {s['dropped']}, {s['fps']:.1f} кадр/с"]
+        for name, title in (("compute", "Расчет"), ("draw", "Отрисовка"), ("latency", "От события до показа")):
+            t = s[name + "_ms"]
+            lines.append(f"{title}: среднее {t['mean']:.1f} мс, p95 {t['p95']:.1f} мс, макс {t['max']:.1f} мс")
+        return "\n".join(lines)
+
+
+# Планировщик перерисовки. request(state) вызывается из обработчиков событий и сразу возвращает
+# управление: состояние запоминается, более старый необработанный запрос заменяется новым.
+# Рабочий поток выжидает debounce секунд (серия событий мыши сливается в один запрос), берет
+# последнее состояние и считает кадр функцией compute(state). Кадр показывается в потоке
+# интерфейса функцией draw(frame) по таймеру холста; кадр, который старше уже показанного
+# или вытеснен более новым, отбрасывается. Последнее состояние всегда будет показано.
+class RenderScheduler:
+    def __init__(self, canvas, compute, draw, debounce=0.01, poll_interval=15):
+        self.canvas = canvas
+        self.compute = compute
+        self.draw = draw
+        self.debounce = debounce
+        self.stats = FrameStats()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._generation = 0
+        self._pending = None  # (поколение, состояние, время запроса)
+        self._ready = None    # (поколение, кадр, время запроса)
+        self._shown = 0       # Поколение показанного кадра
+        self._thread = threading.Thread(target=self._run, name="render-worker", daemon=True)
+        self._timer = canvas.new_timer(interval=poll_interval)
+        self._timer.add_callback(self.poll)
+
+    def start(self):
+        self._thread.start()
+        self._timer.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        self._timer.stop()
+        self._thread.join(timeout=1.0)
+
+    def request(self, state):
+        with self._lock:
+            self._generation += 1
+            if self._pending is not None:
+                self.stats.coalesced += 1
+            self._pending = (self._generation, state, time.perf_counter())
+            self.stats.requested += 1
+        self._wakeup.set()
+
+    # Ожидание всех запросов (для неинтерактивного запуска и замеров)
+    def wait_idle(self, timeout=10.0):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            self.poll()
+            with self._lock:
+                if self._shown == self._generation:
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait()
+            time.sleep(self.debounce)
+            self._wakeup.clear()
+            with self._lock:
+                job, self._pending = self._pending, None
+            if job is None or self._stopped:
+                continue
+            generation, state, requested_at = job
+            start = time.perf_counter()
+            try:
+                frame = self.compute(state)
+            except Exception:
+                traceback.print_exc()
+                continue
+            with self._lock:
+                self.stats.computed += 1
+                self.stats.compute_times.append(time.perf_counter() - start)
+                if self._ready is not None:
+                    self.stats.dropped += 1  # Предыдущий кадр так и не был показан
+                self._ready = (generation, frame, requested_at)
+
+    # Показ готового кадра; вызывается таймером в потоке интерфейса
+    def poll(self):
+        with self._lock:
+            ready, self._ready = self._ready, None
+        if ready is None:
+            return
+        generation, frame, requested_at = ready
+        if generation <= self._shown:
+            with self._lock:
+                self.stats.dropped += 1
+            return
+        start = time.perf_counter()
+        self.draw(frame)
+        self.canvas.draw()
+        end = time.perf_counter()
+        # Статистику меняет и рабочий поток, поэтому все обновления — под блокировкой
+        with self._lock:
+            self._shown = generation
+            self.stats.drawn += 1
+            self.stats.draw_times.append(end - start)
+            self.stats.latencies.append(end - requested_at)
+
+
+# Геометрия кадра, подготовленная в рабочем потоке: линии тока со стрелками и эквипотенциали.
+# streamplot и contour строятся на собственной фигуре рабочего потока без окна, а в поток
+# интерфейса передаются только координаты линий.
+class FieldGeometry:
+    def __init__(self, streamlines, arrows, contours):
+        self.streamlines = streamlines  # Список массивов (n, 2) — линии тока
+        self.arrows = arrows            # Пары (хвост, острие) стрелок на линиях тока
+        self.contours = contours        # Пути эквипотенциалей (по одному на уровень)
+
+
+_offscreen = threading.local()
+
+
+# Линии тока поля (Ex, Ey) и эквипотенциали V — те же, что строят ax.streamplot и ax.contour
+def trace_field(X, Y, V, Ex, Ey, density=1.5, levels=20):
+    if not hasattr(_offscreen, "ax"):
+        _offscreen.ax = Figure().add_subplot()
+    ax = _offscreen.ax
+    ax.cla()
+    stream = ax.streamplot(X, Y, Ex, Ey, density=density, **_NO_ARROWS)
+    streamlines = stream.lines.get_segments()
+    contours = ax.contour(X, Y, V, levels=levels).get_paths()
+
+    # Стрелка в середине каждой линии тока по длине дуги (как в streamplot)
+    arrows = []
+    for line in streamlines:
+        if len(line) < 2:
+            continue
+        s = np.cumsum(np.hypot(np.diff(line[:, 0]), np.diff(line[:, 1])))
+        idx = np.searchsorted(s, s[-1] / 2)
+        arrows.append((tuple(line[idx]), tuple(line[idx:idx + 2].mean(axis=0))))
+    return FieldGeometry(streamlines, arrows, contours)
+
+
+# Отрисовка подготовленной геометрии на осях (в потоке интерфейса). Стрелки добавляются через
+# add_artist, а не add_patch: пересчет пределов осей по каждой стрелке занимает ~1 мс,
+# а пределы все равно задаются по сетке
+def draw_geometry(ax, geometry, stream_color='green', contour_color='red', linewidth=0.8):
+    ax.add_collection(LineCollection(geometry.streamlines, colors=stream_color, linewidths=linewidth))
+    for tail, head in geometry.arrows:
+        ax.add_artist(FancyArrowPatch(tail, head, arrowstyle='-|>', mutation_scale=10,
+                                      color=stream_color, linewidth=linewidth))
+    ax.add_collection(PathCollection(geometry.contours, facecolors='none', edgecolors=contour_color,
+                                     linewidths=linewidth))
@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Circle, FancyArrow
 from matplotlib.animation import FuncAnimation
 
+from render_scheduler import RenderScheduler, draw_geometry, trace_field
+
 # Константы
 k = 8.9875e9  # Константа Кулона (Н·м²/Кл²)
 charges = []  # Список зарядов
@@ -18,6 +20,7 @@ X, Y = np.meshgrid(x, y)
 
 fig, ax = plt.subplots(figsize=(10, 8))
 charge_patches = []  # Графические элементы для зарядов
+scheduler = None  # Планировщик перерисовки (создается в main)
 
 
 def calculate_potential(charges, X, Y):
@@ -56,27 +59,44 @@ def calculate_dipole_force_and_torque(dipole, charges):
     return Fx, Fy, torque
 
 
+# Запрос перерисовки: в планировщик передается снимок зарядов и диполя, поле и линии
+# считаются в рабочем потоке, а этот вызов сразу возвращает управление
 def update_field():
+    snapshot = [dict(charge) for charge in charges]
+    scheduler.request((snapshot, dict(dipole) if dipole else None))
+
+
+# Расчет кадра в рабочем потоке
+def compute_frame(state):
+    snapshot, dipole_state = state
+    V = calculate_potential(snapshot, X, Y)
+    Ex, Ey = calculate_field(snapshot, X, Y)
+    geometry = trace_field(X, Y, V, Ex, Ey, density=1.5, levels=20)
+    forces = calculate_dipole_force_and_torque(dipole_state, snapshot) if dipole_state else None
+    return snapshot, dipole_state, geometry, forces
+
+
+# Показ кадра в потоке интерфейса
+def draw_frame(frame):
+    snapshot, dipole_state, geometry, forces = frame
     ax.clear()
-    V = calculate_potential(charges, X, Y)
-    Ex, Ey = calculate_field(charges, X, Y)
-    ax.streamplot(X, Y, Ex, Ey, color='green', density=1.5, linewidth=0.8)
-    ax.contour(X, Y, V, levels=20, colors='red', linewidths=0.8)
+    draw_geometry(ax, geometry)
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(y[0], y[-1])
     ax.axis('equal')
     ax.grid(True)
     charge_patches.clear()
-    for charge in charges:
+    for charge in snapshot:
         color = 'red' if charge["q"] > 0 else 'blue'
         patch = Circle(charge["pos"], 0.05, color=color)
         charge_patches.append(patch)
         ax.add_patch(patch)
-    if dipole:
-        x_dip, y_dip = dipole["pos"]
-        px, py = dipole["moment"]
+    if dipole_state:
+        x_dip, y_dip = dipole_state["pos"]
+        px, py = dipole_state["moment"]
         ax.add_patch(FancyArrow(x_dip, y_dip, px * 0.2, py * 0.2, color='purple', width=0.02))
-        Fx, Fy, torque = calculate_dipole_force_and_torque(dipole, charges)
+        Fx, Fy, torque = forces
         ax.text(-1.8, 1.8, f"F_x: {Fx:.2e} N\nF_y: {Fy:.2e} N\nTorque: {torque:.2e} N·m", color='purple')
-    plt.draw()  # Явно перерисовываем график после обновления
 
 
 def on_click(event):
@@ -135,7 +155,16 @@ def on_key(event):
         print("Режим добавления диполя:", "Включен" if add_dipole_mode else "Выключен")
 
 
+# Закрытие окна: остановка рабочего потока и статистика кадров
+def on_close(event):
+    scheduler.stop()
+    print(scheduler.stats.report())
+
+
 def main():
+    global scheduler
+    scheduler = RenderScheduler(fig.canvas, compute_frame, draw_frame).start()
+    fig.canvas.mpl_connect('close_event', on_close)
     fig.canvas.mpl_connect('button_press_event', on_click)
     fig.canvas.mpl_connect('button_release_event', on_release)
     fig.canvas.mpl_connect('motion_notify_event', on_motion)
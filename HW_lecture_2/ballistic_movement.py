@@ -1,32 +1,135 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 g = 9.81
 
 
-def trajectory(v0, angle, h0):
+# Траектория тела. v0, angle и h0 могут быть массивами: они транслируются друг с другом,
+# а последняя ось результата — num моментов времени от 0 до падения.
+def trajectory(v0, angle, h0, num=500):
+    v0, angle, h0 = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (v0, angle, h0)))
+    t_flight = flight_time(v0, angle, h0)
     theta = np.radians(angle)
-    t_flight = (v0 * np.sin(theta) + np.sqrt((v0 * np.sin(theta)) ** 2 + 2 * g * h0)) / g
-    t = np.linspace(0, t_flight, num=500)
-    x = v0 * np.cos(theta) * t
-    y = h0 + v0 * np.sin(theta) * t - 0.5 * g * t ** 2
+    t = np.linspace(0, t_flight, num=num, axis=-1)
+    x = (v0 * np.cos(theta))[..., None] * t
+    y = h0[..., None] + (v0 * np.sin(theta))[..., None] * t - 0.5 * g * t ** 2
     return t, x, y
 
 
+# Скорость тела. Если t получено из trajectory() для массивов параметров (у t на одну ось
+# больше, чем у параметров), параметры транслируются по первым осям t.
 def velocity(v0, angle, t):
+    v0, angle = np.asarray(v0, dtype=float), np.asarray(angle, dtype=float)
     theta = np.radians(angle)
+    t = np.asarray(t, dtype=float)
     vx = v0 * np.cos(theta)
-    vy = v0 * np.sin(theta) - g * t
+    vy0 = v0 * np.sin(theta)
+    if t.ndim == np.ndim(vx) + 1 and np.ndim(vx) > 0:
+        vx, vy0 = vx[..., None], vy0[..., None]
+    vy = vy0 - g * t
     v = np.sqrt(vx ** 2 + vy ** 2)
     return vx, vy, v
 
 
-def animate_ballistic_motion(h0, v0, angle):
-    t, x, y = trajectory(v0, angle, h0)
-    vx, vy, v = velocity(v0, angle, t)
+# Аналитические запросы к траектории за O(1). Все функции принимают скаляры или массивы
+# (v0, angle, h0 и т.д. транслируются по правилам NumPy) и не строят траекторию целиком.
+
+# Время полета до падения на землю (y = 0)
+def flight_time(v0, angle, h0):
+    theta = np.radians(angle)
+    vy0 = v0 * np.sin(theta)
+    return (vy0 + np.sqrt(vy0 ** 2 + 2 * g * h0)) / g
+
+
+# Дальность полета
+def flight_range(v0, angle, h0):
+    return v0 * np.cos(np.radians(angle)) * flight_time(v0, angle, h0)
+
+
+# Высшая точка траектории: время, координата x и высота. При броске вниз (angle <= 0)
+# высшей точкой считается точка броска.
+def apex(v0, angle, h0):
+    theta = np.radians(angle)
+    vx, vy0 = v0 * np.cos(theta), v0 * np.sin(theta)
+    t_apex = np.maximum(vy0, 0) / g
+    return t_apex, vx * t_apex, h0 + vy0 * t_apex - 0.5 * g * t_apex ** 2
+
+
+# Время, за которое тело достигает координаты x. Если тело туда не долетает, возвращается nan.
+def time_to_x(v0, angle, h0, x):
+    vx = v0 * np.cos(np.radians(angle))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.asarray(x, dtype=float) / vx
+    return np.where((t >= 0) & (t <= flight_time(v0, angle, h0)), t, np.nan)
+
+
+# Модуль скорости в момент времени t
+def speed_at(v0, angle, t):
+    theta = np.radians(angle)
+    return np.hypot(v0 * np.cos(theta), v0 * np.sin(theta) - g * np.asarray(t, dtype=float))
+
+
+# Адаптивная выборка точек траектории. Точки расставляются равномерно по углу наклона
+# касательной, поэтому их больше там, где кривизна g * vx / v^3 велика (около вершины),
+# и меньше на почти прямых участках. max_turn — максимальный поворот касательной
+# между соседними точками в градусах. Возвращает t, x, y, как и trajectory().
+# Число точек зависит от параметров, поэтому v0, angle и h0 должны быть числами, а не массивами.
+def adaptive_trajectory(v0, angle, h0, max_turn=1.0):
+    if np.ndim(v0) or np.ndim(angle) or np.ndim(h0):
+        raise ValueError("adaptive_trajectory строит одну траекторию: v0, angle и h0 должны быть числами.")
+    v0, angle, h0 = float(v0), float(angle), float(h0)
+    theta = np.radians(angle)
+    vx, vy0 = v0 * np.cos(theta), v0 * np.sin(theta)
+    t_flight = flight_time(v0, angle, h0)
+    if np.isclose(vx, 0):
+        # Вертикальный бросок: траектория — отрезок, достаточно начала, вершины и конца
+        t = np.unique([0, max(vy0, 0) / g, t_flight])
+    else:
+        psi_start = np.arctan2(vy0, vx)
+        psi_end = np.arctan2(vy0 - g * t_flight, vx)
+        n = max(int(np.ceil(np.degrees(psi_start - psi_end) / max_turn)), 1) + 1
+        psi = np.linspace(psi_start, psi_end, n)
+        t = (vy0 - vx * np.tan(psi)) / g
+        t[0], t[-1] = 0, t_flight
+    x = vx * t
+    y = h0 + vy0 * t - 0.5 * g * t ** 2
+    return t, x, y
+
+
+# Таблица характеристик для множества вариантов броска за один векторизованный вызов:
+# время полета, дальность и высота высшей точки для каждой комбинации (v0, angle, h0).
+def launch_table(v0, angle, h0):
+    v0, angle, h0 = (np.asarray(a, dtype=float) for a in (v0, angle, h0))
+    t_flight = flight_time(v0, angle, h0)
+    x_range = v0 * np.cos(np.radians(angle)) * t_flight
+    y_apex = apex(v0, angle, h0)[2]
+    return t_flight, x_range, y_apex
 
-    fig, axes = plt.subplots(3, 1, figsize=(8, 10))
+
+# Угол броска (в градусах), дающий максимальную дальность, и сама дальность для каждой пары (v0, h0).
+# Из условия dR/dθ = 0: tg θ = v0 / sqrt(v0^2 + 2 * g * h0), R_max = v0 / g * sqrt(v0^2 + 2 * g * h0).
+def max_range_angle(v0, h0):
+    root = np.sqrt(v0 ** 2 + 2 * g * h0)
+    return np.degrees(np.arctan2(v0, root)), v0 * root / g
+
+
+# Построение трех графиков на фигуре fig. Пределы осей вычисляются один раз здесь,
+# а не в каждом кадре. Возвращает линии графиков.
+def _build_figure(fig, t, x, y, v):
+    axes = fig.subplots(3, 1)
     fig.suptitle("Баллистическое движение тела", fontsize=16)
 
     # График траектории
@@ -52,31 +155,239 @@ def animate_ballistic_motion(h0, v0, angle):
     y_line, = axes[2].plot([], [], 'm', label="y(t)")
     axes[2].legend()
 
-    def update(frame):
-        traj_line.set_data(x[:frame], y[:frame])
-        speed_line.set_data(t[:frame], v[:frame])
-        x_line.set_data(t[:frame], x[:frame])
-        y_line.set_data(t[:frame], y[:frame])
+    x_max, y_max, t_max, v_max = x.max(), y.max(), t.max(), v.max()
+    axes[0].set_xlim(0, x_max)
+    axes[0].set_ylim(0, y_max + 1)
+    axes[1].set_xlim(0, t_max)
+    axes[1].set_ylim(0, v_max + 1)
+    axes[2].set_xlim(0, t_max)
+    axes[2].set_ylim(0, max(x_max, y_max) + 1)
+    fig.tight_layout()
 
-        axes[0].set_xlim(0, max(x))
-        axes[0].set_ylim(0, max(y) + 1)
+    return traj_line, speed_line, x_line, y_line
 
-        axes[1].set_xlim(0, max(t))
-        axes[1].set_ylim(0, max(v) + 1)
 
-        axes[2].set_xlim(0, max(t))
-        axes[2].set_ylim(0, max(max(x), max(y)) + 1)
+# Данные, построенные на первых frame точках
+def _set_frame(lines, t, x, y, v, frame):
+    traj_line, speed_line, x_line, y_line = lines
+    traj_line.set_data(x[:frame], y[:frame])
+    speed_line.set_data(t[:frame], v[:frame])
+    x_line.set_data(t[:frame], x[:frame])
+    y_line.set_data(t[:frame], y[:frame])
+    return lines
 
-        return traj_line, speed_line, x_line, y_line
+
+# Данные для графиков. Для анимации нужны равные шаги по времени, а для неподвижного графика
+# достаточно адаптивной выборки: точек меньше, а кривая так же гладкая.
+def _motion_data(h0, v0, angle, adaptive=False):
+    t, x, y = adaptive_trajectory(v0, angle, h0) if adaptive else trajectory(v0, angle, h0)
+    v = velocity(v0, angle, t)[2]
+    return t, x, y, v
+
+
+# Неподвижные графики всего полета сразу, без анимации
+def plot_ballistic_motion(h0, v0, angle):
+    t, x, y, v = _motion_data(h0, v0, angle, adaptive=True)
+    fig = plt.figure(figsize=(8, 10))
+    lines = _build_figure(fig, t, x, y, v)
+    _set_frame(lines, t, x, y, v, len(t))
+    plt.show()
+
+
+def animate_ballistic_motion(h0, v0, angle):
+    t, x, y, v = _motion_data(h0, v0, angle)
+    fig = plt.figure(figsize=(8, 10))
+    lines = _build_figure(fig, t, x, y, v)
+
+    def update(frame):
+        return _set_frame(lines, t, x, y, v, frame)
 
     ani = FuncAnimation(fig, update, frames=len(t), interval=20, blit=True, repeat=False)
-    plt.tight_layout()
     plt.show()
 
 
-if __name__ == "__main__":
-    h0 = float(input("Введите начальную высоту (м): "))
-    v0 = float(input("Введите начальную скорость (м/с): "))
-    angle = float(input("Введите угол (градусы): "))
+# Состояние процесса-исполнителя при экспорте: фигура строится один раз на процесс
+_export_state = {}
+
+
+def _init_export_worker(h0, v0, angle, dpi):
+    t, x, y, v = _motion_data(h0, v0, angle)
+    fig = Figure(figsize=(8, 10), dpi=dpi)
+    FigureCanvasAgg(fig)
+    lines = _build_figure(fig, t, x, y, v)
+    _export_state.update(fig=fig, lines=lines, data=(t, x, y, v))
+
+
+# Отрисовка кадров без экрана (Agg). Если задан шаблон имени PNG, кадры сохраняются в файлы,
+# иначе возвращаются как массивы RGBA. Файлы нумеруются по месту кадра в выходной
+# последовательности (first_index, first_index + 1, ...), а не по номеру точки траектории,
+# чтобы при прореживании в последовательности не было пропусков.
+def _render_frames(frames, png_pattern=None, first_index=0):
+    fig, lines, data = _export_state["fig"], _export_state["lines"], _export_state["data"]
+    images = []
+    for index, frame in enumerate(frames, start=first_index):
+        _set_frame(lines, *data, frame)
+        if png_pattern is not None:
+            fig.savefig(png_pattern % index)
+        else:
+            fig.canvas.draw()
+            images.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+    return images
+
+
+def _ffmpeg_path():
+    return shutil.which(matplotlib.rcParams["animation.ffmpeg_path"]) or shutil.which("ffmpeg")
+
+
+# Сохранение кадров в видео через ffmpeg: кадры передаются в стандартный ввод в сыром виде
+class _FFmpegSink:
+    def __init__(self, output, fps, ffmpeg):
+        self.output, self.fps, self.ffmpeg, self.process = output, fps, ffmpeg, None
+
+    def write(self, image):
+        if self.process is None:
+            height, width = image.shape[:2]
+            cmd = [self.ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                   "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                   "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+            if not self.output.lower().endswith(".gif"):
+                cmd += ["-vcodec", "libx264", "-pix_fmt", "yuv420p"]
+            self.process = subprocess.Popen(cmd + [self.output], stdin=subprocess.PIPE)
+        self.process.stdin.write(image.tobytes())
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError("ffmpeg завершился с ошибкой.")
+
+
+# Сохранение GIF средствами Pillow, если ffmpeg недоступен
+class _PillowGifSink:
+    def __init__(self, output, fps):
+        self.output, self.duration, self.frames = output, 1000 / fps, []
+
+    def write(self, image):
+        from PIL import Image
+        self.frames.append(Image.fromarray(image).convert("RGB").quantize())
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.output, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0)
 
-    animate_ballistic_motion(h0, v0, angle)
+
+# Экспорт анимации без экрана в MP4, GIF или последовательность PNG.
+# output: "*.mp4", "*.gif" или шаблон имени PNG (например "frames/frame_%04d.png").
+# step — прореживание кадров (каждый step-й кадр), workers — число процессов для отрисовки.
+def export_ballistic_motion(h0, v0, angle, output, step=1, fps=50, dpi=80, workers=None):
+    n_points = len(trajectory(v0, angle, h0)[0])
+    frames = list(range(1, n_points + 1, step))
+    if frames[-1] != n_points:
+        frames.append(n_points)
+    workers = max(1, min(workers or os.cpu_count(), len(frames)))
+    # Последовательные пакеты кадров, по несколько на процесс для равномерной загрузки
+    batch_size = max(1, len(frames) // (workers * 4))
+    starts = range(0, len(frames), batch_size)
+    batches = [frames[i:i + batch_size] for i in starts]
+
+    extension = os.path.splitext(output)[1].lower()
+    ffmpeg = _ffmpeg_path()
+    if extension == ".png":
+        png_pattern, sink = output, None
+    elif extension == ".gif" and ffmpeg is None:
+        png_pattern, sink = None, _PillowGifSink(output, fps)
+    elif ffmpeg is None:
+        raise RuntimeError(f"Для экспорта в {extension} нужен ffmpeg.")
+    else:
+        png_pattern, sink = None, _FFmpegSink(output, fps, ffmpeg)
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    initargs = (h0, v0, angle, dpi)
+    try:
+        if workers == 1:
+            _init_export_worker(*initargs)
+            results = (_render_frames(batch, png_pattern, start) for batch, start in zip(batches, starts))
+            _consume_frames(results, sink)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker, initargs=initargs) as pool:
+                results = _bounded_map(pool, _render_frames, batches, [png_pattern] * len(batches), starts,
+                                       window=2 * workers)
+                _consume_frames(results, sink)
+    finally:
+        if sink is not None:
+            sink.close()
+    return len(frames)
+
+
+# Результаты pool.submit(function, *args) в порядке аргументов (кадры попадают в видео
+# последовательно), но одновременно выполняется и ждет обработки не больше window заданий:
+# иначе готовые кадры RGBA всех пакетов могли бы накопиться в памяти.
+def _bounded_map(pool, function, *iterables, window):
+    pending = deque()
+    for args in zip(*iterables):
+        if len(pending) == window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(function, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _consume_frames(results, sink):
+    for images in results:
+        for image in images:
+            sink.write(image)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Баллистическое движение тела. Без аргументов запускается интерактивный режим."
+    )
+    parser.add_argument("--h0", type=float, required=True, help="Начальная высота (м).")
+    parser.add_argument("--v0", type=float, required=True, help="Начальная скорость (м/с).")
+    parser.add_argument("--angle", type=float, required=True, help="Угол броска (градусы).")
+    parser.add_argument("--static", action="store_true", help="Показать графики всего полета без анимации.")
+    parser.add_argument("--export", help="Экспорт без экрана: файл .mp4, .gif или шаблон PNG (frame_%%04d.png).")
+    parser.add_argument("--step", type=int, default=1, help="Прореживание: сохранять каждый step-й кадр.")
+    parser.add_argument("--fps", type=int, default=50, help="Частота кадров видео.")
+    parser.add_argument("--dpi", type=int, default=80, help="Разрешение кадров.")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов для отрисовки кадров.")
+    args = parser.parse_args(argv)
+    if args.step <= 0:
+        parser.error("шаг прореживания должен быть положительным")
+    if args.export and os.path.splitext(args.export)[1].lower() == ".png" and "%" not in args.export:
+        parser.error("шаблон PNG должен содержать номер кадра, например frame_%%04d.png")
+    if args.export and os.path.splitext(args.export)[1].lower() not in (".png", ".gif") and _ffmpeg_path() is None:
+        parser.error("для экспорта в видео нужен ffmpeg; установите его или сохраните анимацию в .gif или PNG")
+    return args
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        h0 = float(input("Введите начальную высоту (м): "))
+        v0 = float(input("Введите начальную скорость (м/с): "))
+        angle = float(input("Введите угол (градусы): "))
+        animate_ballistic_motion(h0, v0, angle)
+        return
+
+    args = parse_args(argv)
+    if args.export:
+        try:
+            n_frames = export_ballistic_motion(args.h0, args.v0, args.angle, args.export, args.step, args.fps,
+                                               args.dpi, args.workers)
+        except (RuntimeError, OSError) as e:
+            sys.exit(f"Ошибка экспорта: {e}")
+        print(f"Сохранено кадров: {n_frames}")
+    elif args.static:
+        plot_ballistic_motion(args.h0, args.v0, args.angle)
+    else:
+        animate_ballistic_motion(args.h0, args.v0, args.angle)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Нужно для исполняемого файла, собранного PyInstaller
+    main()
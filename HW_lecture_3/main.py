@@ -1,47 +1,124 @@
+import itertools
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
-# Ввод параметров
-R = float(input("Радиус колеса: "))
-V = float(input("Скорость центра масс колеса: "))
-frame_count = int(input("Количество кадров для анимации: "))
-
-# Время для вычислений
-t = np.linspace(0, 2 * np.pi, frame_count)
-
-# Угловая скорость
-omega = V / R
-
-# Траектория точки на ободе
-x = V * t - R * np.sin(omega * t)
-y = R - R * np.cos(omega * t)
-
-# Подготовка графика
-fig, ax = plt.subplots()
-ax.set_xlim(0, V * 2 * np.pi)
-ax.set_ylim(-R, 2 * R)
-line, = ax.plot([], [], lw=2, color="purple")
-trail, = ax.plot([], [], lw=1, color="blue")
-
-# Функция инициализации
-def init():
-    line.set_data([], [])
-    trail.set_data([], [])
-    return line, trail
-
-# Функция анимации
-def animate(i):
-    # Текущая точка и траектория
-    line.set_data([x[i]], [y[i]])
-    trail.set_data(x[:i + 1], y[:i + 1])
-    return line, trail
-
-# Создание анимации
-anim = FuncAnimation(fig, animate, init_func=init, frames=frame_count, interval=20, blit=True, repeat=False)
-
-plt.title('Анимация движения точки на ободе колеса')
-plt.xlabel('X')
-plt.ylabel('Y')
-plt.grid(True)
-plt.show()
+
+# Координаты точки, закрепленной на расстоянии d от центра колеса радиуса R (трохоида).
+# d = R — точка на ободе (циклоида), d < R — внутри колеса, d > R — снаружи.
+def trochoid_point(t, R, V, d):
+    omega = V / R  # Угловая скорость
+    x = V * t - d * np.sin(omega * t)
+    y = R - d * np.cos(omega * t)
+    return x, y
+
+
+# Бесконечный (или ограниченный frame_count кадрами) поток точек трохоиды.
+# Массив времени целиком не создается: каждый кадр вычисляется по своему номеру.
+def trochoid_stream(R, V, d, dt, frame_count=None):
+    frames = itertools.count() if frame_count is None else range(frame_count)
+    for i in frames:
+        t = i * dt
+        x, y = trochoid_point(t, R, V, d)
+        yield t, x, y
+
+
+# След фиксированной длины в кольцевом буфере. Каждая точка записывается дважды
+# (в позиции i и i + capacity), поэтому упорядоченный след всегда доступен как срез
+# без копирования, а стоимость кадра не зависит от длины прогона.
+# decimation — в след попадает каждая decimation-я точка.
+class TrailBuffer:
+    def __init__(self, capacity, decimation=1):
+        self.capacity = capacity
+        self.decimation = decimation
+        self._data = np.empty((2, 2 * capacity))
+        self._head = 0  # Позиция самой старой точки
+        self._size = 0
+        self._counter = 0
+
+    def push(self, x, y):
+        self._counter += 1
+        if (self._counter - 1) % self.decimation != 0:
+            return
+        if self._size < self.capacity:
+            i = self._size
+            self._size += 1
+        else:
+            i = self._head
+            self._head = (self._head + 1) % self.capacity
+        self._data[:, i] = self._data[:, i + self.capacity] = x, y
+
+    def view(self):
+        window = self._data[:, self._head:self._head + self._size]
+        return window[0], window[1]
+
+
+def read_parameters():
+    R = float(input("Радиус колеса: "))
+    V = float(input("Скорость центра масс колеса: "))
+    frame_count = int(input("Количество кадров для анимации (0 — бесконечная анимация): "))
+    d_text = input("Расстояние точки от центра колеса (Enter — точка на ободе): ").strip()
+    d = float(d_text) if d_text else R
+    trail_text = input("Длина следа в точках (Enter — весь след, для бесконечной анимации 1000): ").strip()
+    trail_length = int(trail_text) if trail_text else 0
+    decimation_text = input("Прореживание следа (Enter — каждая точка): ").strip()
+    decimation = int(decimation_text) if decimation_text else 1
+    return R, V, frame_count, d, trail_length, decimation
+
+
+def main():
+    R, V, frame_count, d, trail_length, decimation = read_parameters()
+    infinite = frame_count <= 0
+
+    # Шаг по времени: как и раньше, конечная анимация охватывает t от 0 до 2π,
+    # в бесконечной на один оборот колеса приходится 200 кадров
+    if infinite:
+        dt = 2 * np.pi * R / V / 200
+        capacity = trail_length or 1000
+    else:
+        dt = 2 * np.pi / max(frame_count - 1, 1)
+        capacity = trail_length or -(-frame_count // decimation)
+    trail_buffer = TrailBuffer(capacity, decimation)
+
+    # Подготовка графика
+    fig, ax = plt.subplots()
+    window = V * 2 * np.pi
+    span = max(R, d)
+    ax.set_xlim(0, window)
+    ax.set_ylim(R - 2 * span, R + span)
+    line, = ax.plot([], [], lw=2, color="purple")
+    trail, = ax.plot([], [], lw=1, color="blue")
+
+    # Функция инициализации
+    def init():
+        line.set_data([], [])
+        trail.set_data([], [])
+        return line, trail
+
+    # Функция анимации
+    def animate(frame):
+        # Текущая точка и след
+        t, x, y = frame
+        trail_buffer.push(x, y)
+        line.set_data([x], [y])
+        trail.set_data(*trail_buffer.view())
+        if infinite and x > window:
+            # Окно следует за точкой
+            ax.set_xlim(x - window, x)
+        return line, trail
+
+    frames = trochoid_stream(R, V, d, dt, None if infinite else frame_count)
+    # В бесконечном режиме оси сдвигаются, поэтому кадр перерисовывается целиком (blit=False)
+    anim = FuncAnimation(fig, animate, frames=frames, init_func=init, interval=20, blit=not infinite,
+                         repeat=False, cache_frame_data=False, save_count=None if infinite else frame_count)
+
+    plt.title('Анимация движения точки на ободе колеса')
+    plt.xlabel('X')
+    plt.ylabel('Y')
+    plt.grid(True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import numpy as np
+
+from kernels import BACKEND
+from particles import ParticleSystem, SpatialHash
+
+
+# Газ с одинаковыми начальными условиями для заданного вычислителя
+def make_gas(n, backend, seed=0):
+    box = np.sqrt(n) * 2.0
+    return ParticleSystem.random_gas(n, box, box, 0.5, 1.0, seed=seed, backend=backend)
+
+
+# Наибольшее расхождение положений и скоростей после n_steps шагов. Шагов немного: столкновения
+# усиливают ошибки округления, и на длинных прогонах траектории газа неизбежно расходятся.
+def check_parity(n, n_steps, dt):
+    systems = [make_gas(n, backend) for backend in ("numpy", "numba")]
+    for _ in range(n_steps):
+        for system in systems:
+            system.step(dt)
+    reference, other = systems
+    return max(np.abs(reference.pos - other.pos).max(), np.abs(reference.vel - other.vel).max())
+
+
+# Совпадение списков пар (вместе с порядком) у широкой фазы обоих вычислителей на перемешанном газе
+def check_pairs(n, n_steps, dt):
+    system = make_gas(n, "numpy")
+    for _ in range(n_steps):
+        system.step(dt)
+    pairs = [SpatialHash(system.width, system.height, backend=backend)(system.pos, system.radius)
+             for backend in ("numpy", "numba")]
+    return all(np.array_equal(a, b) for a, b in zip(*pairs))
+
+
+# Шагов в секунду (лучшее из repeat запусков по n_steps шагов)
+def measure(n, backend, n_steps, dt, repeat):
+    system = make_gas(n, backend)
+    system.step(dt)  # Компиляция ядер при первом вызове
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            system.step(dt)
+        best = min(best, time.perf_counter() - start)
+    return n_steps / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение вычислителей шага частиц: NumPy и Numba.")
+    parser.add_argument("--particles", type=int, nargs="+", default=[2, 1000, 100_000], help="Числа частиц.")
+    parser.add_argument("--steps", type=int, default=20, help="Шагов в одном замере.")
+    parser.add_argument("--dt", type=float, default=0.05, help="Шаг по времени.")
+    parser.add_argument("--repeat", type=int, default=3, help="Число повторов замера.")
+    args = parser.parse_args()
+
+    backends = ["numpy"] + (["numba"] if BACKEND == "numba" else [])
+    if len(backends) == 1:
+        print("Пакет numba не установлен, доступен только вычислитель NumPy.")
+    else:
+        print(f"Наибольшее расхождение после 20 шагов: {check_parity(1000, 20, args.dt):.2e}")
+        print(f"Пары широкой фазы совпадают: {'да' if check_pairs(5000, 200, args.dt) else 'нет'}")
+    for n in args.particles:
+        for backend in backends:
+            rate = measure(n, backend, args.steps, args.dt, args.repeat)
+            print(f"  {n:>7} частиц, {backend:>5}: {rate:10,.1f} шагов/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import heapq
+
+import numpy as np
+
+# Номера «партнеров» для столкновений со стенками
+WALL_X = -1  # Вертикальные стенки x = 0 и x = width
+WALL_Y = -2  # Горизонтальные стенки y = 0 и y = height
+
+
+# Событийное моделирование твердых дисков. Вместо шага по времени вычисляются точные моменты
+# ближайших столкновений со стенками и между частицами, они хранятся в очереди с приоритетом,
+# и система переносится сразу от одного события к следующему.
+#
+# Для каждой частицы в очереди держится только ближайшее столкновение со стенкой и ближайшее
+# столкновение с другой частицей. События не удаляются из очереди: у каждой частицы есть счетчик
+# столкновений, и событие, записанное при другом значении счетчика, при извлечении пропускается
+# (ленивая инвалидация). Если устарел только партнер, прогноз для частицы пересчитывается.
+#
+# Моделирование идет прямо в массивах ParticleSystem (положения, скорости, время).
+class EventDrivenSimulator:
+    def __init__(self, system):
+        self.system = system
+        self.count = np.zeros(len(system), dtype=np.int64)
+        self.queue = []
+        self.n_events = 0  # Обработанные столкновения
+        self.n_stale = 0  # Пропущенные устаревшие события
+        for i in range(len(system)):
+            self._predict(i)
+
+    # Время до ближайшего столкновения частицы i со стенкой и номер стенки
+    def _wall_event(self, i):
+        s = self.system
+        best, wall = np.inf, None
+        for axis, size, kind in ((0, s.width, WALL_X), (1, s.height, WALL_Y)):
+            v = s.vel[i, axis]
+            if v > 0:
+                dt = (size - s.radius[i] - s.pos[i, axis]) / v
+            elif v < 0:
+                dt = (s.radius[i] - s.pos[i, axis]) / v
+            else:
+                continue
+            if dt < best:
+                best, wall = max(dt, 0.0), kind
+        return best, wall
+
+    # Время до ближайшего столкновения частицы i с другой частицей (по всем частицам сразу)
+    def _pair_event(self, i):
+        s = self.system
+        dp = s.pos - s.pos[i]
+        dv = s.vel - s.vel[i]
+        b = np.einsum("ij,ij->i", dp, dv)
+        dvdv = np.einsum("ij,ij->i", dv, dv)
+        sigma = s.radius + s.radius[i]
+        d = b * b - dvdv * (np.einsum("ij,ij->i", dp, dp) - sigma * sigma)
+        valid = (b < 0) & (d >= 0)
+        valid[i] = False
+        if not valid.any():
+            return np.inf, None
+        dt = np.full(len(b), np.inf)
+        dt[valid] = -(b[valid] + np.sqrt(d[valid])) / dvdv[valid]
+        dt[valid & (dt < 0)] = 0.0  # Уже касающиеся и сближающиеся частицы
+        j = int(np.argmin(dt))
+        return dt[j], j
+
+    def _push(self, dt, i, j):
+        if np.isfinite(dt):
+            count_j = self.count[j] if j >= 0 else 0
+            heapq.heappush(self.queue, (self.system.time + dt, i, j, self.count[i], count_j))
+
+    def _predict(self, i, walls=True):
+        if walls:
+            dt, wall = self._wall_event(i)
+            self._push(dt, i, wall)
+        dt, j = self._pair_event(i)
+        self._push(dt, i, j)
+
+    # Перенос всех частиц вперед по прямым до момента t
+    def _drift(self, t):
+        s = self.system
+        s.pos += s.vel * (t - s.time)
+        s.time = t
+
+    def _collide(self, i, j):
+        s = self.system
+        if j == WALL_X:
+            s.vel[i, 0] *= -1
+        elif j == WALL_Y:
+            s.vel[i, 1] *= -1
+        else:
+            dp = s.pos[j] - s.pos[i]
+            normal = dp / np.sqrt(dp @ dp)
+            rel_speed = (s.vel[j] - s.vel[i]) @ normal
+            m_i, m_j = s.mass[i], s.mass[j]
+            impulse = 2 * m_i * m_j / (m_i + m_j) * rel_speed * normal
+            s.vel[i] += impulse / m_i
+            s.vel[j] -= impulse / m_j
+
+    # Обработка всех событий до момента t включительно и перенос системы в момент t.
+    # Возвращает число обработанных столкновений.
+    def advance_to(self, t):
+        processed = 0
+        while self.queue and self.queue[0][0] <= t:
+            event_time, i, j, count_i, count_j = heapq.heappop(self.queue)
+            if count_i != self.count[i]:
+                self.n_stale += 1
+                continue
+            if j >= 0 and count_j != self.count[j]:
+                # Партнер успел столкнуться с кем-то еще: пересчитываем прогноз для i
+                self.n_stale += 1
+                self._predict(i, walls=False)
+                continue
+            self._drift(event_time)
+            self._collide(i, j)
+            self.count[i] += 1
+            self._predict(i)
+            if j >= 0:
+                self.count[j] += 1
+                self._predict(j)
+            processed += 1
+        self._drift(t)
+        self.n_events += processed
+        return processed
+
+    # Кадры через равные промежутки времени dt: после каждого шага выдается время и положения
+    def frames(self, dt, n_frames=None):
+        k = 0
+        while n_frames is None or k < n_frames:
+            self.advance_to(self.system.time + dt)
+            yield self.system.time, self.system.pos
+            k += 1
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from event_driven import EventDrivenSimulator
+from particles import ParticleSystem
+from scenario import create_system
+
+CHECKPOINT_FILE = "checkpoint.npz"
+RUN_FILE = "run.json"
+
+
+# Запись траектории в отображаемые в память .npy файлы: positions.npy и velocities.npy
+# формы (кадры, частицы, 2) и times.npy. Файлы создаются сразу полного размера, поэтому
+# каждый кадр пишется на свое место и в памяти не накапливается.
+class TrajectoryRecorder:
+    def __init__(self, output_dir, n_frames, n_particles, dtype=np.float32, resume=False):
+        mode = "r+" if resume else "w+"
+        shape = (n_frames, n_particles, 2)
+
+        def open_array(name, array_shape, array_dtype):
+            path = os.path.join(output_dir, name)
+            if resume:
+                return np.lib.format.open_memmap(path, mode=mode)
+            return np.lib.format.open_memmap(path, mode=mode, dtype=array_dtype, shape=array_shape)
+
+        self.positions = open_array("positions.npy", shape, dtype)
+        self.velocities = open_array("velocities.npy", shape, dtype)
+        self.times = open_array("times.npy", (n_frames,), np.float64)
+
+    def write(self, frame, system):
+        self.positions[frame] = system.pos
+        self.velocities[frame] = system.vel
+        self.times[frame] = system.time
+
+    def flush(self):
+        self.positions.flush()
+        self.velocities.flush()
+        self.times.flush()
+
+
+# Контрольная точка: полное состояние системы и номер шага. Файл сначала пишется во временный,
+# а затем атомарно заменяет старый, поэтому прерванная запись не портит предыдущую точку.
+def save_checkpoint(output_dir, system, step, frame):
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, pos=system.pos, vel=system.vel, mass=system.mass, radius=system.radius,
+             box=np.array([system.width, system.height]), time=system.time, step=step, frame=frame)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(output_dir):
+    with np.load(os.path.join(output_dir, CHECKPOINT_FILE)) as data:
+        width, height = data["box"]
+        system = ParticleSystem(data["pos"], data["vel"], data["mass"], data["radius"], float(width), float(height))
+        system.time = float(data["time"])
+        return system, int(data["step"]), int(data["frame"])
+
+
+# Моделирование без окна и цикла событий matplotlib. Каждый stride-й шаг записывается
+# в траекторию, каждые checkpoint_every шагов сохраняется контрольная точка.
+# При event_driven шаг dt выполняется событийным методом (точные столкновения внутри шага).
+def run(system, output_dir, n_steps, dt, stride=1, checkpoint_every=10_000, event_driven=False,
+        dtype=np.float32, progress=print):
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {"n_steps": n_steps, "dt": dt, "stride": stride, "checkpoint_every": checkpoint_every,
+                "event_driven": event_driven, "dtype": np.dtype(dtype).name}
+    with open(os.path.join(output_dir, RUN_FILE), "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
+    recorder = TrajectoryRecorder(output_dir, n_steps // stride + 1, len(system), dtype)
+    recorder.write(0, system)
+    return _run_loop(system, recorder, output_dir, 0, settings, progress)
+
+
+# Продолжение прерванного прогона с последней контрольной точки. В событийном режиме очередь
+# событий строится заново, поэтому прогон совпадает с непрерывным с точностью до ошибок округления.
+def resume(output_dir, progress=print):
+    with open(os.path.join(output_dir, RUN_FILE), encoding="utf-8") as f:
+        settings = json.load(f)
+    system, step, _ = load_checkpoint(output_dir)
+    recorder = TrajectoryRecorder(output_dir, settings["n_steps"] // settings["stride"] + 1, len(system),
+                                  resume=True)
+    return _run_loop(system, recorder, output_dir, step, settings, progress)
+
+
+def _run_loop(system, recorder, output_dir, step, settings, progress):
+    n_steps, dt, stride = settings["n_steps"], settings["dt"], settings["stride"]
+    checkpoint_every = settings["checkpoint_every"]
+    simulator = EventDrivenSimulator(system) if settings["event_driven"] else None
+    start_step, start_time = step, time.perf_counter()
+
+    while step < n_steps:
+        if simulator is not None:
+            simulator.advance_to(system.time + dt)
+        else:
+            system.step(dt)
+        step += 1
+        if step % stride == 0:
+            recorder.write(step // stride, system)
+        if checkpoint_every and (step % checkpoint_every == 0 or step == n_steps):
+            recorder.flush()
+            save_checkpoint(output_dir, system, step, step // stride)
+            if progress is not None:
+                rate = (step - start_step) / (time.perf_counter() - start_time)
+                progress(f"Шаг {step}/{n_steps}, t = {system.time:.3f} с, {rate:,.0f} шагов/с")
+    recorder.flush()
+    return system
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Моделирование столкновений без графики с записью траектории.")
+    parser.add_argument("output_dir", help="Папка для траектории и контрольных точек.")
+    parser.add_argument("--resume", action="store_true", help="Продолжить прогон с последней контрольной точки.")
+    parser.add_argument("--steps", type=int, default=1_000_000, help="Число шагов.")
+    parser.add_argument("--dt", type=float, default=0.05, help="Шаг по времени (с).")
+    parser.add_argument("--stride", type=int, default=100, help="Записывать каждый stride-й шаг.")
+    parser.add_argument("--checkpoint-every", type=int, default=10_000, help="Шагов между контрольными точками.")
+    parser.add_argument("--event-driven", action="store_true", help="Событийное моделирование.")
+    parser.add_argument("--dtype", choices=("float32", "float64"), default="float32", help="Тип чисел в траектории.")
+    parser.add_argument("--particles", type=int, default=None,
+                        help="Число частиц газа. Без параметра моделируются два тела из scenario.py.")
+    parser.add_argument("--box", type=float, default=100.0, help="Размер оболочки для газа.")
+    parser.add_argument("--radius", type=float, default=0.5, help="Радиус частиц газа.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Начальная скорость частиц газа.")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно генератора случайных чисел.")
+    args = parser.parse_args(argv)
+    if args.steps <= 0 or args.stride <= 0:
+        parser.error("число шагов и stride должны быть положительными")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.resume:
+        resume(args.output_dir)
+        return
+    if args.particles is None:
+        system = create_system()
+    else:
+        system = ParticleSystem.random_gas(args.particles, args.box, args.box, args.radius, args.speed,
+                                           seed=args.seed)
+    run(system, args.output_dir, args.steps, args.dt, args.stride, args.checkpoint_every, args.event_driven,
+        args.dtype)
+
+
+if __name__ == "__main__":
+    main()
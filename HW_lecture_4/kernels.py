@@ -0,0 +1,128 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Вычислитель, выбранный при импорте: скомпилированные Numba циклы, если пакет установлен,
+# иначе векторизованные методы ParticleSystem
+BACKEND = "numba" if njit is not None else "numpy"
+
+
+# Перенос частиц на шаг dt и отражение от стенок (как ParticleSystem.step и reflect_walls)
+def drift_and_reflect(pos, vel, radius, dt, width, height):
+    size = (width, height)
+    for p in range(len(pos)):
+        for axis in range(2):
+            x = pos[p, axis] + vel[p, axis] * dt
+            low, high = radius[p], size[axis] - radius[p]
+            if x < low:
+                x = 2 * low - x
+                if vel[p, axis] < 0:
+                    vel[p, axis] = -vel[p, axis]
+            elif x > high:
+                x = 2 * high - x
+                if vel[p, axis] > 0:
+                    vel[p, axis] = -vel[p, axis]
+            pos[p, axis] = x
+
+
+# Пары пересекающихся частиц на равномерной сетке. Порядок пар тот же, что у SpatialHash:
+# сначала пары внутри ячеек, затем по каждому смещению из offsets, внутри блока — по номеру частицы.
+def grid_pairs(pos, radius, cell, nx, ny, offsets):
+    n = len(pos)
+    cx = np.empty(n, dtype=np.int64)
+    cy = np.empty(n, dtype=np.int64)
+    key = np.empty(n, dtype=np.int64)
+    counts = np.zeros(nx * ny + 1, dtype=np.int64)
+    for p in range(n):
+        cx[p] = min(max(int(pos[p, 0] // cell), 0), nx - 1)
+        cy[p] = min(max(int(pos[p, 1] // cell), 0), ny - 1)
+        key[p] = cx[p] * ny + cy[p]
+        counts[key[p] + 1] += 1
+
+    # Устойчивая сортировка подсчетом: частицы одной ячейки идут по возрастанию номера
+    starts = np.cumsum(counts)
+    fill = starts[:-1].copy()
+    order = np.empty(n, dtype=np.int64)
+    rank = np.empty(n, dtype=np.int64)
+    for p in range(n):
+        order[fill[key[p]]] = p
+        rank[p] = fill[key[p]]
+        fill[key[p]] += 1
+
+    first = np.empty(max(8 * n, 16), dtype=np.int64)
+    second = np.empty(max(8 * n, 16), dtype=np.int64)
+    found = 0
+    for block in range(len(offsets) + 1):
+        for p in range(n):
+            if block == 0:
+                lo, hi = rank[p] + 1, starts[key[p] + 1]
+            else:
+                ncx, ncy = cx[p] + offsets[block - 1, 0], cy[p] + offsets[block - 1, 1]
+                if ncx >= nx or ncy < 0 or ncy >= ny:
+                    continue
+                lo, hi = starts[ncx * ny + ncy], starts[ncx * ny + ncy + 1]
+            for s in range(lo, hi):
+                q = order[s]
+                dx, dy = pos[q, 0] - pos[p, 0], pos[q, 1] - pos[p, 1]
+                reach = radius[p] + radius[q]
+                if dx * dx + dy * dy < reach ** 2:
+                    if found == len(first):
+                        first = np.concatenate((first, np.empty(found, dtype=np.int64)))
+                        second = np.concatenate((second, np.empty(found, dtype=np.int64)))
+                    first[found] = p
+                    second[found] = q
+                    found += 1
+    return first[:found], second[:found]
+
+
+# Упругие столкновения пар (i, j) раундами независимых пар — те же правила, что и в
+# ParticleSystem.resolve_collisions. Возвращает число обработанных столкновений.
+def resolve_pairs(pos, vel, mass, i, j, max_rounds):
+    n_pairs = len(i)
+    active = np.ones(n_pairs, dtype=np.bool_)
+    first = np.empty(len(pos), dtype=np.int64)
+    resolved = 0
+    for _ in range(max_rounds):
+        # Остаются только сближающиеся пары
+        remaining = 0
+        for p in range(n_pairs):
+            if active[p]:
+                a, b = i[p], j[p]
+                dx, dy = pos[b, 0] - pos[a, 0], pos[b, 1] - pos[a, 1]
+                active[p] = (vel[b, 0] - vel[a, 0]) * dx + (vel[b, 1] - vel[a, 1]) * dy < 0
+                remaining += active[p]
+        if remaining == 0:
+            break
+
+        # Для каждой частицы — первая по порядку пара с ее участием
+        first[:] = n_pairs
+        for p in range(n_pairs - 1, -1, -1):
+            if active[p]:
+                first[i[p]] = p
+                first[j[p]] = p
+        for p in range(n_pairs):
+            a, b = i[p], j[p]
+            if not active[p] or first[a] != p or first[b] != p:
+                continue
+            dx, dy = pos[b, 0] - pos[a, 0], pos[b, 1] - pos[a, 1]
+            distance = np.sqrt(dx * dx + dy * dy)
+            nx, ny = dx / distance, dy / distance
+            rel_speed = (vel[b, 0] - vel[a, 0]) * nx + (vel[b, 1] - vel[a, 1]) * ny
+            m_a, m_b = mass[a], mass[b]
+            impulse = 2 * m_a * m_b / (m_a + m_b) * rel_speed
+            vel[a, 0] += impulse * nx / m_a
+            vel[a, 1] += impulse * ny / m_a
+            vel[b, 0] -= impulse * nx / m_b
+            vel[b, 1] -= impulse * ny / m_b
+            active[p] = False
+            resolved += 1
+    return resolved
+
+
+if njit is not None:
+    drift_and_reflect = njit(cache=True)(drift_and_reflect)
+    resolve_pairs = njit(cache=True)(resolve_pairs)
+    grid_pairs = njit(cache=True)(grid_pairs)
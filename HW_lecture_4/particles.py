@@ -0,0 +1,207 @@
+import numpy as np
+
+import kernels
+from kernels import BACKEND
+
+
+# Поиск пар пересекающихся частиц полным перебором (O(N²)). Расстояния считаются блоками строк,
+# чтобы матрица попарных расстояний не занимала больше block_elements элементов.
+# Возвращает массивы индексов i < j.
+def brute_force_pairs(pos, radius, block_elements=4_000_000):
+    n = len(pos)
+    rows = max(1, block_elements // max(n, 1))
+    pairs_i, pairs_j = [], []
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        delta = pos[None, :, :] - pos[start:stop, None, :]
+        dist2 = np.einsum("ijk,ijk->ij", delta, delta)
+        reach = radius[start:stop, None] + radius[None, :]
+        i, j = np.nonzero(dist2 < reach ** 2)
+        i += start
+        upper = j > i
+        pairs_i.append(i[upper])
+        pairs_j.append(j[upper])
+    if not pairs_i:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+# Широкая фаза на равномерной сетке (пространственный хеш). Частицы раскладываются по ячейкам
+# сортировкой по номеру ячейки, и проверяются только пары из соседних ячеек, поэтому затраты
+# растут линейно с числом частиц. Сетка перестраивается при каждом вызове.
+# Размер ячейки не меньше диаметра самой крупной частицы, и ячеек не больше CELLS_PER_PARTICLE
+# на частицу: чем мельче ячейки, тем меньше пар-кандидатов, но тем больше ячеек нужно обойти.
+#
+# NumPy-вычислитель на газе из benchmark.py (100 000 частиц) находит пары примерно за 40 мс
+# и делает около 19 шагов в секунду. Кандидатов всего около 75 000, и основное время уходит
+# на проходы по всем частицам: номера ячеек, сортировку и границы диапазонов для пяти блоков
+# соседей. Каждая операция NumPy — отдельный проход по памяти, поэтому дальнейшего ускорения
+# на этом пути ждать не стоит; для большего числа шагов нужен backend="numba".
+class SpatialHash:
+    # Половина окрестности ячейки: каждая пара соседних ячеек просматривается один раз
+    NEIGHBOUR_OFFSETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+    CELLS_PER_PARTICLE = 4
+
+    def __init__(self, width, height, cell_size=None, backend=BACKEND):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.backend = backend
+
+    def __call__(self, pos, radius):
+        n = len(pos)
+        if n < 2:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        min_cell = np.sqrt(self.width * self.height / (self.CELLS_PER_PARTICLE * n))
+        cell = self.cell_size or max(2 * radius.max(), min_cell)
+        nx = max(1, int(np.ceil(self.width / cell)))
+        ny = max(1, int(np.ceil(self.height / cell)))
+        if self.backend == "numba":
+            return kernels.grid_pairs(pos, radius, cell, nx, ny, np.array(self.NEIGHBOUR_OFFSETS))
+        # Координаты отдельными непрерывными массивами: выборка по индексам из них быстрее,
+        # чем выборка строк массива (N, 2)
+        x, y = pos[:, 0].copy(), pos[:, 1].copy()
+        cx = np.clip((x // cell).astype(np.intp), 0, nx - 1)
+        cy = np.clip((y // cell).astype(np.intp), 0, ny - 1)
+
+        key = cx * ny + cy
+        order = np.argsort(key, kind="stable")
+        ends = np.cumsum(np.bincount(key, minlength=nx * ny))
+        starts = np.empty_like(ends)
+        starts[0], starts[1:] = 0, ends[:-1]
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n)
+        sorted_x, sorted_y, sorted_radius = x[order], y[order], radius[order]
+
+        # Та же ячейка: только частицы, стоящие после данной в отсортированном порядке
+        blocks = [(np.arange(n), rank + 1, ends[key])]
+        for dx, dy in self.NEIGHBOUR_OFFSETS:
+            particles = np.flatnonzero((cx + dx < nx) & (cy + dy >= 0) & (cy + dy < ny))
+            neighbour = key[particles] + (dx * ny + dy)
+            blocks.append((particles, starts[neighbour], ends[neighbour]))
+
+        # Кандидаты проверяются поблочно, и дальше передаются только близкие пары, поэтому
+        # общие массивы всех кандидатов не создаются. Вторая частица пары берется из
+        # отсортированных массивов по номеру места, а ее номер нужен только для близких пар.
+        pairs_i, pairs_j = [], []
+        for particles, lo, hi in blocks:
+            i, slot = self._expand(particles, lo, hi)
+            delta_x = x[i] - sorted_x[slot]
+            delta_y = y[i] - sorted_y[slot]
+            reach = radius[i] + sorted_radius[slot]
+            close = delta_x * delta_x + delta_y * delta_y < reach * reach
+            pairs_i.append(i[close])
+            pairs_j.append(order[slot[close]])
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+    # Все пары (частица p, место в отсортированном диапазоне [lo, hi)) без циклов Python
+    @staticmethod
+    def _expand(particles, lo, hi):
+        counts = np.maximum(hi - lo, 0)
+        ends = np.cumsum(counts)
+        first = np.repeat(particles, counts)
+        slot = np.arange(ends[-1] if len(ends) else 0) + np.repeat(lo + counts - ends, counts)
+        return first, slot
+
+
+# Система частиц в прямоугольной оболочке [0, width] x [0, height].
+# Данные хранятся структурой массивов: положения и скорости (N, 2), массы и радиусы (N,).
+# broad_phase — функция (pos, radius) -> (i, j), находящая пары пересекающихся частиц;
+# по умолчанию используется пространственный хеш по размерам оболочки.
+# backend="numba" выполняет перенос, отражение от стенок, поиск пар и столкновения скомпилированными циклами.
+class ParticleSystem:
+    def __init__(self, positions, velocities, masses, radii, width, height, broad_phase=None, backend=BACKEND):
+        self.pos = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.vel = np.array(velocities, dtype=np.float64).reshape(-1, 2)
+        n = len(self.pos)
+        self.mass = np.broadcast_to(np.asarray(masses, dtype=np.float64), (n,)).copy()
+        self.radius = np.broadcast_to(np.asarray(radii, dtype=np.float64), (n,)).copy()
+        self.width = width
+        self.height = height
+        self.broad_phase = broad_phase or SpatialHash(width, height, backend=backend)
+        self.backend = backend
+        self.time = 0.0
+
+    # Идеальный газ: n одинаковых частиц на узлах сетки со случайными направлениями скоростей
+    @classmethod
+    def random_gas(cls, n, width, height, radius, speed, mass=1.0, seed=None, **kwargs):
+        rng = np.random.default_rng(seed)
+        cols = int(np.ceil(np.sqrt(n * width / height)))
+        rows = int(np.ceil(n / cols))
+        if 2 * radius * cols > width or 2 * radius * rows > height:
+            raise ValueError("Частицы такого радиуса не помещаются в оболочку.")
+        gx = (np.arange(cols) + 0.5) * width / cols
+        gy = (np.arange(rows) + 0.5) * height / rows
+        positions = np.stack(np.meshgrid(gx, gy), axis=-1).reshape(-1, 2)[:n]
+        angles = rng.uniform(0, 2 * np.pi, n)
+        velocities = speed * np.stack((np.cos(angles), np.sin(angles)), axis=-1)
+        return cls(positions, velocities, mass, radius, width, height, **kwargs)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def kinetic_energy(self):
+        return 0.5 * np.sum(self.mass * np.einsum("ij,ij->i", self.vel, self.vel))
+
+    def momentum(self):
+        return (self.mass[:, None] * self.vel).sum(axis=0)
+
+    # Шаг моделирования длительностью dt
+    def step(self, dt):
+        if self.backend == "numba":
+            kernels.drift_and_reflect(self.pos, self.vel, self.radius, dt, self.width, self.height)
+        else:
+            self.pos += self.vel * dt
+            self.reflect_walls()
+        self.resolve_collisions()
+        self.time += dt
+
+    # Отражение от стенок оболочки. Частица, вышедшая за стенку, зеркально возвращается внутрь,
+    # а составляющая скорости меняет знак, только если частица движется наружу.
+    def reflect_walls(self):
+        low = self.radius[:, None]
+        high = np.array([self.width, self.height]) - low
+        below = self.pos < low
+        above = self.pos > high
+        np.copyto(self.pos, 2 * low - self.pos, where=below)
+        np.copyto(self.pos, 2 * high - self.pos, where=above)
+        outward = (below & (self.vel < 0)) | (above & (self.vel > 0))
+        self.vel[outward] *= -1
+
+    # Абсолютно упругие столкновения всех пересекающихся и сближающихся пар.
+    # Пары обрабатываются раундами: в каждом раунде выбирается набор пар без общих частиц,
+    # и все они разрешаются одновременно. Поэтому каждое столкновение остается парным и
+    # энергия с импульсом сохраняются, даже если частица касается сразу нескольких соседей.
+    # Возвращает число обработанных столкновений.
+    def resolve_collisions(self, max_rounds=16):
+        i, j = self.broad_phase(self.pos, self.radius)
+        if self.backend == "numba":
+            return kernels.resolve_pairs(self.pos, self.vel, self.mass, i, j, max_rounds)
+        n = len(self)
+        resolved = 0
+        for _ in range(max_rounds):
+            delta_pos = self.pos[j] - self.pos[i]
+            approaching = np.einsum("ij,ij->i", self.vel[j] - self.vel[i], delta_pos) < 0
+            i, j, delta_pos = i[approaching], j[approaching], delta_pos[approaching]
+            if len(i) == 0:
+                break
+
+            # Для каждой частицы — первая по порядку пара с ее участием
+            order = np.arange(len(i))
+            first = np.full(n, len(i))
+            np.minimum.at(first, i, order)
+            np.minimum.at(first, j, order)
+            independent = (first[i] == order) & (first[j] == order)
+            a, b, d = i[independent], j[independent], delta_pos[independent]
+
+            distance = np.sqrt(np.einsum("ij,ij->i", d, d))
+            normal = d / distance[:, None]
+            rel_speed = np.einsum("ij,ij->i", self.vel[b] - self.vel[a], normal)
+            m_a, m_b = self.mass[a], self.mass[b]
+            impulse = (2 * m_a * m_b / (m_a + m_b) * rel_speed)[:, None] * normal
+            self.vel[a] += impulse / m_a[:, None]
+            self.vel[b] -= impulse / m_b[:, None]
+
+            resolved += len(a)
+            i, j = i[~independent], j[~independent]
+        return resolved
@@ -0,0 +1,30 @@
+import numpy as np
+
+from particles import ParticleSystem
+
+# Начальные условия модели из двух тел. Модуль не использует matplotlib, поэтому его
+# импортируют и окно анимации (main.py), и запуск без экрана (headless.py).
+
+# Параметры системы
+mass1 = 2.0  # Масса первого тела
+mass2 = 1.0  # Масса второго тела
+velocity1 = np.array([2.0, 3.0])  # Начальная скорость первого тела (x, y)
+velocity2 = np.array([-1.5, -2.0])  # Начальная скорость второго тела (x, y)
+position1 = np.array([2.0, 3.0])  # Начальная позиция первого тела (x, y)
+position2 = np.array([8.0, 5.0])  # Начальная позиция второго тела (x, y)
+radius = 0.25  # Радиус тел (тела сталкиваются на расстоянии 0.5)
+
+# Размеры оболочки
+width = 10.0
+height = 10.0
+
+
+def create_system():
+    return ParticleSystem(
+        positions=[position1, position2],
+        velocities=[velocity1, velocity2],
+        masses=[mass1, mass2],
+        radii=radius,
+        width=width,
+        height=height,
+    )
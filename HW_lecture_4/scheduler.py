@@ -0,0 +1,72 @@
+import time
+
+
+# Планировщик с фиксированным шагом физики, не зависящим от частоты отрисовки.
+# Реальное время, прошедшее между кадрами, накапливается, и за кадр выполняется столько шагов
+# длительностью dt, сколько в нем помещается. Если отрисовка не успевает, за кадр делается
+# несколько шагов (промежуточные состояния не рисуются — кадры пропускаются), а при перегрузке
+# число шагов ограничено max_substeps и лишнее время отбрасывается, чтобы не уйти в
+# бесконечное отставание. Для показа положение интерполируется между двумя последними шагами.
+#
+# step() выполняет один шаг физики, get_state() возвращает копию массива положений.
+# time_scale — сколько секунд модели проходит за секунду реального времени.
+class FixedStepScheduler:
+    def __init__(self, step, get_state, dt, max_substeps=10, time_scale=1.0, clock=time.perf_counter,
+                 stats_window=0.5):
+        self.step = step
+        self.get_state = get_state
+        self.dt = dt
+        self.max_substeps = max_substeps
+        self.time_scale = time_scale
+        self.clock = clock
+        self.stats_window = stats_window
+
+        self.accumulator = 0.0
+        self.previous = self.current = get_state()
+        self.last_time = None
+
+        self.fps = 0.0  # Кадров в секунду
+        self.steps_per_second = 0.0  # Шагов физики в секунду
+        self.dropped_time = 0.0  # Отброшенное при перегрузке время модели (с)
+        self.total_steps = 0
+        self.total_frames = 0
+        self._window_start = None
+        self._window_frames = 0
+        self._window_steps = 0
+
+    # Вызывается один раз на кадр. Возвращает положения, интерполированные к текущему моменту.
+    def advance(self):
+        now = self.clock()
+        if self.last_time is None:
+            self.last_time = self._window_start = now
+        self.accumulator += (now - self.last_time) * self.time_scale
+        self.last_time = now
+
+        limit = self.max_substeps * self.dt
+        if self.accumulator > limit:
+            self.dropped_time += self.accumulator - limit
+            self.accumulator = limit
+
+        steps = 0
+        while self.accumulator >= self.dt:
+            self.previous = self.current
+            self.step()
+            self.current = self.get_state()
+            self.accumulator -= self.dt
+            steps += 1
+
+        self._update_stats(now, steps)
+        alpha = self.accumulator / self.dt
+        return self.previous + (self.current - self.previous) * alpha
+
+    def _update_stats(self, now, steps):
+        self.total_frames += 1
+        self.total_steps += steps
+        self._window_frames += 1
+        self._window_steps += steps
+        elapsed = now - self._window_start
+        if elapsed >= self.stats_window:
+            self.fps = self._window_frames / elapsed
+            self.steps_per_second = self._window_steps / elapsed
+            self._window_start = now
+            self._window_frames = self._window_steps = 0
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import kernels
+from benchmark import make_gas
+from particles import SpatialHash
+
+# Без numba ядра выполняются обычным Python, поэтому совпадение проверяется и без компиляции
+N_PARTICLES = 400
+DT = 0.05
+
+
+# Газ после нескольких шагов NumPy-вычислителем: частицы перемешаны и многие касаются друг друга
+def mixed_gas(n_steps=20):
+    system = make_gas(N_PARTICLES, "numpy")
+    for _ in range(n_steps):
+        system.step(DT)
+    return system
+
+
+def test_drift_and_reflect_matches_numpy():
+    system = mixed_gas()
+    system.vel *= 20  # Многие частицы вылетают за стенки за один шаг
+    pos, vel = system.pos.copy(), system.vel.copy()
+    kernels.drift_and_reflect(pos, vel, system.radius, DT, system.width, system.height)
+    system.pos += system.vel * DT
+    system.reflect_walls()
+    np.testing.assert_array_equal(pos, system.pos)
+    np.testing.assert_array_equal(vel, system.vel)
+
+
+@pytest.mark.parametrize("cell_size", [None, 1.0, 3.5])
+def test_grid_pairs_match_spatial_hash(cell_size):
+    system = mixed_gas()
+    reference = SpatialHash(system.width, system.height, cell_size, backend="numpy")(system.pos, system.radius)
+    result = SpatialHash(system.width, system.height, cell_size, backend="numba")(system.pos, system.radius)
+    assert len(reference[0]) > 0
+    for a, b in zip(result, reference):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_resolve_pairs_matches_numpy():
+    system = mixed_gas()
+    # Перенос без столкновений: сближающиеся пары остаются неразрешенными
+    system.pos += system.vel * DT
+    system.reflect_walls()
+    i, j = system.broad_phase(system.pos, system.radius)
+    vel = system.vel.copy()
+    resolved = kernels.resolve_pairs(system.pos, vel, system.mass, i, j, 16)
+    assert resolved == system.resolve_collisions() > 0
+    np.testing.assert_allclose(vel, system.vel, rtol=1e-12, atol=1e-12)
+
+
+def test_step_matches_numpy():
+    systems = [make_gas(N_PARTICLES, backend) for backend in ("numpy", "numba")]
+    for _ in range(10):
+        for system in systems:
+            system.step(DT)
+    reference, result = systems
+    np.testing.assert_allclose(result.pos, reference.pos, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(result.vel, reference.vel, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import numpy as np
+
+from kernels import BACKEND
+from main import runge_kutta_4
+
+# Наборы параметров (v0, angle, y0, k, модель) для проверки совпадения результатов
+CASES = [
+    (20, 45, 0, 0.1, "linear"),
+    (35, 70, 10, 1.5, "linear"),
+    (10, 0, 50, 0.0, "linear"),
+    (20, 45, 0, 0.01, "quadratic"),
+    (50, 30, 5, 0.05, "quadratic"),
+]
+
+
+# Наибольшее расхождение траекторий двух вычислителей по всем наборам параметров
+def check_parity(backends, dt, stride):
+    worst = 0.0
+    for v0, angle, y0, k, drag in CASES:
+        results = [runge_kutta_4(v0, angle, y0, k, dt=dt, stride=stride, drag=drag, backend=b) for b in backends]
+        reference = np.array(results[0])
+        for other in results[1:]:
+            other = np.array(other)
+            if other.shape != reference.shape:
+                raise AssertionError(f"Разное число точек для {v0, angle, y0, k, drag}: "
+                                     f"{reference.shape} и {other.shape}")
+            worst = max(worst, np.abs(other - reference).max())
+    return worst
+
+
+# Время одного расчета траектории (лучшее из repeat запусков)
+def measure(backend, dt, repeat):
+    runge_kutta_4(20, 45, 0, 0.1, dt=dt, backend=backend)  # Компиляция ядра при первом вызове
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        runge_kutta_4(20, 45, 0, 0.1, dt=dt, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение вычислителей RK4: NumPy и Numba.")
+    parser.add_argument("--dt", type=float, default=0.001, help="Шаг по времени.")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторов замера.")
+    args = parser.parse_args()
+
+    backends = ["numpy"] + (["numba"] if BACKEND == "numba" else [])
+    if len(backends) == 1:
+        print("Пакет numba не установлен, доступен только вычислитель NumPy.")
+    else:
+        for stride in (1, 7):
+            print(f"Наибольшее расхождение (stride={stride}): {check_parity(backends, 0.01, stride):.2e}")
+    for backend in backends:
+        elapsed = measure(backend, args.dt, args.repeat)
+        steps = int(2.76 / args.dt)
+        print(f"  {backend:>5}: {elapsed * 1e3:8.2f} мс на траекторию ({steps / elapsed:,.0f} шагов/с)")
+
+
+if __name__ == "__main__":
+    main()
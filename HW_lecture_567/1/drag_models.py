@@ -0,0 +1,224 @@
+"""Модели сопротивления среды для задачи о броске тела.
+
+Состояние тела — [x, y, vx, vy] (последняя ось). Каждая модель задает правую часть системы ОДУ,
+а если у задачи есть точное решение — еще и функции, вычисляющие его напрямую без интегрирования.
+"""
+import numpy as np
+
+from integrators import solve_adaptive, solve_adaptive_ensemble
+
+G = 9.81  # Ускорение свободного падения, м/с^2
+
+# Порог k*t, ниже которого функции точного решения считаются по рядам Тейлора
+# (иначе при малых k теряется точность из-за вычитания близких чисел)
+SERIES_THRESHOLD = 1e-3
+
+
+def linear_drag(k):
+    """Правая часть системы ОДУ для сопротивления, пропорционального скорости.
+
+    Состояние — [x, y, vx, vy] (последняя ось), поэтому функция подходит и для массивов состояний.
+    k может быть массивом по траекториям ансамбля; при интегрировании ансамбля он передается
+    в rhs только для еще летящих траекторий.
+    """
+    def rhs(t, state, out, k=k):
+        out[..., 0:2] = state[..., 2:4]
+        np.multiply(state[..., 2:4], -np.asarray(k)[..., None], out=out[..., 2:4])
+        out[..., 3] -= G
+        return out
+    return rhs
+
+
+def quadratic_drag(k):
+    """Правая часть системы ОДУ для сопротивления, пропорционального квадрату скорости: a = -k|v|v - g."""
+    def rhs(t, state, out, k=k):
+        out[..., 0:2] = state[..., 2:4]
+        speed = np.hypot(state[..., 2], state[..., 3])
+        np.multiply(state[..., 2:4], (-np.asarray(k) * speed)[..., None], out=out[..., 2:4])
+        out[..., 3] -= G
+        return out
+    return rhs
+
+
+def hit_ground(t, state):
+    """Условие остановки: тело опустилось ниже уровня земли."""
+    return state[..., 1] < 0
+
+
+def ground_impact(t, state):
+    """Событие для адаптивного метода: высота обращается в ноль при падении (останавливает расчет)."""
+    return state[..., 1]
+
+
+ground_impact.terminal = True
+ground_impact.direction = -1
+
+
+def apex(t, state):
+    """Событие для адаптивного метода: вертикальная скорость обращается в ноль в верхней точке."""
+    return state[..., 3]
+
+
+apex.direction = -1
+
+
+def _launch_velocity(v0, angle):
+    theta = np.radians(angle)
+    return v0 * np.cos(theta), v0 * np.sin(theta)
+
+
+def _relaxation(k, t):
+    """phi = (1 - exp(-k t)) / k и psi = (t - phi) / k с правильным пределом при k -> 0."""
+    kt = k * t
+    small = np.abs(kt) < SERIES_THRESHOLD
+    k_safe = np.where(small, 1.0, k)
+    phi = np.where(small, t * (1 - kt / 2 + kt ** 2 / 6 - kt ** 3 / 24), -np.expm1(-k_safe * t) / k_safe)
+    psi = np.where(small, t ** 2 * (0.5 - kt / 6 + kt ** 2 / 24 - kt ** 3 / 120), (t - phi) / k_safe)
+    return phi, psi
+
+
+def _vertical_motion(t, vy0, y0, k):
+    """Высота и вертикальная скорость при линейном сопротивлении."""
+    phi, psi = _relaxation(k, t)
+    return y0 + vy0 * phi - G * psi, vy0 * np.exp(-k * t) - G * phi
+
+
+def linear_drag_state(t, v0, angle, y0, k):
+    """Точное решение для линейного сопротивления в моменты t.
+
+    Все аргументы — числа или массивы, согласованные по правилам broadcasting.
+    Возвращает массив формы (..., 4) с компонентами [x, y, vx, vy].
+    """
+    t, v0, angle, y0, k = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (t, v0, angle, y0, k)))
+    vx0, vy0 = _launch_velocity(v0, angle)
+    phi, psi = _relaxation(k, t)
+    decay = np.exp(-k * t)
+    return np.stack([vx0 * phi, y0 + vy0 * phi - G * psi, vx0 * decay, vy0 * decay - G * phi], axis=-1)
+
+
+def linear_drag_apex(v0, angle, y0, k):
+    """Момент и состояние в верхней точке для линейного сопротивления (v_y = 0)."""
+    vx0, vy0 = _launch_velocity(np.asarray(v0, dtype=float), np.asarray(angle, dtype=float))
+    vy0 = np.maximum(vy0, 0.0)
+    k = np.asarray(k, dtype=float)
+    ratio = k * vy0 / G
+    t_apex = np.where(k > 0, np.log1p(ratio) / np.where(k > 0, k, 1.0), vy0 / G)
+    return t_apex, linear_drag_state(t_apex, v0, angle, y0, k)
+
+
+def linear_drag_landing(v0, angle, y0, k, tol=1e-13, max_iter=50):
+    """Момент и состояние в момент падения для линейного сопротивления.
+
+    Уравнение y(t) = 0 решается методом Ньютона сразу для всех наборов параметров. y(t) вогнута,
+    поэтому из начальной точки правее корня итерации сходятся к нему монотонно.
+    """
+    v0, angle, y0, k = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (v0, angle, y0, k)))
+    vx0, vy0 = _launch_velocity(v0, angle)
+
+    # Время падения без сопротивления; если к этому моменту тело еще в воздухе, берем
+    # оценку сверху из y(t) <= y0 + (vy0 + g/k)/k - g t/k
+    t = (vy0 + np.sqrt(vy0 ** 2 + 2 * G * y0)) / G
+    still_flying = _vertical_motion(t, vy0, y0, k)[0] > 0
+    t = np.where(still_flying, (k * y0 + vy0) / G + 1 / np.where(k > 0, k, 1.0), t)
+
+    for _ in range(max_iter):
+        height, vy = _vertical_motion(t, vy0, y0, k)
+        step = np.where(vy < 0, height / np.where(vy < 0, vy, 1.0), 0.0)
+        t = np.maximum(t - step, 0.0)
+        if np.all(np.abs(step) <= tol * np.maximum(t, 1.0)):
+            break
+    return t, linear_drag_state(t, v0, angle, y0, k)
+
+
+class DragModel:
+    """Модель сопротивления: правая часть системы ОДУ и, если есть, точное решение.
+
+    rhs(k) возвращает функцию rhs(t, state, out) для интеграторов; при расчете множества траекторий
+    сразу k передается ей именованным аргументом (массив по траекториям). state(t, v0, angle, y0, k),
+    landing(v0, angle, y0, k) и apex(v0, angle, y0, k) — векторизованные функции точного
+    решения; для моделей без точного решения они равны None и используется численный расчет.
+    """
+
+    def __init__(self, name, description, rhs, state=None, landing=None, apex=None):
+        self.name = name
+        self.description = description
+        self.rhs = rhs
+        self.state = state
+        self.landing = landing
+        self.apex = apex
+
+    @property
+    def exact(self):
+        return self.state is not None
+
+
+LINEAR = DragModel("linear", "линейное (F = -k v)", linear_drag,
+                   state=linear_drag_state, landing=linear_drag_landing, apex=linear_drag_apex)
+QUADRATIC = DragModel("quadratic", "квадратичное (F = -k |v| v)", quadratic_drag)
+
+DRAG_MODELS = {}
+
+
+def register_drag_model(model):
+    """Добавляет модель в реестр (под ее именем) и возвращает ее."""
+    DRAG_MODELS[model.name] = model
+    return model
+
+
+register_drag_model(LINEAR)
+register_drag_model(QUADRATIC)
+
+
+def get_drag_model(drag):
+    """Модель по имени, сама модель или модель без точного решения для функции drag(k)."""
+    if isinstance(drag, DragModel):
+        return drag
+    if isinstance(drag, str):
+        try:
+            return DRAG_MODELS[drag]
+        except KeyError:
+            raise ValueError(f"Неизвестная модель сопротивления: {drag}. Доступны: {', '.join(DRAG_MODELS)}")
+    for model in DRAG_MODELS.values():
+        if model.rhs is drag:
+            return model
+    return DragModel(getattr(drag, "__name__", "custom"), "пользовательская", drag)
+
+
+def _numerical_solutions(model, v0, angle, y0, k, rtol, atol):
+    """Адаптивные решения для каждого набора параметров (параметры согласуются по broadcasting)."""
+    v0, angle, y0, k = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (v0, angle, y0, k)))
+    solutions = []
+    for v, a, h, kk in zip(v0.ravel(), angle.ravel(), y0.ravel(), k.ravel()):
+        vx0, vy0 = _launch_velocity(v, a)
+        solutions.append(solve_adaptive(model.rhs(kk), [0.0, h, vx0, vy0], 0.0, 1000.0, rtol=rtol, atol=atol,
+                                        events=(ground_impact, apex)))
+    return v0.shape, solutions
+
+
+def evaluate(drag, t, v0, angle, y0, k, rtol=1e-10, atol=1e-12):
+    """Состояние [x, y, vx, vy] в моменты t: точно, если модель это позволяет, иначе численно.
+
+    В численном случае t — моменты времени, общие для всех наборов параметров (массив формы (n,)),
+    результат имеет форму (*параметры, n, 4). После падения состояние не определено (NaN).
+    """
+    model = get_drag_model(drag)
+    if model.exact:
+        return model.state(t, v0, angle, y0, k)
+    t = np.asarray(t, dtype=float)
+    shape, solutions = _numerical_solutions(model, v0, angle, y0, k, rtol, atol)
+    states = np.array([np.where((t <= s.t[-1])[..., None], s(t), np.nan) for s in solutions])
+    return states.reshape(shape + t.shape + (4,))
+
+
+def landing(drag, v0, angle, y0, k, rtol=1e-10, atol=1e-12):
+    """Время полета и состояние в момент падения для каждого набора параметров."""
+    model = get_drag_model(drag)
+    if model.exact:
+        return model.landing(v0, angle, y0, k)
+    # Все траектории интегрируются вместе до падения: один вызов для любого числа наборов параметров
+    v0, angle, y0, k = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (v0, angle, y0, k)))
+    vx0, vy0 = _launch_velocity(v0.ravel(), angle.ravel())
+    state0 = np.stack([np.zeros_like(vx0), y0.ravel(), vx0, vy0], axis=-1)
+    t_end, y_end, _ = solve_adaptive_ensemble(model.rhs(0.0), state0, 0.0, 1000.0, rtol=rtol, atol=atol,
+                                              event=ground_impact, params={"k": k.ravel()})
+    return t_end.reshape(v0.shape), y_end.reshape(v0.shape + (4,))
@@ -0,0 +1,496 @@
+"""Явные методы Рунге-Кутты для систем ОДУ dy/dt = f(t, y): с фиксированным шагом и адаптивный."""
+import numpy as np
+
+
+class ButcherTableau:
+    """Таблица Бутчера явного метода Рунге-Кутты."""
+
+    def __init__(self, name, a, b, c):
+        self.name = name
+        self.a = np.array(a, dtype=float)
+        self.b = np.array(b, dtype=float)
+        self.c = np.array(c, dtype=float)
+
+    @property
+    def stages(self):
+        return len(self.b)
+
+
+EULER = ButcherTableau("euler", [[0]], [1], [0])
+MIDPOINT = ButcherTableau("midpoint", [[0, 0], [0.5, 0]], [0, 1], [0, 0.5])
+HEUN = ButcherTableau("heun", [[0, 0], [1, 0]], [0.5, 0.5], [0, 1])
+RK3 = ButcherTableau("rk3", [[0, 0, 0], [0.5, 0, 0], [-1, 2, 0]], [1 / 6, 2 / 3, 1 / 6], [0, 0.5, 1])
+RK4 = ButcherTableau(
+    "rk4",
+    [[0, 0, 0, 0], [0.5, 0, 0, 0], [0, 0.5, 0, 0], [0, 0, 1, 0]],
+    [1 / 6, 1 / 3, 1 / 3, 1 / 6],
+    [0, 0.5, 0.5, 1],
+)
+RK38 = ButcherTableau(
+    "rk38",
+    [[0, 0, 0, 0], [1 / 3, 0, 0, 0], [-1 / 3, 1, 0, 0], [1, -1, 1, 0]],
+    [1 / 8, 3 / 8, 3 / 8, 1 / 8],
+    [0, 1 / 3, 2 / 3, 1],
+)
+
+TABLEAUX = {tableau.name: tableau for tableau in (EULER, MIDPOINT, HEUN, RK3, RK4, RK38)}
+
+
+def integrate(rhs, y0, dt, t_max, t0=0.0, tableau=RK4, stride=1, stop=None, capacity=65536):
+    """Интегрирование системы ОДУ явным методом Рунге-Кутты с постоянным шагом.
+
+    rhs(t, y, out) записывает производную dy/dt в массив out той же формы, что и y.
+    Выходные массивы выделяются заранее (не больше capacity записей, при нехватке
+    размер удваивается); сохраняется каждый stride-й шаг, а также последний.
+    Интегрирование идет, пока t <= t_max и stop(t, y) ложно; состояние, на котором
+    stop впервые стало истинным, включается в результат.
+
+    Возвращает массив времени формы (n,) и массив состояний формы (n, *y0.shape).
+    """
+    if isinstance(tableau, str):
+        tableau = TABLEAUX[tableau]
+    y = np.array(y0, dtype=float)
+    max_steps = int(np.floor((t_max - t0) / dt + 1e-9)) + 1
+    n_out = min(max_steps // stride + 2, capacity)
+    t_out = np.empty(n_out)
+    y_out = np.empty((n_out,) + y.shape)
+    t_out[0], y_out[0] = t0, y
+    saved = 1
+
+    a, b, c = tableau.a, tableau.b, tableau.c * dt
+    stage_weights = [(i, a[i, :i] * dt) for i in range(tableau.stages)]
+    b_dt = b * dt
+    k = np.empty((tableau.stages,) + y.shape)
+    k_flat = k.reshape(tableau.stages, -1)
+    y_stage = np.empty_like(y)
+
+    step = 0
+    t = t0
+    done = stop is not None and stop(t, y)
+    while step < max_steps and not done:
+        for i, weights in stage_weights:
+            if i == 0:
+                rhs(t, y, k[0])
+            else:
+                np.dot(weights, k_flat[:i], out=y_stage.reshape(-1))
+                y_stage += y
+                rhs(t + c[i], y_stage, k[i])
+        y += np.dot(b_dt, k_flat).reshape(y.shape)
+        step += 1
+        t = t0 + step * dt
+        done = stop is not None and stop(t, y)
+        if step % stride == 0 or step == max_steps or done:
+            if saved == len(t_out):
+                t_out, y_out = _grow(t_out), _grow(y_out)
+            t_out[saved], y_out[saved] = t, y
+            saved += 1
+
+    return t_out[:saved], y_out[:saved]
+
+
+def _grow(array):
+    grown = np.empty((2 * len(array),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def integrate_ensemble(rhs, y0, dt, t_max, t0=0.0, tableau=RK4, stop=None, params=None, record=False, stride=1):
+    """Одновременное интегрирование множества траекторий одним методом Рунге-Кутты.
+
+    y0 — массив начальных состояний формы (n, dim). params — словарь массивов формы (n,)
+    с параметрами траекторий; они передаются в rhs(t, y, out, **params) только для активных
+    траекторий. stop(t, y) возвращает булеву маску по активным траекториям: траектория,
+    для которой условие выполнилось, сохраняет это состояние и дальше не вычисляется.
+
+    Возвращает время и состояние в момент остановки (t_end формы (n,), y_end формы (n, dim))
+    и покомпонентный максимум состояния вдоль траектории (y_max формы (n, dim)).
+    При record=True дополнительно возвращается список траекторий (t, Y) разной длины,
+    в которых сохранен каждый stride-й шаг и последний.
+    """
+    if isinstance(tableau, str):
+        tableau = TABLEAUX[tableau]
+    y = np.array(y0, dtype=float)
+    n, dim = y.shape
+    params = {name: np.broadcast_to(np.asarray(value, dtype=float), (n,)) for name, value in (params or {}).items()}
+    max_steps = int(np.floor((t_max - t0) / dt + 1e-9)) + 1
+
+    t_end = np.full(n, t0)
+    y_end = y.copy()
+    y_max = y.copy()
+    active = np.arange(n)
+    if stop is not None:
+        landed = stop(t0, y)
+        active = active[~landed]
+        y = y[~landed]
+    active_params = {name: value[active] for name, value in params.items()}
+    records = [(np.full(n, t0), np.arange(n), y_end.copy())] if record else None
+
+    c = tableau.c * dt
+    stage_weights = [(i, tableau.a[i, :i] * dt) for i in range(tableau.stages)]
+    b_dt = tableau.b * dt
+    step = 0
+    while step < max_steps and len(active):
+        t = t0 + step * dt
+        k = np.empty((tableau.stages,) + y.shape)
+        for i, weights in stage_weights:
+            y_stage = y + np.tensordot(weights, k[:i], axes=1) if i else y
+            rhs(t + c[i], y_stage, k[i], **active_params)
+        y = y + np.tensordot(b_dt, k, axes=1)
+        step += 1
+        t = t0 + step * dt
+
+        y_max[active] = np.maximum(y_max[active], y)
+        done = stop(t, y) if stop is not None else np.zeros(len(active), dtype=bool)
+        if step == max_steps:
+            done[:] = True
+        if record and (step % stride == 0 or done.any()):
+            keep = slice(None) if step % stride == 0 else done
+            records.append((np.full(len(active[keep]), t), active[keep], y[keep].copy()))
+        if done.any():
+            t_end[active[done]] = t
+            y_end[active[done]] = y[done]
+            running = ~done
+            active, y = active[running], y[running]
+            active_params = {name: value[running] for name, value in active_params.items()}
+
+    if not record:
+        return t_end, y_end, y_max
+    times = np.concatenate([r[0] for r in records])
+    owners = np.concatenate([r[1] for r in records])
+    states = np.concatenate([r[2] for r in records])
+    order = np.argsort(owners, kind="stable")
+    bounds = np.cumsum(np.bincount(owners, minlength=n))[:-1]
+    trajectories = list(zip(np.split(times[order], bounds), np.split(states[order], bounds)))
+    return t_end, y_end, y_max, trajectories
+
+
+# Метод Дормана-Принса 5(4): коэффициенты, оценка погрешности (разность решений 5-го и 4-го порядка)
+# и коэффициенты непрерывного решения 4-го порядка внутри шага.
+DOPRI_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+DOPRI_A = np.array([
+    [0, 0, 0, 0, 0],
+    [1 / 5, 0, 0, 0, 0],
+    [3 / 40, 9 / 40, 0, 0, 0],
+    [44 / 45, -56 / 15, 32 / 9, 0, 0],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+])
+DOPRI_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+DOPRI_E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+DOPRI_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+
+class AdaptiveSolution:
+    """Результат solve_adaptive.
+
+    t, y — принятые шаги (y формы (n, dim)); t_events, y_events — списки моментов и состояний
+    для каждого события; вызов solution(t) вычисляет непрерывное решение в любых точках
+    отрезка интегрирования (t — число или массив).
+    """
+
+    def __init__(self, t, y, h, q, t_events, y_events, n_rhs):
+        self.t = t
+        self.y = y
+        self._h = h
+        self._q = q
+        self.t_events = t_events
+        self.y_events = y_events
+        self.n_rhs = n_rhs
+
+    @property
+    def n_steps(self):
+        return len(self.t) - 1
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=float)
+        if len(self.t) == 1:
+            return np.broadcast_to(self.y[0], t.shape + self.y.shape[1:]).copy()
+        i = np.clip(np.searchsorted(self.t, t, side="right") - 1, 0, len(self._h) - 1)
+        return _dense_value(self.t[i], self.y[i], self._h[i], self._q[i], t)
+
+
+def _dense_value(t_old, y_old, h, q, t):
+    """Непрерывное решение внутри шага: y(t_old + s*h) = y_old + h * q @ [s, s^2, s^3, s^4]."""
+    s = np.asarray((t - t_old) / h)
+    powers = s[..., None] ** np.arange(1, 5)
+    h = np.asarray(h)[..., None]
+    return y_old + h * np.einsum("...ij,...j->...i", q, powers)
+
+
+def _find_root(g, t_left, t_right, g_left, g_right, tol):
+    """Корень g на отрезке со сменой знака: метод секущих с защитой бисекцией (Illinois)."""
+    if g_left == 0:
+        return t_left
+    side = 0
+    for _ in range(100):
+        if t_right - t_left <= tol:
+            break
+        t_mid = (t_left * g_right - t_right * g_left) / (g_right - g_left)
+        if not t_left < t_mid < t_right:
+            t_mid = 0.5 * (t_left + t_right)
+        g_mid = g(t_mid)
+        if g_mid == 0:
+            return t_mid
+        if np.sign(g_mid) == np.sign(g_left):
+            t_left, g_left = t_mid, g_mid
+            if side == -1:
+                g_right *= 0.5
+            side = -1
+        else:
+            t_right, g_right = t_mid, g_mid
+            if side == 1:
+                g_left *= 0.5
+            side = 1
+    return t_right if abs(g_right) < abs(g_left) else t_left
+
+
+def _find_roots(g, t_left, t_right, g_left, g_right, tol):
+    """То же, что _find_root, сразу для массива отрезков.
+
+    g(t, rows) вычисляет функцию в точках t для отрезков с номерами rows; итерации идут,
+    пока не сойдутся все отрезки, но функция вычисляется только для еще не сошедшихся.
+    """
+    t_left, t_right = np.array(t_left, dtype=float), np.array(t_right, dtype=float)
+    g_left, g_right = np.array(g_left, dtype=float), np.array(g_right, dtype=float)
+    tol = np.broadcast_to(tol, t_left.shape)
+    roots = np.where(g_left == 0, t_left, np.nan)
+    side = np.zeros(t_left.shape, dtype=int)
+    for _ in range(100):
+        rows = np.flatnonzero(np.isnan(roots) & (t_right - t_left > tol))
+        if len(rows) == 0:
+            break
+        tl, tr, gl, gr = t_left[rows], t_right[rows], g_left[rows], g_right[rows]
+        t_mid = (tl * gr - tr * gl) / (gr - gl)
+        t_mid = np.where((tl < t_mid) & (t_mid < tr), t_mid, 0.5 * (tl + tr))
+        g_mid = g(t_mid, rows)
+        roots[rows[g_mid == 0]] = t_mid[g_mid == 0]
+        left = (np.sign(g_mid) == np.sign(gl)) & (g_mid != 0)
+        right = (g_mid != 0) & ~left
+        # Illinois: значение на неподвижном конце уменьшается вдвое, если он остается дважды подряд
+        g_right[rows[left & (side[rows] == -1)]] *= 0.5
+        g_left[rows[right & (side[rows] == 1)]] *= 0.5
+        t_left[rows[left]], g_left[rows[left]] = t_mid[left], g_mid[left]
+        t_right[rows[right]], g_right[rows[right]] = t_mid[right], g_mid[right]
+        side[rows[left]], side[rows[right]] = -1, 1
+    unresolved = np.isnan(roots)
+    closer = np.where(np.abs(g_right) < np.abs(g_left), t_right, t_left)
+    roots[unresolved] = closer[unresolved]
+    return roots
+
+
+def solve_adaptive(rhs, y0, t0, t_max, rtol=1e-6, atol=1e-9, events=(), h0=None, max_step=np.inf):
+    """Интегрирование системы ОДУ методом Дормана-Принса 5(4) с автоматическим выбором шага.
+
+    y0 — вектор начального состояния, rhs(t, y, out) записывает dy/dt в out. Шаг подбирается так, чтобы оценка локальной
+    погрешности не превышала atol + rtol * |y| (среднеквадратично по компонентам).
+
+    events — функции g(t, y); момент, когда g меняет знак, уточняется по непрерывному решению.
+    Атрибут direction у функции (+1 или -1) оставляет только возрастающие или убывающие
+    пересечения нуля, атрибут terminal=True останавливает интегрирование в этот момент
+    (последняя точка решения — точное состояние в момент события).
+    """
+    y = np.array(y0, dtype=float)
+    stages = np.empty((7, y.size))
+    n_rhs = 0
+
+    def f(t, state, out):
+        nonlocal n_rhs
+        n_rhs += 1
+        rhs(t, state, out)
+        return out
+
+    def error_norm(error, y_old, y_new):
+        scale = atol + rtol * np.maximum(np.abs(y_old), np.abs(y_new))
+        return np.sqrt(np.mean((error / scale) ** 2))
+
+    t = float(t0)
+    f(t, y, stages[0])
+    if h0 is None:
+        # Начальный шаг по оценке Хайрера: чтобы шаг Эйлера менял решение примерно на 1% от масштаба
+        scale = atol + rtol * np.abs(y)
+        d0, d1 = np.sqrt(np.mean((y / scale) ** 2)), np.sqrt(np.mean((stages[0] / scale) ** 2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        f(t + h0, y + h0 * stages[0], stages[1])
+        d2 = np.sqrt(np.mean(((stages[1] - stages[0]) / scale) ** 2)) / h0
+        h1 = max(1e-6, h0 * 1e-3) if max(d1, d2) <= 1e-15 else (0.01 / max(d1, d2)) ** 0.2
+        h0 = min(100 * h0, h1)
+    h = min(h0, max_step, t_max - t)
+
+    event_values = [g(t, y) for g in events]
+    t_events = [[] for _ in events]
+    y_events = [[] for _ in events]
+    ts, ys, hs, qs = [t], [y.copy()], [], []
+
+    while t < t_max:
+        h = min(h, max_step, t_max - t)
+        while True:
+            for i in range(1, 6):
+                f(t + DOPRI_C[i] * h, y + h * (DOPRI_A[i, :i] @ stages[:i]), stages[i])
+            y_new = y + h * (DOPRI_B @ stages[:6])
+            f(t + h, y_new, stages[6])
+            err = error_norm(h * (DOPRI_E @ stages), y, y_new)
+            if err <= 1:
+                break
+            h *= max(0.2, 0.9 * err ** -0.2)
+            if h < 1e-14 * max(1.0, abs(t)):
+                raise RuntimeError(f"Шаг интегрирования стал слишком малым при t = {t}")
+
+        q = stages.T @ DOPRI_P
+        t_new = t + h
+        stop_at = None
+        for n, g in enumerate(events):
+            g_old, g_new = event_values[n], g(t_new, y_new)
+            event_values[n] = g_new
+            direction = getattr(g, "direction", 0)
+            crossed = (g_old <= 0 <= g_new and direction >= 0) or (g_old >= 0 >= g_new and direction <= 0)
+            if not crossed or g_old == g_new:
+                continue
+
+            # Значение события по непрерывному решению на текущем шаге
+            def dense_g(s):
+                return g(s, _dense_value(t, y, h, q, s))
+
+            t_event = _find_root(dense_g, t, t_new, g_old, g_new, 4 * np.finfo(float).eps * max(1.0, abs(t_new)))
+            t_events[n].append(t_event)
+            y_events[n].append(_dense_value(t, y, h, q, t_event))
+            if getattr(g, "terminal", False) and (stop_at is None or t_event < stop_at[0]):
+                stop_at = t_event, y_events[n][-1]
+
+        hs.append(h)
+        qs.append(q)
+        if stop_at is not None:
+            ts.append(stop_at[0])
+            ys.append(stop_at[1])
+            # Нетерминальные события после точки остановки уже не произошли
+            for n in range(len(events)):
+                while t_events[n] and t_events[n][-1] > stop_at[0]:
+                    t_events[n].pop()
+                    y_events[n].pop()
+            break
+        t, y = t_new, y_new
+        ts.append(t)
+        ys.append(y.copy())
+        stages[0] = stages[6]  # FSAL: последняя стадия шага — первая стадия следующего
+        h *= min(10.0, 0.9 * err ** -0.2) if err > 0 else 10.0
+
+    return AdaptiveSolution(np.array(ts), np.array(ys),
+                            np.array(hs), np.array(qs),
+                            [np.array(te) for te in t_events], [np.array(ye) for ye in y_events], n_rhs)
+
+
+def solve_adaptive_ensemble(rhs, y0, t0, t_max, rtol=1e-6, atol=1e-9, event=None, params=None, max_step=np.inf):
+    """Одновременное интегрирование множества траекторий методом Дормана-Принса 5(4) до события.
+
+    Для каждой строки y0 (формы (n, dim)) — те же шаги, что у solve_adaptive, но все траектории
+    считаются вместе: каждая стадия — один вызов rhs(t, y, out, **params) для всех активных
+    траекторий, а шаг у каждой траектории свой. params передаются, как в integrate_ensemble.
+    event(t, y) — терминальное событие (атрибут direction учитывается, как в solve_adaptive):
+    траектория останавливается в момент смены знака, уточненный по непрерывному решению.
+
+    Возвращает время и состояние в момент остановки (t_end формы (n,), y_end формы (n, dim))
+    и число вызовов rhs.
+    """
+    y = np.array(y0, dtype=float)
+    n, dim = y.shape
+    params = {name: np.broadcast_to(np.asarray(value, dtype=float), (n,)) for name, value in (params or {}).items()}
+    t = np.full(n, float(t0))
+    t_end, y_end = t.copy(), y.copy()
+    active = np.arange(n)
+    active_params = dict(params)
+    stages = np.empty((7, n, dim))
+    n_rhs = 0
+
+    def f(t, state, out):
+        nonlocal n_rhs
+        n_rhs += 1
+        rhs(t, state, out, **active_params)
+        return out
+
+    def rms(values):
+        return np.sqrt(np.mean(values ** 2, axis=-1))
+
+    def combine(weights, values):
+        # Сумма стадий с весами (как tensordot по первой оси, но без его накладных расходов)
+        return (weights @ values.reshape(len(weights), -1)).reshape(values.shape[1:])
+
+    # Начальный шаг по оценке Хайрера — отдельно для каждой траектории
+    f(t, y, stages[0])
+    scale = atol + rtol * np.abs(y)
+    d0, d1 = rms(y / scale), rms(stages[0] / scale)
+    small = (d0 < 1e-5) | (d1 < 1e-5)
+    h0 = np.where(small, 1e-6, 0.01 * d0 / np.where(small, 1.0, d1))
+    f(t + h0, y + h0[:, None] * stages[0], stages[1])
+    d = np.maximum(d1, rms((stages[1] - stages[0]) / scale) / h0)
+    flat = d <= 1e-15
+    h1 = np.where(flat, np.maximum(1e-6, h0 * 1e-3), (0.01 / np.where(flat, 1.0, d)) ** 0.2)
+    h = np.minimum(100 * h0, h1)
+
+    direction = getattr(event, "direction", 0)
+    event_values = event(t, y) if event is not None else None
+
+    while len(active):
+        h = np.minimum(np.minimum(h, max_step), t_max - t)
+        for i in range(1, 6):
+            f(t + DOPRI_C[i] * h, y + h[:, None] * combine(DOPRI_A[i, :i], stages[:i]), stages[i])
+        y_new = y + h[:, None] * combine(DOPRI_B, stages[:6])
+        f(t + h, y_new, stages[6])
+        error = h[:, None] * combine(DOPRI_E, stages)
+        err = rms(error / (atol + rtol * np.maximum(np.abs(y), np.abs(y_new))))
+        accepted = err <= 1
+        with np.errstate(divide="ignore"):
+            factor = 0.9 * err ** -0.2
+        if not accepted.all():
+            rejected = ~accepted
+            h[rejected] *= np.maximum(0.2, factor[rejected])
+            if np.any(h[rejected] < 1e-14 * np.maximum(1.0, np.abs(t[rejected]))):
+                raise RuntimeError(f"Шаг интегрирования стал слишком малым при t = {t[rejected].min()}")
+
+        t_new = t + h
+        finished = accepted & (t_new >= t_max)
+        crossed = np.zeros(len(active), dtype=bool)
+        if event is not None:
+            g_new = event(t_new, y_new)
+            g_old = event_values
+            crossed = accepted & (g_old != g_new) & (
+                ((g_old <= 0) & (0 <= g_new) & (direction >= 0)) | ((g_old >= 0) & (0 >= g_new) & (direction <= 0)))
+            event_values = np.where(accepted, g_new, g_old)
+            rows = np.flatnonzero(crossed)
+            if len(rows):
+                q = np.einsum("snd,sk->ndk", stages[:, rows], DOPRI_P)
+                t_old, y_old, h_old = t[rows], y[rows], h[rows]
+
+                # Значение события по непрерывному решению на текущем шаге
+                def dense_g(s, sub):
+                    return event(s, _dense_value(t_old[sub], y_old[sub], h_old[sub], q[sub], s))
+
+                tol = 4 * np.finfo(float).eps * np.maximum(1.0, np.abs(t_new[rows]))
+                t_event = _find_roots(dense_g, t_old, t_new[rows], g_old[rows], g_new[rows], tol)
+                t_end[active[rows]] = t_event
+                y_end[active[rows]] = _dense_value(t_old, y_old, h_old, q, t_event)
+                finished &= ~crossed
+        t_end[active[finished]] = t_new[finished]
+        y_end[active[finished]] = y_new[finished]
+
+        # Принятые шаги: переход к новому состоянию, FSAL и увеличение шага
+        t = np.where(accepted, t_new, t)
+        y[accepted] = y_new[accepted]
+        stages[0, accepted] = stages[6, accepted]
+        h[accepted] *= np.where(err[accepted] > 0, np.minimum(10.0, factor[accepted]), 10.0)
+
+        running = ~(finished | crossed)
+        if not running.all():
+            active, t, y, h = active[running], t[running], y[running], h[running]
+            stages = stages[:, running]
+            if event is not None:
+                event_values = event_values[running]
+            active_params = {name: value[running] for name, value in active_params.items()}
+
+    return t_end, y_end, n_rhs
@@ -0,0 +1,81 @@
+"""Необязательные ядра, скомпилированные Numba.
+
+Если пакет numba установлен, BACKEND = "numba", и runge_kutta_4 для встроенных моделей
+сопротивления и метода RK4 выполняет весь цикл интегрирования одной скомпилированной функцией.
+Без numba BACKEND = "numpy" и используется обычный путь через integrators.integrate.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+BACKEND = "numba" if njit is not None else "numpy"
+
+
+def _derivative(state, k, quadratic, g, out):
+    vx, vy = state[2], state[3]
+    factor = k * np.sqrt(vx * vx + vy * vy) if quadratic else k
+    out[0] = vx
+    out[1] = vy
+    out[2] = -factor * vx
+    out[3] = -factor * vy - g
+
+
+def _projectile_rk4(state0, k, quadratic, g, dt, max_steps, stride, capacity):
+    """Цикл RK4 с остановкой при y < 0; те же правила сохранения шагов, что у integrate."""
+    n_out = min(max_steps // stride + 2, capacity)
+    t_out = np.empty(n_out)
+    y_out = np.empty((n_out, 4))
+    y = state0.copy()
+    t_out[0] = 0.0
+    y_out[0] = y
+    saved = 1
+
+    k1, k2, k3, k4 = np.empty(4), np.empty(4), np.empty(4), np.empty(4)
+    y_stage = np.empty(4)
+    step = 0
+    done = y[1] < 0
+    while step < max_steps and not done:
+        _derivative(y, k, quadratic, g, k1)
+        for i in range(4):
+            y_stage[i] = 0.5 * dt * k1[i] + y[i]
+        _derivative(y_stage, k, quadratic, g, k2)
+        for i in range(4):
+            y_stage[i] = 0.5 * dt * k2[i] + y[i]
+        _derivative(y_stage, k, quadratic, g, k3)
+        for i in range(4):
+            y_stage[i] = dt * k3[i] + y[i]
+        _derivative(y_stage, k, quadratic, g, k4)
+        for i in range(4):
+            y[i] += dt / 6 * k1[i] + dt / 3 * k2[i] + dt / 3 * k3[i] + dt / 6 * k4[i]
+        step += 1
+        done = y[1] < 0
+        if step % stride == 0 or step == max_steps or done:
+            if saved == len(t_out):
+                t_grown = np.empty(2 * len(t_out))
+                y_grown = np.empty((2 * len(t_out), 4))
+                t_grown[:saved] = t_out
+                y_grown[:saved] = y_out
+                t_out, y_out = t_grown, y_grown
+            t_out[saved] = step * dt
+            y_out[saved] = y
+            saved += 1
+    return t_out[:saved], y_out[:saved]
+
+
+if njit is not None:
+    _derivative = njit(cache=True)(_derivative)
+    _projectile_rk4 = njit(cache=True)(_projectile_rk4)
+
+
+def projectile_rk4(state0, k, quadratic, g, dt, t_max, stride=1, capacity=65536):
+    """Траектория методом RK4 в скомпилированном цикле.
+
+    Возвращает массив времени формы (n,) и массив состояний формы (n, 4), как integrate.
+    Без numba выполняется тот же цикл на Python: медленно, но этим пользуются тесты совпадения.
+    """
+    max_steps = int(np.floor(t_max / dt + 1e-9)) + 1
+    return _projectile_rk4(np.asarray(state0, dtype=np.float64), float(k), bool(quadratic), float(g), float(dt),
+                           max_steps, int(stride), int(capacity))
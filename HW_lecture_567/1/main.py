@@ -2,8 +2,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
-# Константы
-G = 9.81  # Ускорение свободного падения, м/с^2
+from drag_models import (
+    DRAG_MODELS, LINEAR, QUADRATIC, G, apex, get_drag_model, ground_impact, hit_ground,
+)
+from integrators import RK4, integrate, integrate_ensemble, solve_adaptive
+from kernels import BACKEND, projectile_rk4
+
 
 def get_initial_parameters():
     """Функция для ввода начальных параметров."""
@@ -19,38 +23,76 @@ def get_initial_parameters():
         print(f"Ошибка ввода: {e}")
         exit(1)
 
-def runge_kutta_4(v0, angle, y0, k, dt=0.01, t_max=10):
-    """Решение задачи методом Рунге-Кутты 4-го порядка."""
-    theta = np.radians(angle)
-    vx, vy = v0 * np.cos(theta), v0 * np.sin(theta)
 
-    t_values, x_values, y_values, vx_values, vy_values = [0], [0], [y0], [vx], [vy]
+def get_drag_model_choice():
+    """Выбор модели сопротивления (по умолчанию — линейная)."""
+    models = list(DRAG_MODELS.values())
+    menu = ", ".join(f"{i} — {model.description}" for i, model in enumerate(models, 1))
+    choice = input(f"Выберите модель сопротивления ({menu}) [1]: ").strip() or "1"
+    if choice not in [str(i) for i in range(1, len(models) + 1)]:
+        print("Ошибка ввода: неизвестная модель сопротивления.")
+        exit(1)
+    return models[int(choice) - 1]
 
-    x, y, t = 0, y0, 0
-    while y >= 0 and t <= t_max:
-        k1_x, k1_y, k1_vx, k1_vy = vx, vy, -k * vx, -G - k * vy
-        k2_x, k2_y = vx + 0.5 * dt * k1_vx, vy + 0.5 * dt * k1_vy
-        k2_vx, k2_vy = -k * (vx + 0.5 * dt * k1_vx), -G - k * (vy + 0.5 * dt * k1_vy)
 
-        k3_x, k3_y = vx + 0.5 * dt * k2_vx, vy + 0.5 * dt * k2_vy
-        k3_vx, k3_vy = -k * (vx + 0.5 * dt * k2_vx), -G - k * (vy + 0.5 * dt * k2_vy)
+def runge_kutta_4(v0, angle, y0, k, dt=0.01, t_max=10, stride=1, drag="linear", tableau=RK4, backend=BACKEND):
+    """Решение задачи методом Рунге-Кутты 4-го порядка.
+
+    drag — модель сопротивления: имя из DRAG_MODELS, DragModel или функция drag(k), возвращающая
+    правую часть системы ОДУ; tableau задает метод (по умолчанию RK4).
+    backend="numba" (по умолчанию, если numba установлена) для метода RK4 и встроенных моделей
+    выполняет цикл скомпилированным ядром, иначе используется integrate.
+    Возвращает массивы времени, координат и скоростей; сохраняется каждый stride-й шаг.
+    """
+    theta = np.radians(angle)
+    state0 = [0.0, y0, v0 * np.cos(theta), v0 * np.sin(theta)]
+    model = get_drag_model(drag)
+    if backend == "numba" and tableau is RK4 and model in (LINEAR, QUADRATIC):
+        t_values, states = projectile_rk4(state0, k, model is QUADRATIC, G, dt, t_max, stride)
+    else:
+        t_values, states = integrate(model.rhs(k), state0, dt, t_max, tableau=tableau, stride=stride,
+                                     stop=hit_ground)
+    x_values, y_values, vx_values, vy_values = states.T
+    return t_values, x_values, y_values, vx_values, vy_values
 
-        k4_x, k4_y = vx + dt * k3_vx, vy + dt * k3_vy
-        k4_vx, k4_vy = -k * (vx + dt * k3_vx), -G - k * (vy + dt * k3_vy)
 
-        x += (dt / 6) * (k1_x + 2 * k2_x + 2 * k3_x + k4_x)
-        y += (dt / 6) * (k1_y + 2 * k2_y + 2 * k3_y + k4_y)
-        vx += (dt / 6) * (k1_vx + 2 * k2_vx + 2 * k3_vx + k4_vx)
-        vy += (dt / 6) * (k1_vy + 2 * k2_vy + 2 * k3_vy + k4_vy)
-        t += dt
+def dormand_prince(v0, angle, y0, k, rtol=1e-8, atol=1e-10, t_max=1000, drag="linear"):
+    """Решение задачи адаптивным методом Дормана-Принса 5(4).
 
-        t_values.append(t)
-        x_values.append(x)
-        y_values.append(y)
-        vx_values.append(vx)
-        vy_values.append(vy)
+    Шаг выбирается автоматически по заданной точности, а момент падения и верхняя точка
+    находятся как корни по непрерывному решению, поэтому дальность и время полета
+    не зависят от шага. Возвращает AdaptiveSolution: последняя точка — момент падения,
+    solution.t_events[1] и solution.y_events[1] — момент и состояние в верхней точке,
+    solution(t) — состояние в произвольные моменты времени.
+    """
+    theta = np.radians(angle)
+    state0 = [0.0, y0, v0 * np.cos(theta), v0 * np.sin(theta)]
+    return solve_adaptive(get_drag_model(drag).rhs(k), state0, 0.0, t_max, rtol=rtol, atol=atol,
+                          events=(ground_impact, apex))
+
+
+def runge_kutta_4_ensemble(v0, angle, y0, k, dt=0.01, t_max=10, stride=1, drag="linear", tableau=RK4,
+                           trajectories=False):
+    """Решение задачи для множества бросков сразу (все траектории шагают одновременно).
+
+    Параметры v0, angle, y0, k — числа или массивы, которые согласуются по правилам broadcasting
+    (например, сетка, построенная np.meshgrid). Упавшие траектории исключаются из вычислений.
+    Возвращает массивы формы сетки параметров: дальность, время полета и максимальную высоту.
+    При trajectories=True дополнительно возвращается список траекторий (t, x, y, vx, vy)
+    в порядке элементов сетки.
+    """
+    v0, angle, y0, k = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (v0, angle, y0, k)))
+    theta = np.radians(angle.ravel())
+    v0 = v0.ravel()
+    state0 = np.stack([np.zeros_like(v0), y0.ravel(), v0 * np.cos(theta), v0 * np.sin(theta)], axis=-1)
+    result = integrate_ensemble(get_drag_model(drag).rhs(0.0), state0, dt, t_max, tableau=tableau, stop=hit_ground,
+                                params={"k": k.ravel()}, record=trajectories, stride=stride)
+    t_end, y_end, y_max = result[:3]
+    stats = (y_end[:, 0].reshape(k.shape), t_end.reshape(k.shape), y_max[:, 1].reshape(k.shape))
+    if not trajectories:
+        return stats
+    return stats + ([(t, *states.T) for t, states in result[3]],)
 
-    return t_values, x_values, y_values, vx_values, vy_values
 
 def animate_results(t_values, x_values, y_values, vx_values, vy_values):
     """Анимация всех графиков."""
@@ -106,12 +148,29 @@ def animate_results(t_values, x_values, y_values, vx_values, vy_values):
     plt.tight_layout()
     plt.show()
 
+
 def main():
     v0, angle, y0, k = get_initial_parameters()
-    t_values, x_values, y_values, vx_values, vy_values = runge_kutta_4(v0, angle, y0, k)
+    model = get_drag_model_choice()
+    if model.exact:
+        # Точное решение: момент падения и состояния в кадрах вычисляются напрямую
+        t_land, _ = model.landing(v0, angle, y0, k)
+        t_values = np.append(np.arange(0, t_land, 0.01), t_land)
+        x_values, y_values, vx_values, vy_values = model.state(t_values, v0, angle, y0, k).T
+        t_apex, apex_state = model.apex(v0, angle, y0, k)
+        height = apex_state[1] if t_apex > 0 else None
+    else:
+        solution = dormand_prince(v0, angle, y0, k, drag=model)
+        # Кадры анимации через 0.01 с по непрерывному решению; последний кадр — точный момент падения
+        t_values = np.append(np.arange(0, solution.t[-1], 0.01), solution.t[-1])
+        x_values, y_values, vx_values, vy_values = solution(t_values).T
+        height = solution.y_events[1][0][1] if len(solution.t_events[1]) else None
     animate_results(t_values, x_values, y_values, vx_values, vy_values)
-    print(f"Максимальная длина траектории: {max(x_values):.2f} м")
+    print(f"Максимальная длина траектории: {x_values[-1]:.2f} м")
     print(f"Общее время полета: {t_values[-1]:.2f} с")
+    if height is not None:
+        print(f"Максимальная высота: {height:.2f} м")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,121 @@
+"""Обратная задача для броска с сопротивлением: угол максимальной дальности и угол попадания в цель.
+
+Все функции векторизованы по наборам параметров (v0, y0, k, цель): поиск идет одновременно
+для всех запросов, и на каждой итерации дальности для всех запросов считаются одним вызовом.
+Для модели с точным решением (линейное сопротивление) это один расчет по формулам на итерацию,
+для остальных — одно совместное интегрирование всех траекторий (solve_adaptive_ensemble).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from drag_models import landing
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+SCAN_POINTS = 46  # Углы грубого перебора от 0 до 90° (шаг 2°) для выбора начального отрезка
+ANGLE_TOL = 1e-9  # Точность углов, градусы
+
+
+def flight_range(v0, angle, y0, k, drag="linear"):
+    """Дальность полета для каждого набора параметров (параметры согласуются по broadcasting)."""
+    return landing(drag, v0, angle, y0, k)[1][..., 0]
+
+
+def _broadcast_queries(*params):
+    return np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in params))
+
+
+def max_range_angle(v0, y0, k, drag="linear", tol=ANGLE_TOL):
+    """Угол (в градусах) и дальность наибольшего по дальности броска.
+
+    Максимум ищется по углам от 0 до 90°: грубый перебор выделяет отрезок вокруг лучшего угла
+    сетки, а затем отрезок сужается методом золотого сечения. Вблизи максимума дальность
+    меняется квадратично, поэтому сам угол определяется с точностью порядка 1e-7 градуса.
+    """
+    v0, y0, k = _broadcast_queries(v0, y0, k)
+    shape = v0.shape
+    v0, y0, k = v0.ravel()[:, None], y0.ravel()[:, None], k.ravel()[:, None]
+
+    grid = np.linspace(0.0, 90.0, SCAN_POINTS)
+    best = np.argmax(flight_range(v0, grid, y0, k, drag), axis=1)
+    spacing = grid[1] - grid[0]
+    a = np.maximum(grid[best] - spacing, 0.0)
+    b = np.minimum(grid[best] + spacing, 90.0)
+
+    v0, y0, k = v0[:, 0], y0[:, 0], k[:, 0]
+    c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+    f_c, f_d = flight_range(v0, c, y0, k, drag), flight_range(v0, d, y0, k, drag)
+    while np.any(b - a > tol):
+        left = f_c > f_d  # Максимум на [a, d]
+        a, b = np.where(left, a, c), np.where(left, d, b)
+        # Одна из внутренних точек переиспользуется, вторая вычисляется заново (одним вызовом для всех)
+        new = np.where(left, b - GOLDEN * (b - a), a + GOLDEN * (b - a))
+        f_new = flight_range(v0, new, y0, k, drag)
+        c, d, f_c, f_d = (np.where(left, new, d), np.where(left, c, new),
+                          np.where(left, f_new, f_d), np.where(left, f_c, f_new))
+
+    angle = (a + b) / 2
+    return angle.reshape(shape), flight_range(v0, angle, y0, k, drag).reshape(shape)
+
+
+def _bisect(function, a, b, f_a, tol):
+    """Векторизованная бисекция для монотонной функции на отрезках [a, b] со сменой знака."""
+    while np.any(np.abs(b - a) > tol):
+        middle = (a + b) / 2
+        f_middle = function(middle)
+        same = np.sign(f_middle) == np.sign(f_a)
+        a, f_a = np.where(same, middle, a), np.where(same, f_middle, f_a)
+        b = np.where(same, b, middle)
+    return (a + b) / 2
+
+
+def angles_to_target(x_target, v0, y0, k, drag="linear", tol=ANGLE_TOL):
+    """Углы (в градусах), при которых тело падает на расстоянии x_target.
+
+    Дальность растет от угла 0 до угла максимальной дальности и убывает до нуля при 90°, поэтому
+    решений не больше двух: настильная траектория (low) и навесная (high). Возвращает массивы
+    low, high; если цель недостижима (или настильного решения нет), соответствующее значение — NaN.
+    """
+    x_target, v0, y0, k = _broadcast_queries(x_target, v0, y0, k)
+    shape = x_target.shape
+    x_target, v0, y0, k = (p.ravel() for p in (x_target, v0, y0, k))
+    best_angle, best_range = (p.ravel() for p in max_range_angle(v0, y0, k, drag, tol))
+
+    def miss(angle):
+        return flight_range(v0, angle, y0, k, drag) - x_target
+
+    reachable = x_target <= best_range
+    zeros = np.zeros_like(best_angle)
+    miss_flat = miss(zeros)
+    high = _bisect(miss, best_angle, np.full_like(best_angle, 90.0), best_range - x_target, tol)
+    low = _bisect(miss, zeros, best_angle, miss_flat, tol)
+    high = np.where(reachable, high, np.nan)
+    low = np.where(reachable & (miss_flat <= 0), low, np.nan)
+    return low.reshape(shape), high.reshape(shape)
+
+
+def _solve_shard(function, arrays, drag):
+    return function(*arrays, drag=drag)
+
+
+def solve_parallel(function, *params, drag="linear", workers=None, chunk_size=256):
+    """Решение множества независимых запросов max_range_angle или angles_to_target в пуле процессов.
+
+    Запросы (параметры согласуются по broadcasting) делятся на куски по chunk_size, каждый кусок
+    решается векторизованно в отдельном процессе. Результат тот же, что у function(*params, drag=drag).
+    drag должен передаваться в процессы, поэтому это имя модели или DragModel с функциями уровня модуля.
+    """
+    arrays = [p.ravel() for p in _broadcast_queries(*params)]
+    shape = np.broadcast_shapes(*(np.shape(p) for p in params))
+    size = arrays[0].size
+    workers = max(1, min(workers or os.cpu_count(), -(-size // chunk_size)))
+    bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    if workers == 1:
+        results = [_solve_shard(function, [a[start:stop] for a in arrays], drag) for start, stop in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_solve_shard, function, [a[start:stop] for a in arrays], drag)
+                       for start, stop in bounds]
+            results = [future.result() for future in futures]
+    return tuple(np.concatenate(parts).reshape(shape) for parts in zip(*results))
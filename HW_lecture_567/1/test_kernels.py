@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import kernels
+from benchmark import CASES
+from main import G, runge_kutta_4
+
+# Без numba ядро выполняется обычным Python, поэтому совпадение проверяется и без компиляции
+
+
+@pytest.mark.parametrize("v0, angle, y0, k, drag", CASES)
+@pytest.mark.parametrize("stride", [1, 7])
+def test_rk4_kernel_matches_integrate(v0, angle, y0, k, drag, stride):
+    reference = np.array(runge_kutta_4(v0, angle, y0, k, stride=stride, drag=drag, backend="numpy"))
+    result = np.array(runge_kutta_4(v0, angle, y0, k, stride=stride, drag=drag, backend="numba"))
+    assert result.shape == reference.shape
+    np.testing.assert_allclose(result, reference, rtol=1e-12, atol=1e-12)
+
+
+def test_kernel_grows_output_buffer():
+    state0 = [0.0, 0.0, 10.0, 10.0]
+    t_small, y_small = kernels.projectile_rk4(state0, 0.1, False, G, 0.01, 10, capacity=4)
+    t_large, y_large = kernels.projectile_rk4(state0, 0.1, False, G, 0.01, 10)
+    np.testing.assert_array_equal(t_small, t_large)
+    np.testing.assert_array_equal(y_small, y_large)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import drag_models
+from drag_models import LINEAR, QUADRATIC, DragModel, landing, linear_drag_landing
+from targeting import angles_to_target, max_range_angle
+
+
+# Случайные наборы параметров броска, включая бросок с земли горизонтально и вертикально вверх
+def random_launches(n, seed=0):
+    rng = np.random.default_rng(seed)
+    v0, angle = rng.uniform(1, 60, n), rng.uniform(0, 90, n)
+    y0, k = rng.uniform(0, 30, n), rng.uniform(0, 0.3, n)
+    y0[:2], angle[0], angle[1] = 0, 0, 90
+    return v0, angle, y0, k
+
+
+# Число вызовов интегратора ансамбля; поочередное интегрирование запросов запрещено
+@pytest.fixture
+def solver_calls(monkeypatch):
+    calls = []
+    ensemble = drag_models.solve_adaptive_ensemble
+
+    def counting(rhs, y0, *args, **kwargs):
+        calls.append(len(y0))
+        return ensemble(rhs, y0, *args, **kwargs)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("Дальность считается отдельным solve_adaptive для каждого запроса")
+
+    monkeypatch.setattr(drag_models, "solve_adaptive_ensemble", counting)
+    monkeypatch.setattr(drag_models, "solve_adaptive", forbidden)
+    return calls
+
+
+def test_quadratic_landing_matches_single_trajectories():
+    v0, angle, y0, k = random_launches(50)
+    _, solutions = drag_models._numerical_solutions(QUADRATIC, v0, angle, y0, k, 1e-10, 1e-12)
+    t_end, y_end = landing("quadratic", v0, angle, y0, k)
+    np.testing.assert_allclose(t_end, [s.t[-1] for s in solutions], rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(y_end, [s.y[-1] for s in solutions], rtol=1e-12, atol=1e-12)
+
+
+def test_numerical_landing_matches_exact_solution():
+    v0, angle, y0, k = random_launches(50, seed=1)
+    numerical = DragModel("linear_numerical", "линейное без точного решения", LINEAR.rhs)
+    t_end, y_end = landing(numerical, v0, angle, y0, k)
+    t_exact, y_exact = linear_drag_landing(v0, angle, y0, k)
+    np.testing.assert_allclose(t_end, t_exact, rtol=1e-8, atol=1e-9)
+    np.testing.assert_allclose(y_end, y_exact, rtol=1e-8, atol=1e-8)
+
+
+def test_max_range_angle_is_batched(solver_calls):
+    max_range_angle(30, 0, 0.02, "quadratic", tol=1e-6)
+    single = list(solver_calls)
+    solver_calls.clear()
+    angle, distance = max_range_angle(np.full(4, 30.0), 0, [0.02, 0.02, 0.02, 0.02], "quadratic", tol=1e-6)
+    # Столько же вызовов, сколько для одного запроса, и в каждом — кандидаты всех запросов
+    assert len(solver_calls) == len(single)
+    assert solver_calls == [4 * n for n in single]
+    assert np.ptp(angle) == 0 and 30 < angle[0] < 45
+
+
+def test_angles_to_target_is_batched(solver_calls):
+    angles_to_target(20, 20, 0, 0.01, "quadratic", tol=1e-6)
+    single = len(solver_calls)
+    solver_calls.clear()
+    low, high = angles_to_target([10, 20, 30, 1000], 20, 0, 0.01, "quadratic", tol=1e-6)
+    assert len(solver_calls) == single
+    assert np.all(low[:3] < high[:3]) and np.isnan(high[3])
+    distance = landing("quadratic", 20, np.concatenate((low[:3], high[:3])), 0, 0.01)[1][:, 0]
+    np.testing.assert_allclose(distance, [10, 20, 30] * 2, atol=1e-5)
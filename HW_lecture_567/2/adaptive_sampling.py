@@ -0,0 +1,138 @@
+"""Адаптивная выборка потенциала на квадродереве.
+
+Область сначала делится на грубую сетку ячеек. В каждой ячейке значения берутся в 9 точках
+(углы, середины сторон и центр); ячейка делится на четыре, если функция в ней заметно меняется
+(градиент) или плохо приближается линейной интерполяцией по углам (кривизна). Точки лежат на
+общей целочисленной решетке самого мелкого уровня, поэтому соседние ячейки и дочерние ячейки
+используют уже посчитанные значения, и каждая точка вычисляется один раз. Все уровни
+обрабатываются векторизованно: на каждый уровень приходится один вызов функции.
+
+Результат — разреженный набор точек, который рисуется через plt.tricontourf.
+"""
+import numpy as np
+
+# Число ячеек грубой сетки по каждой оси
+DEFAULT_INITIAL = 8
+
+# Наибольшее число делений ячейки грубой сетки
+DEFAULT_MAX_DEPTH = 7
+
+# Смещения 9 точек ячейки в половинах ее стороны: углы, середины сторон, центр
+_CORNERS = np.array([[0, 0], [2, 0], [0, 2], [2, 2]])
+_MIDPOINTS = np.array([[1, 0], [0, 1], [2, 1], [1, 2], [1, 1]])
+# Для каждой средней точки — пара углов, между которыми она лежит (для центра — диагональ)
+_MIDPOINT_ENDS = np.array([[0, 1], [0, 2], [1, 3], [2, 3], [0, 3]])
+_OFFSETS = np.concatenate((_CORNERS, _MIDPOINTS))
+
+
+class AdaptiveSample:
+    """Результат адаптивной выборки.
+
+    x, y, values — координаты и значения всех вычисленных точек;
+    cells — листья дерева: массив (n, 3) из решеточных координат угла и стороны ячейки;
+    spacing — шаг решетки по x и y;
+    value_range — характерный диапазон значений на грубой сетке (для шкалы графика);
+    n_evaluations — число вычислений функции (совпадает с числом точек).
+    """
+
+    def __init__(self, x, y, values, cells, spacing, value_range):
+        self.x = x
+        self.y = y
+        self.values = values
+        self.cells = cells
+        self.spacing = spacing
+        self.value_range = value_range
+
+    @property
+    def n_evaluations(self):
+        return len(self.values)
+
+    def finite(self):
+        """Точки с конечными значениями (особые точки потенциала tricontourf не рисует)."""
+        mask = np.isfinite(self.values)
+        return self.x[mask], self.y[mask], self.values[mask]
+
+
+def _value_range(values):
+    """Характерный диапазон значений: 1-й и 99-й процентили, чтобы особые точки
+    (огромные значения рядом с сингулярностью) не делали допуск бесполезно большим."""
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return 0.0, 1.0
+    low, high = np.percentile(finite, [1, 99])
+    if high <= low:
+        return low - 0.5 * max(abs(low), 1.0), high + 0.5 * max(abs(high), 1.0)
+    return low, high
+
+
+def sample_adaptive(function, x_min, x_max, y_min, y_max, tol=0.01, gradient_tol=0.25,
+                    initial=DEFAULT_INITIAL, max_depth=DEFAULT_MAX_DEPTH):
+    """Адаптивная выборка function(X, Y) на прямоугольнике.
+
+    Ячейка делится, если ошибка линейной интерполяции по углам в средних точках больше
+    tol * S (кривизна) или если размах значений в ячейке больше gradient_tol * S (градиент),
+    где S — характерный размах значений на грубой сетке. Ячейки с бесконечными или
+    неопределенными значениями делятся до max_depth.
+    """
+    # Шаг решетки — половина стороны ячейки самого мелкого уровня
+    unit = 2 ** (max_depth + 1)
+    n_lattice_x = n_lattice_y = initial * unit + 1
+    spacing = ((x_max - x_min) / (n_lattice_x - 1), (y_max - y_min) / (n_lattice_y - 1))
+
+    keys = np.empty(0, dtype=np.int64)      # Отсортированные номера вычисленных точек решетки
+    known = np.empty(0, dtype=float)        # Значения в этих точках
+
+    def values_at(i, j):
+        # Значения в точках решетки (i, j); вычисляются только новые точки
+        nonlocal keys, known
+        point_keys = i * n_lattice_y + j
+        new = np.unique(point_keys)
+        new = new[~np.isin(new, keys, assume_unique=True)]
+        if len(new):
+            ni, nj = np.divmod(new, n_lattice_y)
+            computed = np.asarray(function(x_min + ni * spacing[0], y_min + nj * spacing[1]), dtype=float)
+            keys = np.concatenate((keys, new))
+            known = np.concatenate((known, np.broadcast_to(computed, new.shape)))
+            order = np.argsort(keys, kind="stable")
+            keys, known = keys[order], known[order]
+        return known[np.searchsorted(keys, point_keys)]
+
+    # Ячейки грубой сетки: решеточные координаты левого нижнего угла и сторона
+    ci, cj = np.meshgrid(np.arange(initial) * unit, np.arange(initial) * unit, indexing="ij")
+    cells = np.column_stack((ci.ravel(), cj.ravel(), np.full(ci.size, unit)))
+    leaves = []
+    value_range = None
+    for depth in range(max_depth + 1):
+        half = cells[:, 2:3] // 2
+        i = cells[:, 0:1] + _OFFSETS[:, 0] * half
+        j = cells[:, 1:2] + _OFFSETS[:, 1] * half
+        samples = values_at(i, j)
+        if value_range is None:
+            value_range = _value_range(samples)
+            scale = value_range[1] - value_range[0]
+        if depth == max_depth:
+            leaves.append(cells)
+            break
+
+        corners, midpoints = samples[:, :4], samples[:, 4:]
+        with np.errstate(invalid="ignore"):
+            interpolated = corners[:, _MIDPOINT_ENDS].mean(axis=2)
+            curvature = np.abs(midpoints - interpolated).max(axis=1)
+            variation = samples.max(axis=1) - samples.min(axis=1)
+            refine = (curvature > tol * scale) | (variation > gradient_tol * scale)
+        refine |= ~np.isfinite(samples).all(axis=1)
+
+        leaves.append(cells[~refine])
+        parents = cells[refine]
+        if len(parents) == 0:
+            break
+        # Четыре дочерние ячейки вдвое меньшей стороны
+        child_half = parents[:, 2] // 2
+        cells = np.concatenate([
+            np.column_stack((parents[:, 0] + dx * child_half, parents[:, 1] + dy * child_half, child_half))
+            for dx in (0, 1) for dy in (0, 1)
+        ])
+
+    li, lj = np.divmod(keys, n_lattice_y)
+    return AdaptiveSample(x_min + li * spacing[0], y_min + lj * spacing[1], known,
+                          np.concatenate(leaves), spacing, value_range)
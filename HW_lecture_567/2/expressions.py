@@ -0,0 +1,310 @@
+"""Безопасная компиляция пользовательских формул потенциала U(x, y) в векторизованные функции NumPy.
+
+Формула разбирается модулем ast, и допускаются только числа, переменные x и y, константы pi и e,
+арифметические операции и функции из FUNCTIONS. Все остальное (атрибуты, индексы, вызовы
+произвольных объектов, лямбды и т. д.) отвергается до выполнения. Скомпилированные функции
+кэшируются по тексту формулы.
+
+Для формулы строится и символьная производная (по правилам дифференцирования для каждой
+операции), поэтому сила F = -grad U вычисляется по точным формулам. Для функций, у которых
+символьной производной нет, используются центральные конечные разности.
+"""
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+MAX_EXPRESSION_LENGTH = 1000
+
+# Допустимые функции (с синонимами) и их реализации в NumPy
+FUNCTIONS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan, "arctan2": np.arctan2,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "log": np.log, "log10": np.log10, "sqrt": np.sqrt,
+    "abs": np.abs, "sign": np.sign, "hypot": np.hypot, "minimum": np.minimum, "maximum": np.maximum,
+}
+ALIASES = {"asin": "arcsin", "acos": "arccos", "atan": "arctan", "atan2": "arctan2", "ln": "log",
+           "min": "minimum", "max": "maximum"}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+VARIABLES = ("x", "y")
+
+_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod)
+
+
+class ExpressionError(ValueError):
+    """Формула содержит недопустимые конструкции или синтаксические ошибки."""
+
+
+class CompiledPotential:
+    """Скомпилированная формула: вызов potential(x, y) вычисляет U на массивах координат.
+
+    gradient — пара функций (dU/dx, dU/dy) или None, если символьная производная не построена.
+    """
+
+    def __init__(self, expression, tree):
+        self.expression = expression
+        self._function = _compile(tree)
+        try:
+            self.gradient = tuple(_compile(_derivative(tree.body, var)) for var in VARIABLES)
+        except _NoDerivative:
+            self.gradient = None
+
+    def __call__(self, x, y):
+        return self._function(x, y)
+
+    def __repr__(self):
+        return f"CompiledPotential({self.expression!r})"
+
+
+@lru_cache(maxsize=128)
+def compile_potential(expression):
+    """Компиляция формулы U(x, y). Знак ^ означает возведение в степень (как **)."""
+    expression = expression.strip()
+    if not expression:
+        raise ExpressionError("Пустая формула.")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Формула длиннее {MAX_EXPRESSION_LENGTH} символов.")
+    try:
+        # ^ заменяется до разбора: у оператора xor в Python другой приоритет, чем у степени
+        tree = ast.parse(expression.replace("^", "**"), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Синтаксическая ошибка в формуле: {e.msg}.") from None
+    return CompiledPotential(expression, _Validator().visit(tree))
+
+
+class _Validator(ast.NodeTransformer):
+    """Проверка формулы по белому списку и приведение к каноническому виду.
+
+    Числа переводятся в float (целочисленная степень вида 9**9**9 иначе считалась бы бесконечно),
+    константы pi и e — в числа, синонимы функций — в основные имена.
+    """
+
+    def generic_visit(self, node):
+        raise ExpressionError(f"Недопустимая конструкция в формуле: {type(node).__name__}.")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Недопустимая константа: {node.value!r}.")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node):
+        if node.id in VARIABLES:
+            return node
+        if node.id in CONSTANTS:
+            return ast.copy_location(ast.Constant(CONSTANTS[node.id]), node)
+        raise ExpressionError(f"Неизвестное имя: {node.id}. Допустимы x, y, pi, e.")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _OPERATORS):
+            raise ExpressionError(f"Недопустимая операция: {type(node.op).__name__}.")
+        node.left, node.right = self.visit(node.left), self.visit(node.right)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, (ast.UAdd, ast.USub)):
+            raise ExpressionError(f"Недопустимая операция: {type(node.op).__name__}.")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Call(self, node):
+        name = getattr(node.func, "id", None) if isinstance(node.func, ast.Name) else None
+        name = ALIASES.get(name, name)
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Недопустимая функция: {ast.unparse(node.func)}.")
+        if node.keywords:
+            raise ExpressionError(f"Функция {name} не принимает именованных аргументов.")
+        node.func = ast.Name(name, ast.Load())
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def _compile(node):
+    """Векторизованная функция (x, y) для проверенного выражения."""
+    expression = node if isinstance(node, ast.Expression) else ast.Expression(node)
+    code = compile(ast.fix_missing_locations(expression), "<формула>", "eval")
+    namespace = {"__builtins__": {}, **FUNCTIONS}
+
+    def function(x, y):
+        value = eval(code, namespace, {"x": x, "y": y})
+        # Формула может не зависеть от координат (например, производная линейного потенциала)
+        return np.broadcast_to(value, np.broadcast(x, y, value).shape)
+    return function
+
+
+class _NoDerivative(Exception):
+    pass
+
+
+# Построение выражений для производных со свертыванием констант и тривиальных множителей
+
+def _const(node):
+    return node.value if isinstance(node, ast.Constant) else None
+
+
+def _num(value):
+    return ast.Constant(float(value))
+
+
+def _binop(left, op, right):
+    a, b = _const(left), _const(right)
+    if a is not None and b is not None:
+        try:
+            return _num(_FOLD[type(op)](a, b))
+        except (ArithmeticError, ValueError):
+            pass
+    return ast.BinOp(left, op, right)
+
+
+_FOLD = {ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+         ast.Div: lambda a, b: a / b, ast.Pow: lambda a, b: a ** b}
+
+
+def _add(a, b):
+    if _const(a) == 0:
+        return b
+    if _const(b) == 0:
+        return a
+    return _binop(a, ast.Add(), b)
+
+
+def _sub(a, b):
+    if _const(b) == 0:
+        return a
+    if _const(a) == 0:
+        return _neg(b)
+    return _binop(a, ast.Sub(), b)
+
+
+def _mul(a, b):
+    if _const(a) == 0 or _const(b) == 0:
+        return _num(0)
+    if _const(a) == 1:
+        return b
+    if _const(b) == 1:
+        return a
+    return _binop(a, ast.Mult(), b)
+
+
+def _div(a, b):
+    if _const(a) == 0:
+        return _num(0)
+    if _const(b) == 1:
+        return a
+    return _binop(a, ast.Div(), b)
+
+
+def _pow(a, b):
+    if _const(b) == 1:
+        return a
+    if _const(b) == 0:
+        return _num(1)
+    return _binop(a, ast.Pow(), b)
+
+
+def _neg(a):
+    if _const(a) is not None:
+        return _num(-_const(a))
+    return ast.UnaryOp(ast.USub(), a)
+
+
+def _call(name, *args):
+    return ast.Call(ast.Name(name, ast.Load()), list(args), [])
+
+
+def _depends_on(node, var):
+    return any(isinstance(n, ast.Name) and n.id == var for n in ast.walk(node))
+
+
+def _derivative(node, var):
+    """Символьная производная проверенного выражения по переменной var."""
+    if not _depends_on(node, var):
+        return _num(0)
+    if isinstance(node, ast.Name):
+        return _num(1)
+    if isinstance(node, ast.UnaryOp):
+        d = _derivative(node.operand, var)
+        return _neg(d) if isinstance(node.op, ast.USub) else d
+    if isinstance(node, ast.BinOp):
+        a, b = node.left, node.right
+        da, db = _derivative(a, var), _derivative(b, var)
+        if isinstance(node.op, ast.Add):
+            return _add(da, db)
+        if isinstance(node.op, ast.Sub):
+            return _sub(da, db)
+        if isinstance(node.op, ast.Mult):
+            return _add(_mul(da, b), _mul(a, db))
+        if isinstance(node.op, ast.Div):
+            return _div(_sub(_mul(da, b), _mul(a, db)), _pow(b, _num(2)))
+        if isinstance(node.op, ast.Pow):
+            if not _depends_on(b, var):
+                # (a^c)' = c * a^(c-1) * a'
+                return _mul(_mul(b, _pow(a, _sub(b, _num(1)))), da)
+            # (a^b)' = a^b * (b' * ln a + b * a' / a)
+            return _mul(node, _add(_mul(db, _call("log", a)), _div(_mul(b, da), a)))
+        raise _NoDerivative
+    if isinstance(node, ast.Call):
+        name, args = node.func.id, node.args
+        if name in _CHAIN_RULES and len(args) == 1:
+            return _mul(_CHAIN_RULES[name](args[0]), _derivative(args[0], var))
+        if name == "hypot" and len(args) == 2:
+            u, v = args
+            numerator = _add(_mul(u, _derivative(u, var)), _mul(v, _derivative(v, var)))
+            return _div(numerator, node)
+        if name == "arctan2" and len(args) == 2:
+            u, v = args
+            numerator = _sub(_mul(v, _derivative(u, var)), _mul(u, _derivative(v, var)))
+            return _div(numerator, _add(_pow(u, _num(2)), _pow(v, _num(2))))
+    raise _NoDerivative
+
+
+# Производные функций одного аргумента f'(u)
+_CHAIN_RULES = {
+    "sin": lambda u: _call("cos", u),
+    "cos": lambda u: _neg(_call("sin", u)),
+    "tan": lambda u: _div(_num(1), _pow(_call("cos", u), _num(2))),
+    "arcsin": lambda u: _div(_num(1), _call("sqrt", _sub(_num(1), _pow(u, _num(2))))),
+    "arccos": lambda u: _div(_num(-1), _call("sqrt", _sub(_num(1), _pow(u, _num(2))))),
+    "arctan": lambda u: _div(_num(1), _add(_num(1), _pow(u, _num(2)))),
+    "sinh": lambda u: _call("cosh", u),
+    "cosh": lambda u: _call("sinh", u),
+    "tanh": lambda u: _sub(_num(1), _pow(_call("tanh", u), _num(2))),
+    "exp": lambda u: _call("exp", u),
+    "log": lambda u: _div(_num(1), u),
+    "log10": lambda u: _div(_num(1), _mul(u, _num(math.log(10)))),
+    "sqrt": lambda u: _div(_num(0.5), _call("sqrt", u)),
+    "abs": lambda u: _call("sign", u),
+    "sign": lambda u: _num(0),
+}
+
+
+def finite_difference_gradient(function, x, y, step=None):
+    """Градиент function(x, y) центральными разностями (векторизованно по всем точкам).
+
+    Шаг по умолчанию пропорционален eps^(1/3) и масштабу координат, что минимизирует сумму
+    ошибки разностной схемы и ошибки округления.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    if step is None:
+        step = np.finfo(float).eps ** (1 / 3)
+        hx, hy = step * np.maximum(1.0, np.abs(x)), step * np.maximum(1.0, np.abs(y))
+    else:
+        hx = hy = step
+    dU_dx = (function(x + hx, y) - function(x - hx, y)) / (2 * hx)
+    dU_dy = (function(x, y + hy) - function(x, y - hy)) / (2 * hy)
+    return dU_dx, dU_dy
+
+
+def force_field(potential, x, y):
+    """Сила F = -grad U в точках (x, y): по символьной производной, если она есть, иначе разностями."""
+    gradient = getattr(potential, "gradient", None)
+    if gradient is not None:
+        dU_dx, dU_dy = gradient[0](x, y), gradient[1](x, y)
+    else:
+        dU_dx, dU_dy = finite_difference_gradient(potential, x, y)
+    return -dU_dx, -dU_dy
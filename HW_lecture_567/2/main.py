@@ -1,75 +1,164 @@
+import argparse
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import sys
 
-# Выбор типа поля
-print("Выберите тип силового поля:")
-print("1. Гравитационное поле: U = m * g * y, зависит от высоты.")
-print("2. Пружинное поле: U = 1/2 * k * (x^2 + y^2), симметрично вокруг начала координат.")
-print("3. Пользовательское поле: степенная функция от координат.")
+from adaptive_sampling import sample_adaptive
+from expressions import FUNCTIONS, ExpressionError, compile_potential, force_field
+from tiled_field import DEFAULT_TILE, display_view, evaluate_tiled
 
-try:
-    field_type = int(input("Введите номер поля: "))
-except ValueError:
-    sys.exit("Ошибка: номер поля должен быть числом.")
 
-if field_type == 1:
-    try:
-        m = float(input("Введите массу тела (кг): "))  # Масса для гравитационного поля
-        g = 9.81  # Ускорение свободного падения, м/с^2
+# Выбор типа поля
+def choose_potential():
+    print("Выберите тип силового поля:")
+    print("1. Гравитационное поле: U = m * g * y, зависит от высоты.")
+    print("2. Пружинное поле: U = 1/2 * k * (x^2 + y^2), симметрично вокруг начала координат.")
+    print("3. Пользовательское поле: степенная функция от координат.")
+    print("4. Произвольное поле: формула U(x, y), например sin(x) * exp(-y^2).")
 
-        # Функция для гравитационной потенциальной энергии
-        def potential_energy(x, y):
-            return m * g * y  # U = m * g * y, зависит только от высоты y
+    try:
+        field_type = int(input("Введите номер поля: "))
     except ValueError:
-        sys.exit("Ошибка: масса тела должна быть числом.")
+        sys.exit("Ошибка: номер поля должен быть числом.")
 
-elif field_type == 2:
+    if field_type == 1:
+        try:
+            m = float(input("Введите массу тела (кг): "))  # Масса для гравитационного поля
+            g = 9.81  # Ускорение свободного падения, м/с^2
+        except ValueError:
+            sys.exit("Ошибка: масса тела должна быть числом.")
+        formula = f"{m!r} * {g!r} * y"  # U = m * g * y, зависит только от высоты y
+
+    elif field_type == 2:
+        try:
+            k = float(input("Введите жесткость пружины (Н/м): "))  # Коэффициент жесткости пружины
+        except ValueError:
+            sys.exit("Ошибка: коэффициент жесткости должен быть числом.")
+        formula = f"0.5 * {k!r} * (x**2 + y**2)"  # U = 1/2 * k * r^2, где r - расстояние от точки (0,0)
+
+    elif field_type == 3:
+        try:
+            a = float(input("Введите степень зависимости силы по x (например, 2 для x^2): "))
+            b = float(input("Введите степень зависимости силы по y (например, 2 для y^2): "))
+            coeff = float(input("Введите коэффициент перед степенной функцией: "))
+        except ValueError:
+            sys.exit("Ошибка: параметры пользовательского поля должны быть числами.")
+        formula = f"{coeff!r} * (x**({a!r}) + y**({b!r}))"
+
+    elif field_type == 4:
+        print(f"Допустимы x, y, pi, e, + - * / ** ^ % и функции: {', '.join(FUNCTIONS)}.")
+        formula = input("Введите формулу U(x, y): ")
+
+    else:
+        sys.exit("Неверный выбор поля. Программа завершена.")
+
+    # Формула проверяется и компилируется в векторизованную функцию вместе с производными
     try:
-        k = float(input("Введите жесткость пружины (Н/м): "))  # Коэффициент жесткости пружины
+        potential_energy = compile_potential(formula)
+    except ExpressionError as e:
+        sys.exit(f"Ошибка: {e}")
+    return potential_energy
+
 
-        # Функция для потенциальной энергии упругости
-        def potential_energy(x, y):
-            return 0.5 * k * (x**2 + y**2)  # U = 1/2 * k * r^2, где r - расстояние от точки (0,0)
+# Задание диапазона координат
+def read_bounds():
+    try:
+        x_min = float(input("Введите минимальное значение x: "))
+        x_max = float(input("Введите максимальное значение x: "))
+        y_min = float(input("Введите минимальное значение y: "))
+        y_max = float(input("Введите максимальное значение y: "))
     except ValueError:
-        sys.exit("Ошибка: коэффициент жесткости должен быть числом.")
+        sys.exit("Ошибка: границы координат должны быть числами.")
+    return x_min, x_max, y_min, y_max
+
+
+# Оформление графика: шкала, стрелки силы, подписи
+def plot_potential(cp, potential_energy, bounds, arrows):
+    x_min, x_max, y_min, y_max = bounds
+    plt.colorbar(cp, label='Потенциальная энергия U(x, y)')
+
+    # Сила F = -grad U на редкой сетке: по символьной производной формулы
+    if arrows:
+        X, Y = np.meshgrid(np.linspace(x_min, x_max, arrows), np.linspace(y_min, y_max, arrows))
+        with np.errstate(all='ignore'):
+            Fx, Fy = force_field(potential_energy, X, Y)
+        plt.quiver(X, Y, Fx, Fy, color='white', alpha=0.8)
+    plt.title(f"Потенциальное поле U = {potential_energy.expression}")
+    plt.xlabel("x (м)")
+    plt.ylabel("y (м)")
+    plt.show()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Расчет и визуализация потенциального поля.")
+    parser.add_argument("--resolution", type=int, nargs="+", default=[100],
+                        help="Число точек сетки по x и y (одно число — одинаково по обеим осям).")
+    parser.add_argument("--output", default=None,
+                        help="Файл .npy для сетки значений. Сетка пишется прямо в файл, а не в память.")
+    parser.add_argument("--float32", action="store_true", help="Считать и хранить значения в float32.")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE, help="Сторона блока сетки.")
+    parser.add_argument("--workers", type=int, default=None, help="Число потоков (по умолчанию — по числу ядер).")
+    parser.add_argument("--adaptive", type=float, nargs="?", const=0.01, default=None, metavar="TOL",
+                        help="Адаптивная выборка на квадродереве вместо равномерной сетки; "
+                             "TOL — допустимая ошибка интерполяции в долях размаха U (по умолчанию 0.01).")
+    parser.add_argument("--arrows", type=int, default=20,
+                        help="Число стрелок силы F = -grad U по каждой оси (0 — без стрелок).")
+    parser.add_argument("--no-plot", action="store_true", help="Только рассчитать сетку, без графика.")
+    args = parser.parse_args(argv)
+    if len(args.resolution) not in (1, 2) or min(args.resolution) < 2:
+        parser.error("разрешение — одно или два числа не меньше 2")
+    if args.adaptive is not None and (args.adaptive <= 0 or args.output):
+        parser.error("--adaptive требует положительного допуска и несовместим с --output")
+    if args.arrows < 0:
+        parser.error("число стрелок не может быть отрицательным")
+    if args.tile <= 0:
+        parser.error("сторона блока должна быть положительной")
+    return args
 
-elif field_type == 3:
+
+def main(argv=None):
+    args = parse_args(argv)
+    potential_energy = choose_potential()
+    x_min, x_max, y_min, y_max = read_bounds()
+
+    if args.adaptive is not None:
+        # Точки сгущаются там, где U быстро меняется или сильно искривлена
+        try:
+            sample = sample_adaptive(potential_energy, x_min, x_max, y_min, y_max, tol=args.adaptive)
+        except (ArithmeticError, ValueError) as e:
+            sys.exit(f"Ошибка при вычислении потенциала: {e}")
+        print(f"Адаптивная выборка: {sample.n_evaluations} вычислений U, {len(sample.cells)} ячеек")
+        if args.no_plot:
+            return
+        plt.figure(figsize=(8, 6))
+        # Шкала — по диапазону на грубой сетке: у особых точек потенциала сгущено много огромных значений
+        cp = plt.tricontourf(*sample.finite(), levels=np.linspace(*sample.value_range, 100),
+                             cmap='plasma', extend='both')
+        plot_potential(cp, potential_energy, (x_min, x_max, y_min, y_max), args.arrows)
+        return
+
+    nx, ny = args.resolution * (3 - len(args.resolution))
+    x_points = np.linspace(x_min, x_max, nx)
+    y_points = np.linspace(y_min, y_max, ny)
+
+    # Сетка значений считается блоками; при --output она сразу пишется в файл
     try:
-        a = float(input("Введите степень зависимости силы по x (например, 2 для x^2): "))
-        b = float(input("Введите степень зависимости силы по y (например, 2 для y^2): "))
-        coeff = float(input("Введите коэффициент перед степенной функцией: "))
+        U = evaluate_tiled(potential_energy, x_points, y_points, out=args.output,
+                           dtype=np.float32 if args.float32 else np.float64, tile=args.tile, workers=args.workers)
+    except (ArithmeticError, ValueError) as e:
+        sys.exit(f"Ошибка при вычислении потенциала: {e}")
+    if args.output:
+        print(f"Сетка {ny} x {nx} сохранена в {args.output}")
+    if args.no_plot:
+        return
 
-        # Пользовательская функция для потенциальной энергии
-        def potential_energy(x, y):
-            return coeff * (x**a + y**b)
-    except ValueError:
-        sys.exit("Ошибка: параметры пользовательского поля должны быть числами.")
+    # Визуализация потенциального поля (большие сетки прореживаются для отображения)
+    x_view, y_view, U_view = display_view(x_points, y_points, U)
+    plt.figure(figsize=(8, 6))
+    cp = plt.contourf(x_view, y_view, U_view, levels=100, cmap='plasma')
+    plot_potential(cp, potential_energy, (x_min, x_max, y_min, y_max), args.arrows)
 
-else:
-    sys.exit("Неверный выбор поля. Программа завершена.")
 
-# Задание диапазона координат
-try:
-    x_min = float(input("Введите минимальное значение x: "))
-    x_max = float(input("Введите максимальное значение x: "))
-    y_min = float(input("Введите минимальное значение y: "))
-    y_max = float(input("Введите максимальное значение y: "))
-except ValueError:
-    sys.exit("Ошибка: границы координат должны быть числами.")
-
-x_points = np.linspace(x_min, x_max, 100)
-y_points = np.linspace(y_min, y_max, 100)
-
-# Создание сетки координат
-X, Y = np.meshgrid(x_points, y_points)
-U = potential_energy(X, Y)
-
-# Визуализация потенциального поля
-plt.figure(figsize=(8, 6))
-cp = plt.contourf(X, Y, U, levels=100, cmap='plasma')
-plt.colorbar(cp, label='Потенциальная энергия U(x, y)')
-plt.title("Потенциальное поле")
-plt.xlabel("x (м)")
-plt.ylabel("y (м)")
-plt.show()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Вычисление потенциала на больших сетках блоками (тайлами) ограниченного размера.
+
+Сетка координат целиком не строится: для каждого блока создаются только его собственные
+координаты, значения записываются на свое место в выходном массиве, и временные массивы
+сразу освобождаются. Результат можно писать прямо в файл .npy, тогда расход памяти
+не зависит от разрешения. Блоки считаются в пуле потоков: операции NumPy отпускают GIL.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Сторона блока: 256 x 256 значений float64 занимают 512 КБ и помещаются в кэш второго уровня
+DEFAULT_TILE = 256
+
+# Наибольшее число точек по оси при отображении: большие сетки прореживаются
+DISPLAY_POINTS = 1000
+
+
+def iter_tiles(ny, nx, tile=DEFAULT_TILE):
+    """Блоки сетки ny x nx: пары срезов (строки, столбцы)."""
+    for row in range(0, ny, tile):
+        for col in range(0, nx, tile):
+            yield slice(row, min(row + tile, ny)), slice(col, min(col + tile, nx))
+
+
+def open_output(path, shape, dtype=np.float64):
+    """Выходной массив, отображенный в файл .npy (файл создается сразу полного размера)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+
+def evaluate_tiled(function, x_points, y_points, out=None, dtype=np.float64, tile=DEFAULT_TILE, workers=None):
+    """Значения function(X, Y) на сетке x_points x y_points (в форме np.meshgrid: строки — y).
+
+    out — готовый массив формы (len(y_points), len(x_points)), путь к файлу .npy или None
+    (массив в памяти). Файл создается сразу полного размера и заполняется полосами из нескольких рядов блоков:
+    в память отображается только текущая полоса, поэтому расход памяти не зависит от размера сетки.
+    Возвращается массив, отображенный в этот файл. Координаты и вычисления в блоке ведутся
+    в типе dtype, поэтому float32 вдвое уменьшает и память, и объем вычислений.
+    workers — число потоков (по умолчанию по числу процессоров, 1 — без пула).
+    """
+    x_points = np.asarray(x_points, dtype=dtype)
+    y_points = np.asarray(y_points, dtype=dtype)
+    shape = (len(y_points), len(x_points))
+    path = out if isinstance(out, (str, os.PathLike)) else None
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif path is None and out.shape != shape:
+        raise ValueError(f"Форма выходного массива {out.shape} не совпадает с формой сетки {shape}")
+
+    def evaluate_tile(target, first_row, block):
+        rows, cols = block
+        X, Y = np.meshgrid(x_points[cols], y_points[rows.start + first_row:rows.stop + first_row])
+        target[rows, cols] = function(X, Y)
+
+    def evaluate_band(target, first_row, pool):
+        # Задачи — только пары срезов; массивы блока существуют, пока блок считается
+        tiles = iter_tiles(target.shape[0], target.shape[1], tile)
+        if pool is None:
+            for block in tiles:
+                evaluate_tile(target, first_row, block)
+        else:
+            for _ in pool.map(lambda block: evaluate_tile(target, first_row, block), tiles):
+                pass
+
+    workers = workers or os.cpu_count()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if path is None:
+            evaluate_band(out, 0, pool)
+            return out
+        header = open_output(path, shape, dtype)
+        offset, itemsize = header.offset, header.dtype.itemsize
+        del header
+        band_rows = tile * max(1, workers)
+        for first_row in range(0, shape[0], band_rows):
+            rows = min(band_rows, shape[0] - first_row)
+            band = np.memmap(path, dtype=dtype, mode="r+", shape=(rows, shape[1]),
+                             offset=offset + first_row * shape[1] * itemsize)
+            evaluate_band(band, first_row, pool)
+            band.flush()
+            del band
+        return np.load(path, mmap_mode="r+")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def display_view(x_points, y_points, values, max_points=DISPLAY_POINTS):
+    """Прореженные координаты и значения для отображения (срезы без копирования всей сетки)."""
+    step_y = max(1, -(-len(y_points) // max_points))
+    step_x = max(1, -(-len(x_points) // max_points))
+    return x_points[::step_x], y_points[::step_y], np.asarray(values[::step_y, ::step_x])
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+import numpy as np
+
+from kernels import BACKEND
+from main import M, g_L, find_engine_start_point, m, simulate_free_fall
+
+
+# Расчет посадки целиком: свободное падение и поиск точки включения двигателя
+def solve_landing(H0, V0, dt, backend):
+    t, H, V = simulate_free_fall(H0, V0, g_L, dt, backend=backend)
+    return (t, H, V), find_engine_start_point(t, H, V, M, m, dt, backend=backend)
+
+
+# Наибольшее расхождение результатов вычислителей NumPy и Numba
+def check_parity(H0, V0, dt):
+    (free_np, landing_np), (free_nb, landing_nb) = (solve_landing(H0, V0, dt, b) for b in ("numpy", "numba"))
+    if landing_np[0] != landing_nb[0]:
+        raise AssertionError(f"Разные точки включения двигателя: {landing_np[0]} и {landing_nb[0]}")
+    arrays = list(zip(free_np, free_nb)) + list(zip(landing_np[1:], landing_nb[1:]))
+    return max(np.abs(a - b).max() for a, b in arrays)
+
+
+# Время расчета посадки (лучшее из repeat запусков)
+def measure(H0, V0, dt, backend, repeat):
+    solve_landing(H0, V0, dt, backend)  # Компиляция ядер при первом вызове
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solve_landing(H0, V0, dt, backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение вычислителей расчета посадки: NumPy и Numba.")
+    parser.add_argument("--height", type=float, default=20000.0, help="Начальная высота, м.")
+    parser.add_argument("--speed", type=float, default=29.0, help="Начальная вертикальная скорость, м/с.")
+    parser.add_argument("--dt", type=float, default=0.01, help="Шаг по времени.")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторов замера.")
+    args = parser.parse_args()
+
+    backends = ["numpy"] + (["numba"] if BACKEND == "numba" else [])
+    if len(backends) == 1:
+        print("Пакет numba не установлен, доступен только вычислитель NumPy.")
+    else:
+        for dt in (0.1, args.dt):
+            print(f"Наибольшее расхождение (dt={dt}): {check_parity(args.height, args.speed, dt):.2e}")
+    for backend in backends:
+        elapsed = measure(args.height, args.speed, args.dt, backend, args.repeat)
+        print(f"  {backend:>5}: {elapsed * 1e3:8.2f} мс на расчет посадки")
+
+
+if __name__ == "__main__":
+    main()
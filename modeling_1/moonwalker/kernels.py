@@ -0,0 +1,82 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Вычислитель, выбранный при импорте: скомпилированные Numba циклы, если пакет установлен,
+# иначе векторизованные функции NumPy из main.py
+BACKEND = "numba" if njit is not None else "numpy"
+
+
+# Свободное падение: те же шаги, что и в NumPy-версии, но одним скомпилированным циклом
+def free_fall(H0, V0, gravity, dt):
+    n_max = 2
+    if H0 > 0:
+        # Шагов не больше, чем до падения при постоянном ускорении, плюс запас на округление
+        n_max = int((np.sqrt(V0 * V0 + 2 * gravity * H0) - V0) / gravity / dt) + 3
+    time, height, velocity = np.empty(n_max), np.empty(n_max), np.empty(n_max)
+    time[0], height[0], velocity[0] = 0.0, H0, V0
+    n = 1
+    while height[n - 1] > 0:
+        V = velocity[n - 1] + gravity * dt
+        H = height[n - 1] - velocity[n - 1] * dt - 0.5 * gravity * dt ** 2
+        time[n] = time[n - 1] + dt
+        velocity[n] = V
+        height[n] = max(H, 0.0)
+        n += 1
+        if H <= 0:
+            break
+    return time[:n], height[:n], velocity[:n]
+
+
+# Спуск с включенным двигателем (уравнение Мещерского). Возвращает число шагов и массивы
+# фиксированной длины, из которых используются первые steps + 1 значений
+def _powered_descent(H0, V0, initial_mass, base_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt):
+    n_max = int((initial_mass - base_mass) / (fuel_rate * dt)) + 3
+    time, height, velocity, mass = np.empty(n_max), np.empty(n_max), np.empty(n_max), np.empty(n_max)
+    acceleration = np.empty(n_max)
+    time[0], height[0], velocity[0], mass[0] = 0.0, H0, V0, initial_mass
+    n = 0
+    while height[n] > 0 and mass[n] > base_mass:
+        total_accel = -exhaust_velocity * fuel_rate / mass[n] - gravity
+        V = velocity[n] + total_accel * dt
+        H = height[n] - velocity[n] * dt - 0.5 * total_accel * dt ** 2
+        time[n + 1] = time[n] + dt
+        velocity[n + 1] = V
+        height[n + 1] = max(H, 0.0)
+        mass[n + 1] = max(mass[n] - fuel_rate * dt, base_mass)
+        acceleration[n] = total_accel
+        n += 1
+        if H <= 0 or V <= max_speed:
+            height[n] = 0.0
+            break
+    return n, time, height, velocity, acceleration, mass
+
+
+def powered_descent(H0, V0, initial_mass, base_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt):
+    n, time, height, velocity, acceleration, mass = _powered_descent(
+        H0, V0, initial_mass, base_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt)
+    return time[:n + 1], height[:n + 1], velocity[:n + 1], acceleration[:n], mass[:n + 1]
+
+
+# Номер последней точки свободного падения, из которой спуск с двигателем заканчивается
+# со скоростью не больше max_speed (-1, если такой точки нет)
+def engine_start_index(H_free_fall, V_free_fall, initial_mass, base_mass, gravity, exhaust_velocity, fuel_rate,
+                       max_speed, dt):
+    for idx in range(len(H_free_fall) - 1, -1, -1):
+        if H_free_fall[idx] <= 0:
+            continue
+        n, _, _, velocity, _, _ = _powered_descent(H_free_fall[idx], V_free_fall[idx], initial_mass, base_mass,
+                                                   gravity, exhaust_velocity, fuel_rate, max_speed, dt)
+        if velocity[n] <= max_speed:
+            return idx
+    return -1
+
+
+if njit is not None:
+    free_fall = njit(cache=True)(free_fall)
+    _powered_descent = njit(cache=True)(_powered_descent)
+    powered_descent = njit(cache=True)(powered_descent)
+    engine_start_index = njit(cache=True)(engine_start_index)
@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+import kernels
+from kernels import BACKEND
+
 # Исходные параметры
 g_L = 1.62  # ускорение на Луне, м/с^2
 M = 2150  # масса аппарата без топлива, кг
@@ -12,55 +15,83 @@ V0y = 29  # начальная вертикальная скорость, м/с
 Vmax = 3  # допустимая скорость при посадке, м/с
 dt = 0.1  # Шаг времени
 
-
-# Функция моделирующая свободное падение аппарата с выключенным двигателем
-def simulate_free_fall(H0, V0, gravity, dt):
-    time, height, velocity = [0], [H0], [V0]
-    while height[-1] > 0:
-        V = velocity[-1] + gravity * dt
-        H = height[-1] - velocity[-1] * dt - 0.5 * gravity * dt ** 2
-        time.append(time[-1] + dt)
-        velocity.append(V)
-        height.append(max(H, 0))  # Ограничиваем высоту до нуля
-        if H <= 0:
-            break
-    return np.array(time), np.array(height), np.array(velocity)
+ENGINE_SEARCH_BLOCK = 256  # Сколько точек включения двигателя проверяется за один векторизованный расчет
+
+
+# Функция моделирующая свободное падение аппарата с выключенным двигателем.
+# Ускорение постоянно, поэтому скорость и высота на всех шагах вычисляются сразу накопленными суммами.
+def simulate_free_fall(H0, V0, gravity, dt, backend=BACKEND):
+    if backend == "numba":
+        return kernels.free_fall(H0, V0, gravity, dt)
+    if H0 <= 0:
+        return np.array([0.0]), np.array([H0]), np.array([V0])
+    n_max = int((np.sqrt(V0 ** 2 + 2 * gravity * H0) - V0) / gravity / dt) + 3
+    time = np.cumsum(np.r_[0.0, np.full(n_max, dt)])
+    velocity = np.cumsum(np.r_[V0, np.full(n_max, gravity * dt)])
+    height = np.cumsum(np.r_[H0, -velocity[:-1] * dt - 0.5 * gravity * dt ** 2])
+    n = np.argmax(height[1:] <= 0) + 1  # Первый шаг, на котором аппарат достиг поверхности
+    return time[:n + 1], np.maximum(height[:n + 1], 0), velocity[:n + 1]
+
+
+# Спуск с включенным двигателем сразу для нескольких начальных состояний (H0 и V0 — массивы).
+# Масса убывает линейно до M независимо от движения, поэтому ускорения известны заранее,
+# а скорости и высоты — накопленные суммы. Возвращает для каждого начального состояния номер
+# последнего шага и массивы всех шагов до исчерпания топлива.
+def _powered_descent_batch(H0, V0, initial_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt):
+    n_max = int((initial_mass - M) / (fuel_rate * dt)) + 2
+    mass = np.maximum(np.cumsum(np.r_[initial_mass, np.full(n_max, -fuel_rate * dt)]), M)
+    total_accel = -exhaust_velocity * fuel_rate / mass[:-1] - gravity
+    velocity = np.cumsum(np.column_stack([V0, np.broadcast_to(total_accel * dt, (len(V0), n_max))]), axis=1)
+    height = np.cumsum(np.column_stack([H0, -velocity[:, :-1] * dt - 0.5 * total_accel * dt ** 2]), axis=1)
+
+    # Спуск идет, пока аппарат над поверхностью, есть топливо и скорость больше допустимой
+    finished = (height[:, 1:] <= 0) | (velocity[:, 1:] <= max_speed) | (mass[1:] <= M)
+    steps = np.argmax(finished, axis=1) + 1
+    steps[(H0 <= 0) | (initial_mass <= M)] = 0
+    return steps, mass, total_accel, velocity, height
 
 
 # Функция симулирующая движение аппарата при включенном двигателе (используется уравнение Мещерского)
-def simulate_powered_descent(H0, V0, initial_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt):
-    time, height, velocity, mass, acceleration = [0], [H0], [V0], [initial_mass], []
-    while height[-1] > 0 and mass[-1] > M:
-        m_current = mass[-1]
-        thrust_accel = -exhaust_velocity * fuel_rate / m_current
-        total_accel = thrust_accel - gravity
-        V = velocity[-1] + total_accel * dt
-        H = height[-1] - velocity[-1] * dt - 0.5 * total_accel * dt ** 2
-        m_new = max(m_current - fuel_rate * dt, M)
-        time.append(time[-1] + dt)
-        velocity.append(V)
-        height.append(max(H, 0))
-        mass.append(m_new)
-        acceleration.append(total_accel)
-        if H <= 0 or V <= max_speed:
-            height[-1] = 0
-            break
-    return np.array(time), np.array(height), np.array(velocity), np.array(acceleration), np.array(mass)
-
-
-# Функция которая вычисляет высоту на которой нужно включить двигатель для безопасной посадки
-def find_engine_start_point(t_free_fall, H_free_fall, V_free_fall, base_mass, fuel_mass, dt):
-    for idx in reversed(range(len(t_free_fall))):
-        if H_free_fall[idx] <= 0:
-            continue
-        H_engine_on, V_engine_on = H_free_fall[idx], V_free_fall[idx]
-        total_mass = base_mass + fuel_mass
-        t_powered, H_powered, V_powered, a_powered, m_powered = simulate_powered_descent(
-            H_engine_on, V_engine_on, total_mass, g_L, Vp, m_, Vmax, dt
-        )
-        if V_powered[-1] <= Vmax:
-            return idx, t_powered, H_powered, V_powered, a_powered
-    return None, None, None, None, None
+def simulate_powered_descent(H0, V0, initial_mass, gravity, exhaust_velocity, fuel_rate, max_speed, dt,
+                             backend=BACKEND):
+    if backend == "numba":
+        return kernels.powered_descent(H0, V0, initial_mass, M, gravity, exhaust_velocity, fuel_rate, max_speed, dt)
+    steps, mass, total_accel, velocity, height = _powered_descent_batch(
+        np.array([H0], dtype=float), np.array([V0], dtype=float), initial_mass, gravity, exhaust_velocity,
+        fuel_rate, max_speed, dt)
+    n = steps[0]
+    height = np.maximum(height[0, :n + 1], 0)
+    if n and (height[n] <= 0 or velocity[0, n] <= max_speed):
+        height[n] = 0
+    time = np.cumsum(np.r_[0.0, np.full(n, dt)])
+    return time, height, velocity[0, :n + 1], total_accel[:n], mass[:n + 1]
+
+
+# Функция которая вычисляет высоту на которой нужно включить двигатель для безопасной посадки.
+# Спуск с двигателем рассчитывается сразу из всех точек свободного падения, и выбирается последняя
+# точка, из которой посадка получается безопасной.
+def find_engine_start_point(t_free_fall, H_free_fall, V_free_fall, base_mass, fuel_mass, dt, backend=BACKEND):
+    total_mass = base_mass + fuel_mass
+    if backend == "numba":
+        idx = kernels.engine_start_index(H_free_fall, V_free_fall, total_mass, M, g_L, Vp, m_, Vmax, dt)
+    else:
+        idx = -1
+        candidates = np.nonzero(H_free_fall > 0)[0]
+        # Точки перебираются блоками с конца, поэтому обычно хватает одного-двух блоков
+        for stop in range(len(candidates), 0, -ENGINE_SEARCH_BLOCK):
+            block = candidates[max(stop - ENGINE_SEARCH_BLOCK, 0):stop]
+            steps, _, _, velocity, _ = _powered_descent_batch(
+                H_free_fall[block], V_free_fall[block], total_mass, g_L, Vp, m_, Vmax, dt)
+            safe = block[velocity[np.arange(len(block)), steps] <= Vmax]
+            if len(safe):
+                idx = safe[-1]
+                break
+    if idx < 0:
+        return None, None, None, None, None
+    t_powered, H_powered, V_powered, a_powered, m_powered = simulate_powered_descent(
+        H_free_fall[idx], V_free_fall[idx], total_mass, g_L, Vp, m_, Vmax, dt, backend
+    )
+    return idx, t_powered, H_powered, V_powered, a_powered
 
 
 # Функция отвечающая за построение графиков
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from main import H0, M, V0y, Vmax, g_L, m, find_engine_start_point, simulate_free_fall
+
+# Без numba ядра выполняются обычным Python, поэтому совпадение проверяется и без компиляции
+SCENARIOS = [(H0, V0y, 0.1), (H0, V0y, 0.01), (20000.0, 29.0, 0.1), (500.0, 0.0, 0.05), (0.0, 5.0, 0.1)]
+
+
+@pytest.mark.parametrize("height, speed, dt", SCENARIOS)
+def test_free_fall_matches_numpy(height, speed, dt):
+    reference = simulate_free_fall(height, speed, g_L, dt, backend="numpy")
+    result = simulate_free_fall(height, speed, g_L, dt, backend="numba")
+    for a, b in zip(result, reference):
+        assert a.shape == b.shape
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("height, speed, dt", SCENARIOS)
+def test_engine_start_matches_numpy(height, speed, dt):
+    t, H, V = simulate_free_fall(height, speed, g_L, dt, backend="numpy")
+    reference = find_engine_start_point(t, H, V, M, m, dt, backend="numpy")
+    result = find_engine_start_point(t, H, V, M, m, dt, backend="numba")
+    assert result[0] == reference[0]
+    if reference[0] is None:
+        return
+    assert reference[3][-1] <= Vmax
+    for a, b in zip(result[1:], reference[1:]):
+        assert a.shape == b.shape
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9)